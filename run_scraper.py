@@ -4,25 +4,88 @@ Script d'extraction des annonces Voursa
 Récupère les N dernières annonces de chaque catégorie avec leurs images
 """
 
+import argparse
+import cProfile
+import gzip
 import json
+import multiprocessing
 import time
 import os
+import random
 import re
 import hashlib
+import io
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unicodedata
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from urllib.parse import urljoin, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urljoin, urlparse
 import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException, WebDriverException,
+    InvalidSessionIdException, SessionNotCreatedException
+)
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
+from bs4 import FeatureNotFound
+from urllib3.exceptions import HTTPError as Urllib3Error
 import logging
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax est optionnel (backend 'selectolax')
+    LexborHTMLParser = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard est optionnel (archives compressées en zstd)
+    zstandard = None
+
+try:
+    import psutil
+except ImportError:  # psutil est optionnel (recyclage des navigateurs selon leur mémoire)
+    psutil = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow est optionnel (empreintes et post-traitement des images)
+    Image = ImageOps = None
+
+try:
+    import psycopg2
+except ImportError:  # psycopg2 est optionnel (export direct vers PostgreSQL)
+    psycopg2 = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow est optionnel (export Parquet)
+    pa = pc = pq = None
+
+try:
+    import resource
+except ImportError:  # module Unix (pic mémoire des benchmarks sans psutil)
+    resource = None
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pyinstrument est optionnel (profilage par annonce en HTML)
+    Profiler = None
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,686 +97,5973 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
-class VoursaCompleteScraper:
-    """Scraper complet pour toutes les catégories de Voursa"""
+# Résout dès que le DOM n'a pas changé pendant quietMs (ou au plus tard après maxMs)
+DOM_QUIET_SCRIPT = """
+const [quietMs, maxMs, done] = arguments;
+let timer = null;
+let limit = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(finish, quietMs);
+});
+function finish() {
+    observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(limit);
+    done(true);
+}
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(finish, quietMs);
+limit = setTimeout(finish, maxMs);
+"""
+
+# Données JSON rendues côté serveur par Next.js
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL
+)
+
+
+class AdaptiveRateLimiter:
+    """
+    Limiteur de politesse par hôte (seau à jetons), partagé entre tous les workers
     
-    # Catégories principales du site
-    CATEGORIES = {
-        'real_estate': 'Immobilier',
-        'vehicles': 'Véhicules',
-        'electronics': 'Électronique',
-        'furniture': 'Meubles',
-        'jobs': 'Emplois',
-        'services': 'Services',
-        'fashion': 'Mode',
-        'sports': 'Sports & Loisirs',
-        'animals': 'Animaux',
-        'others': 'Autres'
-    }
+    Chaque hôte dispose d'un seau rempli à raison d'un jeton par intervalle.
+    L'intervalle part de min_interval (le rythme le plus rapide autorisé) et
+    s'adapte aux réponses du serveur : il double sur un 429/503 (en respectant
+    Retry-After), s'allonge quand les temps de réponse se dégradent, puis
+    redescend progressivement vers min_interval quand le serveur répond bien.
+    """
     
-    def __init__(self, ads_per_category: int = 20, headless: bool = True, 
-                 download_images: bool = True, image_quality: str = 'high'):
+    THROTTLE_STATUSES = {429, 503}
+    
+    def __init__(self, min_interval: float = 2.0, max_interval: float = 60.0,
+                 burst: int = 1, slow_factor: float = 2.0):
         """
-        Initialise le scraper
-        
         Args:
-            ads_per_category: Nombre d'annonces à récupérer par catégorie
-            headless: Si True, lance Chrome sans interface graphique
-            download_images: Si True, télécharge les images des annonces
-            image_quality: 'high', 'medium', ou 'thumbnail'
+            min_interval: Délai minimal (secondes) entre deux requêtes vers un même hôte
+            max_interval: Délai maximal atteint par les ralentissements successifs
+            burst: Nombre de requêtes pouvant partir sans attendre après une pause
+            slow_factor: Une réponse plus lente que slow_factor fois la moyenne
+                récente est considérée comme un signe de surcharge
         """
-        self.ads_per_category = ads_per_category
-        self.download_images = download_images
-        self.image_quality = image_quality
-        self.base_url = "https://www.voursa.com/EN"
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.burst = burst
+        self.slow_factor = slow_factor
+        self._hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    def _state(self, host: str, now: float) -> Dict:
+        return self._hosts.setdefault(host, {
+            'interval': self.min_interval,
+            'tokens': float(self.burst),
+            'updated': now,
+            'latency': None,
+            'blocked_until': 0.0
+        })
+    
+    def interval(self, url: str) -> float:
+        """Intervalle courant entre deux requêtes vers l'hôte de l'URL"""
+        with self._lock:
+            return self._state(urlparse(url).netloc, time.monotonic())['interval']
+    
+    def wait(self, url: str):
+        """Bloque jusqu'à l'obtention d'un jeton pour l'hôte de l'URL"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            if state['interval'] > 0:
+                elapsed = now - state['updated']
+                state['tokens'] = min(float(self.burst), state['tokens'] + elapsed / state['interval'])
+            else:
+                state['tokens'] = float(self.burst)
+            state['updated'] = now
+            
+            # Un jeton manquant est réservé : les demandes suivantes attendent leur tour
+            delay = max(0.0, (1.0 - state['tokens']) * state['interval'])
+            delay = max(delay, state['blocked_until'] - now)
+            state['tokens'] -= 1.0
+        if delay > 0:
+            time.sleep(delay)
+    
+    def record(self, url: str, elapsed: float, status: Optional[int] = None,
+               retry_after: Optional[float] = None, failed: bool = False):
+        """
+        Adapte le rythme de l'hôte à une réponse
         
-        # Configuration de Selenium
-        self.options = webdriver.ChromeOptions()
-        if headless:
-            self.options.add_argument('--headless=new')
+        Args:
+            url: URL de la requête
+            elapsed: Durée de la requête (secondes)
+            status: Code HTTP (None pour un chargement Selenium)
+            retry_after: Valeur de l'en-tête Retry-After, en secondes
+            failed: True si la requête a échoué (timeout, connexion...)
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            
+            if failed or status in self.THROTTLE_STATUSES:
+                state['interval'] = min(self.max_interval, max(state['interval'], 0.5) * 2)
+                if retry_after:
+                    state['blocked_until'] = max(state['blocked_until'], now + retry_after)
+                logger.info(f"Ralentissement pour {host}: {state['interval']:.1f}s entre les requêtes")
+                return
+            
+            latency = state['latency']
+            state['latency'] = elapsed if latency is None else 0.8 * latency + 0.2 * elapsed
+            
+            # Les écarts de quelques millisecondes sur des réponses rapides ne comptent pas
+            if latency is not None and elapsed > self.slow_factor * latency and elapsed - latency > 0.5:
+                state['interval'] = min(self.max_interval, max(state['interval'], 0.5) * 1.5)
+            else:
+                # Retour progressif vers le rythme nominal
+                interval = state['interval'] * 0.9
+                state['interval'] = self.min_interval if interval - self.min_interval < 0.05 else interval
+
+
+# Ressources bloquées par le navigateur en profil 'lean', par famille. Les motifs
+# suivent la syntaxe de Network.setBlockedURLs (CDP), où '*' remplace tout texte.
+# L'extraction ne lit que le HTML et les attributs src : rien de tout cela n'est
+# nécessaire pour obtenir les mêmes champs.
+RESOURCE_BLOCK_PATTERNS = {
+    'stylesheets': ['*.css', '*.css?*'],
+    'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+    'images': ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.svg', '*/_next/image*'],
+    'media': ['*.mp4', '*.webm', '*.mp3'],
+    'trackers': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+        '*connect.facebook.net*', '*facebook.com/tr*', '*hotjar.com*', '*clarity.ms*'
+    ]
+}
+
+# Profils de navigateur : familles de ressources bloquées par type de page.
+# 'full' charge tout, comme un visiteur ; 'lean' désactive en plus le
+# chargement des images et n'attend que le DOM (stratégie 'eager').
+BROWSER_PROFILES = {
+    'full': {},
+    'lean': {
+        'listing': ['stylesheets', 'fonts', 'images', 'media', 'trackers'],
+        'ad': ['stylesheets', 'fonts', 'images', 'media', 'trackers']
+    }
+}
+
+
+# Expressions régulières compilées une seule fois pour toutes les annonces
+AD_ID_RE = re.compile(r'-(\d+)$')
+CATEGORY_KEY_RE = re.compile(r'/categories/([^/?#]+)')
+PRICE_RE = re.compile(r'[\d,.\s]+')
+# Premier nombre d'un texte : groupé par milliers ('1 200 000', '2,500,000',
+# '1.500.000') ou simple, avec un éventuel décimal ('85,5', '3.5'). Les
+# séparateurs sont écrits tels quels pour que le motif serve aussi à pyarrow (RE2).
+THOUSANDS_SEPARATORS = ' .,\u00a0\u202f'
+NUMBER_RE = re.compile(
+    rf'(?P<number>\d{{1,3}}(?:[{THOUSANDS_SEPARATORS}]\d{{3}})+|\d+(?:[.,]\d+)?)(?:\D|$)'
+)
+GROUPED_NUMBER_RE = re.compile(rf'\d{{1,3}}(?:[{THOUSANDS_SEPARATORS}]\d{{3}})+')
+VIEWS_RE = re.compile(r'(\d+)\s*(?:vues?|views?)', re.IGNORECASE)
+
+# Entrées des sitemaps XML (urlset et sitemapindex)
+SITEMAP_ENTRY_RE = re.compile(r'<(url|sitemap)>(.*?)</\1>', re.DOTALL)
+SITEMAP_LOC_RE = re.compile(r'<loc>\s*(.*?)\s*</loc>', re.DOTALL)
+SITEMAP_LASTMOD_RE = re.compile(r'<lastmod>\s*(.*?)\s*</lastmod>', re.DOTALL)
+ROBOTS_SITEMAP_RE = re.compile(r'^\s*sitemap:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+REAL_ESTATE_PATTERNS = {
+    'surface': re.compile(r'(\d+)\s*m[²2]', re.IGNORECASE),
+    'rooms': re.compile(r'(\d+)\s*(?:pièces?|rooms?|chambres?)', re.IGNORECASE),
+    'bedrooms': re.compile(r'(\d+)\s*(?:chambres?|bedrooms?)', re.IGNORECASE),
+    'bathrooms': re.compile(r'(\d+)\s*(?:salles? de bain|bathrooms?)', re.IGNORECASE),
+    'floor': re.compile(r'(\d+)(?:er?|ème)?\s*étage', re.IGNORECASE),
+    'year': re.compile(r'(?:année|year|construit?)\s*:?\s*(\d{4})', re.IGNORECASE)
+}
+
+VEHICLE_PATTERNS = {
+    'mileage': re.compile(r'(\d+[\d\s]*)\s*(?:km|kilomètres?)', re.IGNORECASE),
+    'year': re.compile(r'(?:année|year|modèle)\s*:?\s*(\d{4})', re.IGNORECASE),
+    'fuel': re.compile(r'(?:carburant|fuel)\s*:?\s*(diesel|essence|électrique|hybride)', re.IGNORECASE),
+    'transmission': re.compile(r'(?:transmission|boîte)\s*:?\s*(manuelle?|automatique?)', re.IGNORECASE),
+    'power': re.compile(r'(\d+)\s*(?:cv|ch|hp)', re.IGNORECASE)
+}
+
+
+class PageContext:
+    """
+    Page d'annonce parsée, partagée par toutes les méthodes extract_*
+    
+    Le texte de la page (soup.get_text()) n'est calculé qu'une fois, à la
+    première demande, au lieu d'une fois par extracteur.
+    """
+    
+    # Gabarit de la page (voir page_template), pour les sélecteurs appris
+    template = '*'
+    
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self._text = None
+        self._text_lower = None
+        self._attributes = None
+    
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+    
+    @property
+    def text_lower(self) -> str:
+        if self._text_lower is None:
+            self._text_lower = self.text.lower()
+        return self._text_lower
+    
+    @property
+    def attributes(self) -> Dict[str, str]:
+        """Balises et valeurs des attributs de la page (voir attribute_index), calculées une fois"""
+        if self._attributes is None:
+            self._attributes = attribute_index((tag.name, tag.attrs) for tag in self.soup.find_all(True))
+        return self._attributes
+    
+    def select(self, selector: str):
+        return self.soup.select(selector)
+    
+    def select_one(self, selector: str):
+        return self.soup.select_one(selector)
+
+
+class SelectolaxElement:
+    """Élément selectolax exposant le sous-ensemble de l'API BeautifulSoup utilisé par le scraper"""
+    
+    __slots__ = ('node',)
+    
+    def __init__(self, node):
+        self.node = node
+    
+    @property
+    def text(self) -> str:
+        return self.node.text(deep=True)
+    
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        return self.node.text(deep=True, separator=separator, strip=strip)
+    
+    def get(self, key: str, default=None):
+        value = self.node.attributes.get(key)
+        return default if value is None else value
+    
+    def __getitem__(self, key: str):
+        value = self.node.attributes[key]
+        return '' if value is None else value
+    
+    def select(self, selector: str) -> List['SelectolaxElement']:
+        return [SelectolaxElement(node) for node in self.node.css(selector)]
+
+
+class SelectolaxPageContext(PageContext):
+    """
+    PageContext basé sur selectolax (moteur lexbor), beaucoup plus rapide que BeautifulSoup
+    
+    Comme BeautifulSoup, le contenu des balises script, style et template
+    n'est pas considéré comme du texte.
+    """
+    
+    def __init__(self, html: str):
+        super().__init__(None)
+        self.tree = LexborHTMLParser(html)
+        self.tree.strip_tags(['script', 'style', 'template'])
+    
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.tree.root.text(deep=True) if self.tree.root else ''
+        return self._text
+    
+    @property
+    def attributes(self) -> Dict[str, str]:
+        if self._attributes is None:
+            self._attributes = attribute_index(
+                (node.tag, node.attributes) for node in self.tree.root.traverse(include_text=False)
+            ) if self.tree.root else attribute_index([])
+        return self._attributes
+    
+    def select(self, selector: str) -> List[SelectolaxElement]:
+        return [SelectolaxElement(node) for node in self.tree.css(selector)]
+    
+    def select_one(self, selector: str) -> Optional[SelectolaxElement]:
+        node = self.tree.css_first(selector)
+        return SelectolaxElement(node) if node is not None else None
+
+
+# Backends de parsing HTML disponibles : parseurs de BeautifulSoup ou selectolax
+PARSER_BACKENDS = ('html.parser', 'lxml', 'html5lib', 'selectolax')
+
+
+def make_page(html: str, parser: str = 'html.parser') -> PageContext:
+    """Parse une page HTML avec le backend demandé"""
+    if parser == 'selectolax':
+        page = SelectolaxPageContext(html)
+    else:
+        page = PageContext(BeautifulSoup(html, parser))
+    return page
+
+
+def check_parser_backend(parser: str):
+    """Vérifie qu'un backend de parsing est connu et installé"""
+    if parser not in PARSER_BACKENDS:
+        raise ValueError(f"Parseur inconnu: {parser} (choix: {', '.join(PARSER_BACKENDS)})")
+    if parser == 'selectolax':
+        if LexborHTMLParser is None:
+            raise ValueError("Le parseur 'selectolax' nécessite: pip install selectolax")
+        return
+    try:
+        BeautifulSoup('', parser)
+    except FeatureNotFound:
+        raise ValueError(f"Le parseur '{parser}' n'est pas installé (pip install {parser})")
+
+
+def page_template(kind: str, url: str) -> str:
+    """Gabarit d'une page : son type ('ad', 'listing') et sa catégorie, chacune ayant sa mise en page"""
+    match = CATEGORY_KEY_RE.search(url or '')
+    return f"{kind}:{match.group(1) if match else '*'}"
+
+
+def attribute_index(elements) -> Dict[str, str]:
+    """
+    Index des éléments d'une page parsée, pour écarter un sélecteur sans requête CSS
+    
+    Args:
+        elements: (nom de balise, attributs) de chaque élément
+    
+    Returns:
+        {attribut: toutes ses valeurs, en minuscules et séparées par des
+        espaces}, et sous '<' les noms des balises entourés d'espaces
+    """
+    tags = set()
+    values: Dict[str, List[str]] = {}
+    for tag, attrs in elements:
+        tags.add(tag.lower())
+        for name, value in attrs.items():
+            if isinstance(value, list):
+                value = ' '.join(value)
+            values.setdefault(name.lower(), []).append(value or '')
+    index = {name: ' '.join(parts).lower() for name, parts in values.items()}
+    index['<'] = f" {' '.join(sorted(tags))} "
+    return index
+
+
+# Sélecteur d'attribut : [nom], [nom="valeur"], [nom*=valeur i]...
+ATTRIBUTE_SELECTOR_RE = re.compile(
+    r'\[\s*([\w-]+)\s*(?:[~|^$*]?=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s\]]+)))?\s*(?:[iIsS]\s*)?\]'
+)
+
+
+def selector_tokens(selector: str) -> List[Tuple[str, str]]:
+    """
+    Ce que l'index d'une page (voir attribute_index) contient forcément si le
+    sélecteur y trouve un élément : (attribut, fragment en minuscules de sa
+    valeur), avec ('<', ' balise ') pour les noms de balises. Liste vide
+    pour les sélecteurs qui ne s'y prêtent pas (groupes, pseudo-classes).
+    """
+    tokens = []
+    for name, *value in ATTRIBUTE_SELECTOR_RE.findall(selector):
+        tokens.append((name.lower(), ''))
+        tokens += [(name.lower(), fragment) for fragment in re.findall(r'[\w-]+', ''.join(value).lower())]
+    bare = ATTRIBUTE_SELECTOR_RE.sub('', selector)
+    if any(char in bare for char in ',:()|\\["\''):
+        return []
+    tokens += [('<', f" {tag.lower()} ") for tag in re.findall(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)', bare)]
+    tokens += [('class', name.lower()) for name in re.findall(r'\.([\w-]+)', bare)]
+    tokens += [('id', name.lower()) for name in re.findall(r'#([\w-]+)', bare)]
+    return tokens
+
+
+class SelectorCache:
+    """
+    Sélecteurs appris, par gabarit de page et par champ
+    
+    Les sélecteurs de repli restent essayés dans l'ordre de la liste de
+    l'appelant et le premier qui trouve le champ l'emporte, comme sans
+    cache : le résultat ne dépend pas des pages vues auparavant. Le cache
+    retient les sélecteurs qui échouent systématiquement sur un gabarit
+    (skip_after échecs consécutifs, comme les [class*="..."] coûteux d'une
+    autre mise en page) ; pour eux, l'index des balises et des valeurs
+    d'attributs de la page (voir attribute_index et selector_tokens)
+    remplace la requête CSS quand il prouve que le sélecteur ne peut rien
+    trouver. Chaque recherche est classée :
+    
+    - 'hit' : le sélecteur retenu est le même que la fois précédente
+    - 'relearn' : un autre sélecteur a été retenu
+    - 'learn' : aucun sélecteur n'était encore appris
+    - 'miss' : aucun sélecteur ne trouve le champ sur la page
+    
+    Des 'relearn' fréquents signalent une mise en page qui a changé.
+    """
+    
+    def __init__(self, path: Optional[str] = "data/selector_cache.json", skip_after: int = 5):
+        """
+        Args:
+            path: Fichier JSON des sélecteurs appris, relu au démarrage
+                (None = appris pour la durée du crawl seulement)
+            skip_after: Échecs consécutifs au-delà desquels un sélecteur est
+                d'abord vérifié dans l'index de la page
+        """
+        self.path = path
+        self.skip_after = skip_after
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, List[Tuple[str, str]]] = {}
+        self.learned: Dict[Tuple[str, str], str] = {}
+        self.misses: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for template, fields in json.load(f).items():
+                        for field, state in fields.items():
+                            key = (template, field)
+                            if state.get('learned'):
+                                self.learned[key] = state['learned']
+                            self.misses[key] = {selector: int(count)
+                                                for selector, count in state.get('misses', {}).items()}
+            except (OSError, ValueError, AttributeError, TypeError) as e:
+                logger.warning(f"Sélecteurs appris illisibles, réapprentissage: {e}")
+    
+    def cannot_match(self, selector: str, attributes: Dict[str, str]) -> bool:
+        """True s'il manque à la page une balise ou une valeur d'attribut indispensable au sélecteur"""
+        tokens = self._tokens.get(selector)
+        if tokens is None:
+            tokens = self._tokens[selector] = selector_tokens(selector)
+        for name, fragment in tokens:
+            values = attributes.get(name)
+            if values is None or fragment not in values:
+                return True
+        return False
+    
+    def find(self, template: str, field: str, selectors: List[str],
+             probe: Callable[[str], object],
+             attributes: Optional[Callable[[], Dict[str, str]]] = None) -> Tuple[object, str]:
+        """
+        Premier résultat d'une liste de sélecteurs, dans l'ordre de la liste
         
-        # Options pour éviter la détection
-        self.options.add_argument('--no-sandbox')
-        self.options.add_argument('--disable-dev-shm-usage')
-        self.options.add_argument('--disable-blink-features=AutomationControlled')
-        self.options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        self.options.add_experimental_option('useAutomationExtension', False)
-        self.options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        Args:
+            template: Gabarit de la page
+            field: Champ recherché
+            selectors: Sélecteurs de repli, du plus précis au plus général
+            probe: Essaie un sélecteur ; renvoie None s'il ne donne rien
+            attributes: Renvoie l'index de la page (voir attribute_index), calculé
+                seulement si un sélecteur est à vérifier (None = pas de vérification)
         
-        # Initialiser le driver
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=self.options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        Returns:
+            (résultat ou None, 'hit' / 'relearn' / 'learn' / 'miss')
+        """
+        key = (template, field)
+        with self._lock:
+            misses = dict(self.misses.get(key, {}))
+            learned = self.learned.get(key)
         
-        self.wait = WebDriverWait(self.driver, 15)
+        failed = []
+        skipped = 0
+        for selector in selectors:
+            if attributes is not None and misses.get(selector, 0) >= self.skip_after \
+                    and self.cannot_match(selector, attributes()):
+                skipped += 1
+                failed.append(selector)
+                continue
+            result = probe(selector)
+            if result is not None:
+                if learned is None:
+                    outcome = 'learn'
+                else:
+                    outcome = 'hit' if selector == learned else 'relearn'
+                    if outcome == 'relearn':
+                        logger.debug(f"Sélecteur réappris pour {field} ({template}): {learned} -> {selector}")
+                return result, self._record(key, outcome, failed, skipped, selector)
+            failed.append(selector)
+        return None, self._record(key, 'miss', failed, skipped)
+    
+    def _record(self, key: Tuple[str, str], outcome: str, failed: List[str], skipped: int,
+                selector: Optional[str] = None) -> str:
+        with self._lock:
+            misses = self.misses.setdefault(key, {})
+            for name in failed:
+                misses[name] = misses.get(name, 0) + 1
+            if selector is not None:
+                misses.pop(selector, None)
+                self.learned[key] = selector
+            counts = self.counts.setdefault(
+                key, {'hit': 0, 'relearn': 0, 'learn': 0, 'miss': 0, 'skipped': 0}
+            )
+            counts[outcome] += 1
+            counts['skipped'] += skipped
+        return outcome
+    
+    def rates(self) -> List[Tuple[str, str, Optional[str], Dict[str, int]]]:
+        """(gabarit, champ, sélecteur appris, compteurs) de chaque champ recherché"""
+        with self._lock:
+            return [(template, field, self.learned.get((template, field)), dict(counts))
+                    for (template, field), counts in sorted(self.counts.items())]
+    
+    def save(self):
+        """Sauvegarde les sélecteurs appris et leurs échecs de façon atomique"""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot: Dict[str, Dict[str, Dict]] = {}
+            for key in sorted(set(self.learned) | set(self.misses)):
+                template, field = key
+                snapshot.setdefault(template, {})[field] = {
+                    'learned': self.learned.get(key),
+                    'misses': dict(self.misses.get(key, {}))
+                }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+# Correspondance qualité -> paramètres de /_next/image. Les largeurs font partie
+# des tailles autorisées par défaut par Next.js (deviceSizes / imageSizes) et la
+# qualité reste à 75, la seule valeur acceptée par toutes les configurations.
+# 'original' désigne le fichier source sur S3, sans redimensionnement.
+IMAGE_QUALITY_PRESETS = {
+    'original': None,
+    'high': {'w': 1920, 'q': 75},
+    'medium': {'w': 1080, 'q': 75},
+    'thumbnail': {'w': 384, 'q': 75},
+}
+
+
+def rewrite_image_url(url: str, quality: str, origin: str) -> str:
+    """
+    Réécrit l'URL d'une image pour la qualité demandée
+    
+    Args:
+        url: URL /_next/image ou URL directe de l'image source
+        quality: Clé de IMAGE_QUALITY_PRESETS
+        origin: Origine du site (schéma + hôte) servant /_next/image
         
-        # Créer les dossiers nécessaires
-        self.create_directories()
+    Returns:
+        L'URL de l'image à la taille demandée
+    """
+    parsed = urlparse(url)
+    source = url
+    if parsed.path == '/_next/image':
+        source = parse_qs(parsed.query).get('url', [''])[0]
+        if not source:
+            return url
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        if not source.startswith('http'):
+            source = urljoin(origin, source)
+    
+    preset = IMAGE_QUALITY_PRESETS[quality]
+    if preset is None:
+        return source
+    return f"{origin}/_next/image?url={quote(source, safe='')}&w={preset['w']}&q={preset['q']}"
+
+
+# Hôtes S3 : <bucket>.s3[.<région>].amazonaws.com ou s3[.<région>].amazonaws.com/<bucket>
+S3_HOST_RE = re.compile(r'^(?:(?P<bucket>.+)\.)?s3[.-](?:[a-z0-9-]+\.)?amazonaws\.com$')
+THUMBNAIL_ALT_RE = re.compile(r'^\s*(?:thumbnail|miniature)\b', re.IGNORECASE)
+
+
+def image_source_url(url: str) -> str:
+    """URL de l'image source derrière un lien /_next/image (même imbriqué)"""
+    parsed = urlparse(url)
+    while parsed.path.endswith('/_next/image'):
+        inner = parse_qs(parsed.query).get('url', [''])[0]
+        if not inner:
+            break
+        url = urljoin(f"{parsed.scheme}://{parsed.netloc}", inner)
+        parsed = urlparse(url)
+    return url
+
+
+def canonical_image_key(url: str) -> str:
+    """
+    Identifiant d'une photo, commun à toutes ses variantes
+    
+    Le lien /_next/image est décodé ; la taille, la qualité, le schéma et la
+    forme de l'URL S3 (hôte virtuel ou chemin) sont ignorés.
+    """
+    parsed = urlparse(image_source_url(url))
+    host = parsed.netloc.lower()
+    path = unquote(parsed.path)
+    match = S3_HOST_RE.match(host)
+    if match:
+        return f"s3://{match.group('bucket')}{path}" if match.group('bucket') else f"s3:/{path}"
+    return f"{host}{path}"
+
+
+def image_variant(url: str) -> Dict:
+    """URL d'une variante, avec la largeur et la qualité demandées à /_next/image"""
+    parsed = urlparse(url)
+    params = parse_qs(parsed.query) if parsed.path.endswith('/_next/image') else {}
+    variant = {'url': url}
+    for key, name in (('w', 'width'), ('q', 'quality')):
+        value = params.get(key, [''])[0]
+        if value.isdigit():
+            variant[name] = int(value)
+    return variant
+
+
+def group_image_variants(images: List[Dict]) -> List[Dict]:
+    """
+    Regroupe les variantes d'une même photo (galerie, miniatures, autres tailles)
+    
+    Returns:
+        Les photos distinctes dans l'ordre de première apparition ; chacune
+        a pour URL sa plus grande variante (le fichier source s'il a été vu),
+        le texte alternatif de la première variante qui n'est pas une
+        miniature, et dans 'variants' toutes les URLs vues
+    """
+    photos: Dict[str, Dict] = {}
+    for img in images:
+        key = canonical_image_key(img['url'])
+        variants = img.get('variants') or [image_variant(img['url'])]
+        photo = photos.get(key)
+        if photo is None:
+            photos[key] = {**img, 'variants': list(variants)}
+            continue
         
-        # Statistiques
-        self.stats = {
-            'total_ads': 0,
-            'total_images': 0,
-            'errors': 0,
-            'start_time': datetime.now()
-        }
+        known = {variant['url'] for variant in photo['variants']}
+        photo['variants'].extend(variant for variant in variants if variant['url'] not in known)
+        if img.get('alt') and (not photo.get('alt') or THUMBNAIL_ALT_RE.match(photo['alt'])) \
+                and not THUMBNAIL_ALT_RE.match(img['alt']):
+            photo['alt'] = img['alt']
     
-    def create_directories(self):
-        """Crée les dossiers nécessaires pour le stockage"""
-        directories = ['data', 'images', 'logs']
-        for directory in directories:
-            if not os.path.exists(directory):
-                os.makedirs(directory)
-                logger.info(f"Dossier créé: {directory}")
+    for photo in photos.values():
+        best = max(photo['variants'], key=lambda variant: variant.get('width', float('inf')))
+        photo['url'] = best['url']
+    return list(photos.values())
+
+
+def link_file(src: str, dest: str):
+    """Crée dest comme lien physique vers src (copie à défaut), en remplaçant l'existant"""
+    if os.path.exists(dest):
+        if os.path.samefile(src, dest):
+            return
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class HttpCache:
+    """
+    Cache HTTP persistant fondé sur les validateurs (ETag, Last-Modified)
     
-    def get_category_url(self, category_key: str) -> str:
-        """Construit l'URL d'une catégorie"""
-        return f"{self.base_url}/categories/{category_key}"
+    Pour chaque URL, l'index SQLite garde les validateurs de la dernière
+    réponse et le chemin de son corps. La requête suivante est conditionnelle
+    (If-None-Match / If-Modified-Since) et une réponse 304 est servie depuis
+    le disque. Les corps des pages sont stockés dans le cache ; pour les
+    images, l'entrée pointe vers le fichier téléchargé (ou l'objet du
+    stockage d'images), qui n'est pas dupliqué. Les entrées inutilisées depuis
+    max_age_days sont supprimées, puis les plus anciennes tant que les corps
+    dépassent max_size_mb.
+    """
     
-    def wait_for_page_load(self, timeout: int = 10):
-        """Attend que la page soit complètement chargée"""
-        try:
-            self.wait.until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
+    def __init__(self, root: str = "data/http_cache", max_size_mb: int = 1024,
+                 max_age_days: float = 30, evict_every: int = 200):
+        """
+        Args:
+            root: Dossier du cache (index et corps des pages)
+            max_size_mb: Taille maximale des corps stockés dans le cache
+            max_age_days: Durée de conservation d'une entrée inutilisée
+            evict_every: Nombre d'enregistrements entre deux évictions
+        """
+        self.root = root
+        self.bodies_dir = os.path.join(root, 'bodies')
+        self.max_size = max_size_mb * 1024 * 1024
+        self.max_age = max_age_days * 86400
+        self.evict_every = evict_every
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        
+        self._stored = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                path TEXT NOT NULL,
+                owned INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                used_at REAL NOT NULL
             )
-            time.sleep(2)  # Pause supplémentaire pour les éléments dynamiques
-        except TimeoutException:
-            logger.warning("Timeout lors du chargement de la page")
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+        self.conn.commit()
+    
+    def body_path(self, url: str) -> str:
+        """Chemin du corps d'une page stockée dans le cache"""
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.bodies_dir, digest[:2], digest)
+    
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Entrée du cache pour une URL, ou None (entrée dont le fichier a disparu comprise)"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, content_type, path FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        if not os.path.exists(row[3]):
+            self.remove(url)
+            return None
+        return {'url': url, 'etag': row[0], 'last_modified': row[1], 'content_type': row[2], 'path': row[3]}
     
-    def extract_ad_urls_from_listing(self, category_url: str, max_ads: int) -> List[str]:
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """En-têtes de revalidation d'une entrée"""
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    @staticmethod
+    def cacheable(headers) -> bool:
+        """Une réponse 200 n'est gardée que si elle porte un validateur et l'autorise"""
+        return bool(headers.get('ETag') or headers.get('Last-Modified')) \
+            and 'no-store' not in headers.get('Cache-Control', '')
+    
+    def store(self, url: str, headers, body: Optional[bytes] = None, path: Optional[str] = None):
         """
-        Extrait les URLs des annonces depuis une page de catégorie
+        Enregistre une réponse 200
         
         Args:
-            category_url: URL de la catégorie
-            max_ads: Nombre maximum d'annonces à récupérer
-            
-        Returns:
-            Liste des URLs d'annonces
+            url: URL demandée
+            headers: En-têtes de la réponse
+            body: Corps à stocker dans le cache (pages)
+            path: Fichier existant contenant le corps (images), à défaut de body
         """
-        ad_urls = []
-        page = 1
+        if not self.cacheable(headers):
+            self.remove(url)
+            return
         
-        while len(ad_urls) < max_ads:
-            try:
-                # Construire l'URL avec pagination
-                page_url = f"{category_url}?page={page}" if page > 1 else category_url
-                logger.info(f"Scraping page {page}: {page_url}")
-                
-                self.driver.get(page_url)
-                self.wait_for_page_load()
-                
-                # Chercher les liens des annonces
-                # Adapter ces sélecteurs selon la structure réelle du site
-                selectors = [
-                    "a[href*='/ads/']",
-                    ".ad-item a",
-                    ".listing-item a",
-                    "[class*='ad-link']",
-                    "[class*='listing-link']"
-                ]
-                
-                links_found = False
-                for selector in selectors:
-                    try:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            for element in elements:
-                                href = element.get_attribute('href')
-                                if href and '/ads/' in href and href not in ad_urls:
-                                    ad_urls.append(href)
-                                    links_found = True
-                                    
-                                    if len(ad_urls) >= max_ads:
-                                        return ad_urls[:max_ads]
-                            break
-                    except:
-                        continue
-                
-                if not links_found:
-                    logger.warning(f"Aucune annonce trouvée sur la page {page}")
-                    break
-                
-                # Vérifier s'il y a une page suivante
-                try:
-                    next_button = self.driver.find_element(By.CSS_SELECTOR, 
-                        "a[rel='next'], .pagination-next, [class*='next-page']")
-                    if not next_button.is_enabled():
+        owned = body is not None
+        if owned:
+            path = self.body_path(url)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, headers.get('ETag'), headers.get('Last-Modified'), headers.get('Content-Type'),
+                 path, int(owned), len(body) if owned else 0, now, now)
+            )
+            self.conn.commit()
+            self._stored += 1
+            should_evict = self._stored % self.evict_every == 0
+        if should_evict:
+            self.evict()
+    
+    def touch(self, url: str, headers):
+        """Note l'utilisation d'une entrée après un 304, avec ses éventuels nouveaux validateurs"""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE entries SET used_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), headers.get('ETag'), headers.get('Last-Modified'), url)
+            )
+            self.conn.commit()
+    
+    def read(self, entry: Dict) -> bytes:
+        with open(entry['path'], 'rb') as f:
+            return f.read()
+    
+    @staticmethod
+    def revive(response: requests.Response, entry: Dict, body: bytes):
+        """Transforme une réponse 304 en réponse 200 portant le corps en cache"""
+        response.status_code = 200
+        response._content = body
+        if entry['content_type']:
+            response.headers['Content-Type'] = entry['content_type']
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+    
+    def remove(self, url: str):
+        with self._lock:
+            row = self.conn.execute("SELECT path, owned FROM entries WHERE url = ?", (url,)).fetchone()
+            self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.conn.commit()
+        if row and row[1] and os.path.exists(row[0]):
+            os.remove(row[0])
+    
+    def evict(self):
+        """Supprime les entrées trop anciennes, puis les moins récentes au-delà de max_size_mb"""
+        with self._lock:
+            expired = self.conn.execute(
+                "SELECT url, path, owned FROM entries WHERE used_at < ?", (time.time() - self.max_age,)
+            ).fetchall()
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE used_at >= ?",
+                (time.time() - self.max_age,)
+            ).fetchone()[0]
+            if total > self.max_size:
+                for row in self.conn.execute(
+                    "SELECT url, path, owned, size FROM entries WHERE owned = 1 AND used_at >= ? "
+                    "ORDER BY used_at", (time.time() - self.max_age,)
+                ):
+                    expired.append(row[:3])
+                    total -= row[3]
+                    if total <= self.max_size:
                         break
-                except NoSuchElementException:
-                    logger.info("Dernière page atteinte")
-                    break
-                
-                page += 1
-                time.sleep(2)  # Pause entre les pages
-                
-            except Exception as e:
-                logger.error(f"Erreur lors de l'extraction des URLs page {page}: {e}")
-                break
+            self.conn.executemany("DELETE FROM entries WHERE url = ?", [(row[0],) for row in expired])
+            self.conn.commit()
         
-        return ad_urls[:max_ads]
+        for _, path, owned in expired:
+            if owned and os.path.exists(path):
+                os.remove(path)
+        if expired:
+            logger.info(f"Cache HTTP: {len(expired)} entrées supprimées")
     
-    def extract_ad_details(self, ad_url: str) -> Dict:
+    def close(self):
+        self.evict()
+        with self._lock:
+            self.conn.close()
+
+
+class ImageStore:
+    """
+    Stockage des images adressé par contenu, partagé entre les exécutions
+    
+    Chaque image est stockée une seule fois sous objects/<sha256[:2]>/<sha256><ext> ;
+    les fichiers des annonces sont des liens physiques vers ces objets. Un index
+    persistant URL -> empreinte permet d'éviter toute requête pour une image déjà connue.
+    """
+    
+    # Verrous des URLs en cours de téléchargement, répartis par empreinte de l'URL
+    URL_LOCK_STRIPES = 256
+    
+    def __init__(self, root: str = "images/store", save_every: int = 50):
         """
-        Extrait tous les détails d'une annonce
+        Args:
+            root: Dossier du stockage
+            save_every: Nombre d'ajouts entre deux sauvegardes de l'index
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.tmp_dir = os.path.join(root, 'tmp')
+        self.index_path = os.path.join(root, 'index.json')
+        self.save_every = save_every
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._url_locks = [threading.Lock() for _ in range(self.URL_LOCK_STRIPES)]
+        self._unsaved = 0
+        self.index: Dict[str, Dict] = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Index d'images illisible, reconstruction: {e}")
+    
+    def object_path(self, digest: str, ext: str) -> str:
+        """Chemin de l'objet correspondant à une empreinte"""
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}{ext}")
+    
+    def url_lock(self, url: str) -> threading.Lock:
+        """
+        Verrou d'une URL, pour ne pas télécharger deux fois la même image en parallèle
+        
+        Le nombre de verrous est fixe : deux URLs peuvent partager un verrou,
+        ce qui ne fait qu'attendre un téléchargement de plus.
+        """
+        return self._url_locks[hash(url) % self.URL_LOCK_STRIPES]
+    
+    def lookup(self, url: str) -> Optional[str]:
+        """Retourne le chemin de l'objet déjà téléchargé pour cette URL, ou None"""
+        with self._lock:
+            entry = self.index.get(url)
+        if entry:
+            path = self.object_path(entry['sha256'], entry['ext'])
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def new_temp_path(self) -> str:
+        """Chemin temporaire pour un téléchargement, sur le même disque que le stockage"""
+        fd, path = tempfile.mkstemp(suffix='.part', dir=self.tmp_dir)
+        os.close(fd)
+        return path
+    
+    def add(self, url: str, tmp_path: str, ext: str) -> str:
+        """
+        Intègre un fichier téléchargé au stockage
         
         Args:
-            ad_url: URL de l'annonce
+            url: URL source de l'image
+            tmp_path: Fichier téléchargé (déplacé ou supprimé par cet appel)
+            ext: Extension de l'image
             
         Returns:
-            Dictionnaire contenant tous les détails
+            Chemin de l'objet dans le stockage
         """
-        ad_data = {
-            'url': ad_url,
-            'ad_id': self.extract_ad_id(ad_url),
-            'scraping_date': datetime.now().isoformat(),
-            'title': '',
-            'price': '',
-            'currency': '',
-            'description': '',
-            'location': '',
-            'category': '',
-            'subcategory': '',
-            'images': [],
-            'details': {},
-            'seller': {
-                'name': '',
-                'phone': '',
-                'type': ''  # particulier ou professionnel
-            },
-            'metadata': {
-                'views': 0,
-                'posted_date': '',
-                'modified_date': ''
-            }
-        }
+        sha256 = hashlib.sha256()
+        with open(tmp_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        size = os.path.getsize(tmp_path)
         
-        try:
-            logger.info(f"Extraction des détails: {ad_url}")
-            self.driver.get(ad_url)
-            self.wait_for_page_load()
-            
-            # Utiliser BeautifulSoup pour parser
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
-            # Titre
-            title_selectors = ['h1', '.ad-title', '.title', '[class*="title"]']
-            for selector in title_selectors:
-                element = soup.select_one(selector)
-                if element and element.text.strip():
-                    ad_data['title'] = element.text.strip()
-                    break
-            
-            # Prix
-            price_selectors = ['.price', '.ad-price', '[class*="price"]']
-            for selector in price_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    price_text = element.text.strip()
-                    ad_data['price'] = self.extract_price(price_text)
-                    ad_data['currency'] = self.extract_currency(price_text)
-                    break
-            
-            # Description
-            desc_selectors = ['.description', '.ad-description', '[class*="description"]']
-            for selector in desc_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    ad_data['description'] = element.text.strip()
-                    break
-            
-            # Localisation
-            location_selectors = ['.location', '.ad-location', '[class*="location"]', 
-                                 '[class*="address"]']
-            for selector in location_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    ad_data['location'] = element.text.strip()
-                    break
-            
-            # Images
-            ad_data['images'] = self.extract_images(soup)
-            
-            # Détails spécifiques (surface, chambres, année, kilométrage, etc.)
-            ad_data['details'] = self.extract_specific_details(soup)
-            
-            # Informations vendeur
-            ad_data['seller'] = self.extract_seller_info(soup)
-            
-            # Métadonnées
-            ad_data['metadata'] = self.extract_metadata(soup)
-            
-            # Catégorie depuis le breadcrumb ou l'URL
-            ad_data['category'] = self.extract_category(soup, ad_url)
-            
-        except Exception as e:
-            logger.error(f"Erreur extraction annonce {ad_url}: {e}")
-            self.stats['errors'] += 1
+        path = self.object_path(digest, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            # Contenu identique déjà stocké sous une autre URL
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
         
-        return ad_data
+        with self._lock:
+            self.index[url] = {'sha256': digest, 'ext': ext, 'size': size}
+            self._unsaved += 1
+            should_save = self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+        return path
     
-    def extract_ad_id(self, url: str) -> str:
-        """Extrait l'ID unique de l'annonce depuis l'URL"""
-        match = re.search(r'-(\d+)$', url)
-        if match:
-            return match.group(1)
-        return hashlib.md5(url.encode()).hexdigest()[:10]
+    def link(self, object_path: str, dest: str):
+        """Crée le fichier de l'annonce comme lien physique vers l'objet (copie à défaut)"""
+        link_file(object_path, dest)
     
-    def extract_price(self, price_text: str) -> str:
-        """Extrait le prix numérique du texte"""
-        price_match = re.search(r'[\d,.\s]+', price_text)
-        if price_match:
-            return price_match.group().strip().replace(' ', '').replace(',', '.')
-        return price_text
+    def save(self):
+        """Sauvegarde l'index URL -> empreinte de façon atomique"""
+        with self._lock:
+            snapshot = dict(self.index)
+            self._unsaved = 0
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+
+class ImageDownloader:
+    """Téléchargement des images en arrière-plan, avec connexions keep-alive partagées"""
     
-    def extract_currency(self, price_text: str) -> str:
-        """Extrait la devise du prix"""
-        currencies = ['MRU', 'EUR', '$', '€', 'USD']
-        for currency in currencies:
-            if currency in price_text:
-                return currency
-        return 'MRU'  # Devise par défaut pour la Mauritanie
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
     
-    def extract_images(self, soup: BeautifulSoup) -> List[Dict]:
-        """Extrait toutes les images de l'annonce"""
-        images = []
+    def __init__(self, max_workers: int = 8, max_retries: int = 3,
+                 backoff: float = 1.0, chunk_size: int = 64 * 1024,
+                 store: Optional[ImageStore] = None,
+                 metrics: Optional['ScraperMetrics'] = None,
+                 cache: Optional[HttpCache] = None):
+        """
+        Args:
+            max_workers: Nombre maximal de téléchargements simultanés
+            max_retries: Nombre de nouvelles tentatives après un échec temporaire
+            backoff: Délai de base (secondes) entre deux tentatives, doublé à chaque essai
+            chunk_size: Taille des blocs écrits sur le disque
+            store: Stockage adressé par contenu (None = écriture directe des fichiers)
+            metrics: Mesures alimentées par les téléchargements (durées, octets)
+            cache: Cache HTTP : les images déjà téléchargées sont revalidées par
+                requête conditionnelle plutôt que téléchargées à nouveau
+        """
+        self.store = store
+        self.metrics = metrics
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='voursa-img')
         
-        # Sélecteurs pour les images
-        img_selectors = [
-            '.gallery img',
-            '.carousel img', 
-            '[class*="gallery"] img',
-            '[class*="slider"] img',
-            '.ad-images img',
-            'img[src*="/uploads/"]',
-            'img[src*="/images/"]'
-        ]
+        # Un pool de connexions par hôte, dimensionné sur la concurrence
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': USER_AGENT})
         
-        for selector in img_selectors:
-            elements = soup.select(selector)
-            for img in elements:
-                src = img.get('src') or img.get('data-src')
-                if src and not src.endswith('.svg'):
-                    # Construire l'URL complète si nécessaire
-                    if not src.startswith('http'):
-                        src = urljoin(self.base_url, src)
-                    
-                    images.append({
-                        'url': src,
-                        'alt': img.get('alt', ''),
-                        'title': img.get('title', '')
-                    })
+        self._pending = set()
+        self._lock = threading.Lock()
+    
+    def submit(self, url: str, filepath: str,
+               on_done: Optional[Callable[[Optional[str]], None]] = None) -> Future:
+        """
+        Planifie le téléchargement d'une image
         
-        # Éliminer les doublons
-        seen = set()
-        unique_images = []
-        for img in images:
-            if img['url'] not in seen:
-                seen.add(img['url'])
-                unique_images.append(img)
+        Args:
+            url: URL de l'image
+            filepath: Fichier de destination
+            on_done: Appelé avec le résultat de download() dans le thread du
+                téléchargement, avant que le Future ne soit terminé
+        """
+        def task():
+            result = self.download(url, filepath)
+            if on_done is not None:
+                try:
+                    on_done(result)
+                except Exception as e:
+                    logger.error(f"Erreur après téléchargement de {url}: {e}")
+            return result
         
-        return unique_images
+        future = self.executor.submit(task)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
     
-    def extract_specific_details(self, soup: BeautifulSoup) -> Dict:
-        """Extrait les détails spécifiques selon le type d'annonce"""
-        details = {}
+    def _discard(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+    
+    def pending(self) -> int:
+        """Nombre de téléchargements planifiés ou en cours"""
+        with self._lock:
+            return len(self._pending)
+    
+    def download(self, url: str, filepath: str) -> Optional[str]:
+        """
+        Télécharge une image en streaming, avec nouvelles tentatives
         
-        # Chercher les paires clé-valeur
-        detail_selectors = [
-            '.detail-item',
-            '.property-detail',
-            '[class*="detail"]',
-            '.specs li',
-            '.characteristics li'
-        ]
+        Le fichier est écrit par blocs dans un fichier temporaire puis renommé,
+        si bien qu'une image interrompue ne laisse jamais de fichier tronqué.
+        Avec un stockage, une image déjà connue est liée sans aucune requête.
         
-        for selector in detail_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                text = element.text.strip()
-                
-                # Chercher les patterns clé:valeur
-                if ':' in text:
-                    key, value = text.split(':', 1)
-                    details[self.normalize_key(key.strip())] = value.strip()
-                elif '：' in text:  # Deux-points pleine largeur
-                    key, value = text.split('：', 1)
-                    details[self.normalize_key(key.strip())] = value.strip()
+        Returns:
+            'reused' si l'image venait du stockage ou du cache HTTP (réponse 304),
+            'downloaded' si elle a été téléchargée, None en cas d'échec
+        """
+        start = time.perf_counter()
+        if self.store is not None:
+            with self.store.url_lock(url):
+                result = self._download(url, filepath)
+        else:
+            result = self._download(url, filepath)
+        if self.metrics is not None and result == 'downloaded':
+            self.metrics.observe('image_download', time.perf_counter() - start)
+        return result
+    
+    def _download(self, url: str, filepath: str) -> Optional[str]:
+        if self.store is not None:
+            cached = self.store.lookup(url)
+            if cached:
+                self.store.link(cached, filepath)
+                return 'reused'
+            tmp_path = self.store.new_temp_path()
+        else:
+            tmp_path = f"{filepath}.part"
+        cached = self.cache.lookup(url) if self.cache is not None else None
         
-        # Chercher des patterns spécifiques
-        self.extract_real_estate_details(soup, details)
-        self.extract_vehicle_details(soup, details)
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.session.get(url, timeout=10, stream=True,
+                                      headers=HttpCache.conditional_headers(cached)) as response:
+                    if response.status_code == 304 and cached is not None:
+                        link_file(cached['path'], filepath)
+                        self.cache.touch(url, response.headers)
+                        if self.metrics is not None:
+                            self.metrics.inc('http_cache_total', {'kind': 'image', 'result': 'hit'})
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+                        return 'reused'
+                    
+                    if response.status_code == 200:
+                        size = 0
+                        with open(tmp_path, 'wb') as f:
+                            for chunk in response.iter_content(self.chunk_size):
+                                f.write(chunk)
+                                size += len(chunk)
+                        if self.metrics is not None:
+                            self.metrics.add_bytes('image', size)
+                        if self.store is not None:
+                            ext = os.path.splitext(filepath)[1]
+                            stored_path = self.store.add(url, tmp_path, ext)
+                            self.store.link(stored_path, filepath)
+                        else:
+                            os.replace(tmp_path, filepath)
+                            stored_path = filepath
+                        if self.cache is not None:
+                            self.cache.store(url, response.headers, path=stored_path)
+                            if self.metrics is not None:
+                                self.metrics.inc('http_cache_total', {'kind': 'image', 'result': 'miss'})
+                        return 'downloaded'
+                    
+                    if response.status_code not in self.RETRY_STATUSES:
+                        logger.warning(f"Image ignorée ({response.status_code}): {url}")
+                        break
+                    error = f"HTTP {response.status_code}"
+                    
+            except (requests.RequestException, OSError) as e:
+                error = e
+            
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * (2 ** attempt))
+            else:
+                logger.error(f"Erreur téléchargement image {url}: {error}")
         
-        return details
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
     
-    def extract_real_estate_details(self, soup: BeautifulSoup, details: Dict):
-        """Extrait les détails spécifiques à l'immobilier"""
-        patterns = {
-            'surface': r'(\d+)\s*m[²2]',
-            'rooms': r'(\d+)\s*(?:pièces?|rooms?|chambres?)',
-            'bedrooms': r'(\d+)\s*(?:chambres?|bedrooms?)',
-            'bathrooms': r'(\d+)\s*(?:salles? de bain|bathrooms?)',
-            'floor': r'(\d+)(?:er?|ème)?\s*étage',
-            'year': r'(?:année|year|construit?)\s*:?\s*(\d{4})'
-        }
-        
-        text = soup.get_text()
-        for key, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match and key not in details:
-                details[key] = match.group(1)
+    def join(self):
+        """Attend la fin de tous les téléchargements en cours"""
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            wait_futures(pending)
     
-    def extract_vehicle_details(self, soup: BeautifulSoup, details: Dict):
-        """Extrait les détails spécifiques aux véhicules"""
-        patterns = {
-            'mileage': r'(\d+[\d\s]*)\s*(?:km|kilomètres?)',
-            'year': r'(?:année|year|modèle)\s*:?\s*(\d{4})',
-            'fuel': r'(?:carburant|fuel)\s*:?\s*(diesel|essence|électrique|hybride)',
-            'transmission': r'(?:transmission|boîte)\s*:?\s*(manuelle?|automatique?)',
-            'power': r'(\d+)\s*(?:cv|ch|hp)'
-        }
-        
-        text = soup.get_text()
-        for key, pattern in patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match and key not in details:
-                details[key] = match.group(1)
+    def close(self):
+        """Termine les téléchargements puis libère les connexions"""
+        self.join()
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.store is not None:
+            self.store.save()
+
+
+# Déclinaisons produites par le post-traitement : nom -> plus grand côté (pixels)
+IMAGE_RENDITIONS = {'large': 1280, 'medium': 720, 'small': 320}
+IMAGE_FORMATS = {'webp': 'WEBP', 'avif': 'AVIF', 'jpg': 'JPEG'}
+
+
+def image_format_supported(fmt: str) -> bool:
+    """Indique si Pillow sait écrire le format (AVIF : Pillow 11.2+ ou pillow-avif-plugin)"""
+    return Image is not None and f".{fmt}" in Image.registered_extensions()
+
+
+def process_image(path: str, output_dir: str, renditions: Dict[str, int],
+                  formats: List[str], quality: int = 80) -> Dict:
+    """
+    Vérifie une image téléchargée et produit ses déclinaisons
     
-    def normalize_key(self, key: str) -> str:
-        """Normalise les clés pour uniformiser les données"""
-        translations = {
-            'superficie': 'surface',
-            'pièces': 'rooms',
-            'chambres': 'bedrooms',
-            'année': 'year',
-            'kilométrage': 'mileage',
-            'carburant': 'fuel',
-            'boîte de vitesse': 'transmission',
-            'puissance': 'power',
-            'étage': 'floor'
-        }
+    Le fichier téléchargé n'est jamais modifié (il peut être un lien vers le
+    stockage partagé) : les déclinaisons, redressées selon l'EXIF puis
+    enregistrées sans métadonnées, sont écrites dans output_dir.
+    
+    Args:
+        path: Image téléchargée
+        output_dir: Dossier des déclinaisons
+        renditions: Nom -> plus grand côté en pixels (jamais agrandi)
+        formats: Formats des déclinaisons ('webp', 'avif', 'jpg')
+        quality: Qualité d'encodage
         
-        key_lower = key.lower()
-        return translations.get(key_lower, key_lower.replace(' ', '_'))
+    Returns:
+        Format réel, dimensions et taille du fichier, et pour chaque
+        déclinaison ses fichiers par format ; ou {'error': ...} si l'image
+        est illisible
+    """
+    start = time.perf_counter()
+    try:
+        with Image.open(path) as img:
+            img.verify()
+        with Image.open(path) as img:
+            info = {
+                'format': (img.format or '').lower(),
+                'width': img.width,
+                'height': img.height,
+                'bytes': os.path.getsize(path)
+            }
+            if renditions:
+                img = ImageOps.exif_transpose(img)
+                img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+    except Exception as e:
+        return {'error': str(e), 'seconds': time.perf_counter() - start}
     
-    def extract_seller_info(self, soup: BeautifulSoup) -> Dict:
-        """Extrait les informations du vendeur"""
-        seller = {'name': '', 'phone': '', 'type': ''}
+    basename = os.path.splitext(os.path.basename(path))[0]
+    info['renditions'] = {}
+    if renditions:
+        os.makedirs(output_dir, exist_ok=True)
+    for name, size in renditions.items():
+        resized = img.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        files = {}
+        for fmt in formats:
+            image = resized.convert('RGB') if fmt == 'jpg' else resized
+            target = os.path.join(output_dir, f"{basename}_{name}.{fmt}")
+            image.save(target, IMAGE_FORMATS[fmt], quality=quality)
+            files[fmt] = {'path': target, 'bytes': os.path.getsize(target)}
+        info['renditions'][name] = {'width': resized.width, 'height': resized.height, **files}
+    
+    info['seconds'] = time.perf_counter() - start
+    return info
+
+
+class ImagePostProcessor:
+    """
+    Post-traitement des images téléchargées dans un pool de processus
+    
+    Le décodage et l'encodage des images occupent le CPU : ils sont répartis
+    sur tous les cœurs, en parallèle des téléchargements et du crawl.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, renditions: Optional[Dict[str, int]] = None,
+                 formats: Optional[List[str]] = None, quality: int = 80):
+        """
+        Args:
+            workers: Nombre de processus (None = un par cœur)
+            renditions: Déclinaisons à produire (par défaut IMAGE_RENDITIONS)
+            formats: Formats des déclinaisons (par défaut ['webp'])
+            quality: Qualité d'encodage
+        """
+        if Image is None:
+            raise ValueError("Le post-traitement des images nécessite: pip install Pillow")
+        self.renditions = IMAGE_RENDITIONS if renditions is None else renditions
+        self.formats = formats or ['webp']
+        for fmt in self.formats:
+            if fmt not in IMAGE_FORMATS:
+                raise ValueError(f"Format d'image inconnu: {fmt}")
+            if not image_format_supported(fmt):
+                raise ValueError(f"Pillow ne sait pas écrire le format {fmt} "
+                                 f"(AVIF: Pillow >= 11.2 ou pip install pillow-avif-plugin)")
+        self.quality = quality
+        # 'spawn' : les processus ne sont pas des copies d'un parent plein de threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(), mp_context=multiprocessing.get_context('spawn')
+        )
+        self._pending = set()
+        self._lock = threading.Lock()
+    
+    def submit(self, path: str, renditions: bool = True,
+               on_done: Optional[Callable[[Optional[Dict]], None]] = None) -> Future:
+        """
+        Planifie le post-traitement d'une image
         
-        # Nom du vendeur
-        name_selectors = ['.seller-name', '.vendor-name', '[class*="seller"]']
-        for selector in name_selectors:
-            element = soup.select_one(selector)
-            if element:
-                seller['name'] = element.text.strip()
-                break
+        Args:
+            path: Image téléchargée
+            renditions: Si False, l'image est seulement vérifiée et mesurée
+            on_done: Appelé avec le résultat de process_image(), ou None si le
+                pool n'a pas pu traiter l'image
+        """
+        output_dir = os.path.join(os.path.dirname(path), 'renditions')
+        future = self.executor.submit(
+            process_image, path, output_dir, self.renditions if renditions else {},
+            self.formats, self.quality
+        )
+        with self._lock:
+            self._pending.add(future)
         
-        # Téléphone
-        phone_selectors = ['a[href^="tel:"]', '.phone', '[class*="phone"]']
-        for selector in phone_selectors:
-            element = soup.select_one(selector)
-            if element:
-                phone = element.text.strip()
-                if not phone and element.get('href'):
-                    phone = element['href'].replace('tel:', '')
-                seller['phone'] = phone
-                break
+        def done(future: Future):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Post-traitement impossible de {path}: {e}")
+                result = None
+            try:
+                if on_done is not None:
+                    on_done(result)
+            except Exception as e:
+                logger.error(f"Erreur après post-traitement de {path}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(future)
         
-        # Type (particulier/professionnel)
-        text = soup.get_text().lower()
-        if 'professionnel' in text or 'agence' in text:
-            seller['type'] = 'professionnel'
-        elif 'particulier' in text:
-            seller['type'] = 'particulier'
+        future.add_done_callback(done)
+        return future
+    
+    def pending(self) -> int:
+        """Nombre d'images en attente de post-traitement"""
+        with self._lock:
+            return len(self._pending)
+    
+    def join(self):
+        """Attend la fin de tous les post-traitements en cours"""
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            wait_futures(pending)
+    
+    def close(self):
+        self.join()
+        self.executor.shutdown(wait=True)
+
+
+class SeenAdsIndex:
+    """
+    Index SQLite des annonces déjà vues, pour le mode incrémental
+    
+    Pour chaque annonce : URL, catégorie, dates de première et dernière
+    apparition, empreinte de la carte du listing (titre, prix affichés...)
+    et empreinte du contenu extrait.
+    """
+    
+    def __init__(self, path: str = "data/seen_ads.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ads (
+                ad_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                category TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                listing_fingerprint TEXT,
+                content_fingerprint TEXT
+            )
+        """)
+        self.conn.commit()
+    
+    @staticmethod
+    def fingerprint(value) -> str:
+        """Empreinte stable d'un texte ou d'une structure JSON"""
+        if not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(value.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def content_fingerprint(cls, ad_data: Dict) -> str:
+        """Empreinte des champs significatifs d'une annonce extraite"""
+        return cls.fingerprint({
+            key: ad_data.get(key)
+            for key in ('title', 'price', 'currency', 'description', 'location', 'details')
+        } | {'images': [img['url'] for img in ad_data.get('images', [])]})
+    
+    def needs_refresh(self, ad_id: str, listing_fingerprint: Optional[str]) -> bool:
+        """
+        Indique si la page de détail d'une annonce doit être (re)chargée
         
-        return seller
+        Une annonce inconnue, ou dont la carte du listing a changé, doit l'être.
+        Sans empreinte de listing, une annonce déjà connue est considérée inchangée.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT listing_fingerprint FROM ads WHERE ad_id = ?", (ad_id,)
+            ).fetchone()
+        if row is None:
+            return True
+        return listing_fingerprint is not None and row[0] != listing_fingerprint
     
-    def extract_metadata(self, soup: BeautifulSoup) -> Dict:
-        """Extrait les métadonnées de l'annonce"""
-        metadata = {'views': 0, 'posted_date': '', 'modified_date': ''}
+    def touch(self, ad_ids: List[str]):
+        """Met à jour la date de dernière apparition d'annonces inchangées"""
+        if not ad_ids:
+            return
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE ads SET last_seen = ? WHERE ad_id = ?",
+                [(now, ad_id) for ad_id in ad_ids]
+            )
+            self.conn.commit()
+    
+    def record(self, ad_data: Dict, listing_fingerprint: Optional[str]):
+        """Enregistre (ou met à jour) une annonce extraite avec succès"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO ads (ad_id, url, category, first_seen, last_seen,
+                                 listing_fingerprint, content_fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ad_id) DO UPDATE SET
+                    url = excluded.url,
+                    category = excluded.category,
+                    last_seen = excluded.last_seen,
+                    listing_fingerprint = COALESCE(excluded.listing_fingerprint, ads.listing_fingerprint),
+                    content_fingerprint = excluded.content_fingerprint
+            """, (
+                ad_data['ad_id'], ad_data['url'], ad_data.get('category', ''), now, now,
+                listing_fingerprint, self.content_fingerprint(ad_data)
+            ))
+            self.conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# Mots du texte des annonces, pour les empreintes MinHash
+WORD_RE = re.compile(r'\w+')
+
+# Permutations MinHash : h(x) = (a * x + b) mod p, tirées une fois pour toutes
+MINHASH_PRIME = (1 << 61) - 1
+MINHASH_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), 'big') % MINHASH_PRIME | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), 'big') % MINHASH_PRIME)
+    for i in range(64)
+]
+
+
+def minhash(text: str, min_tokens: int = 8) -> Optional[List[int]]:
+    """
+    Signature MinHash (64 valeurs) d'un texte : mots et paires de mots, sans accents ni casse
+    
+    La part de valeurs égales entre deux signatures estime la similarité de
+    Jaccard des deux textes. Renvoie None pour un texte trop court pour être comparé.
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    words = WORD_RE.findall(''.join(c for c in text if not unicodedata.combining(c)))
+    if len(words) < min_tokens:
+        return None
+    
+    features = {
+        int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    }
+    return [min((a * x + b) % MINHASH_PRIME for x in features) & 0xFFFFFFFF
+            for a, b in MINHASH_PERMUTATIONS]
+
+
+def image_dhash(path: str) -> Optional[int]:
+    """
+    Empreinte perceptuelle (dHash 64 bits) d'une image
+    
+    L'image réduite à 9x8 en niveaux de gris est résumée par le sens des
+    écarts de luminosité entre pixels voisins : recadrage léger, recompression
+    ou redimensionnement ne changent que quelques bits.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            pixels = img.convert('L').resize((9, 8), Image.LANCZOS).tobytes()
+    except (OSError, ValueError):
+        return None
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = value << 1 | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+class DuplicateIndex:
+    """
+    Index des empreintes des annonces pour détecter les republications
+    
+    Chaque annonce a une signature MinHash de son titre et de sa description,
+    et une empreinte dHash par image téléchargée. Les empreintes sont
+    découpées en bandes (LSH) rangées dans un index SQLite : seules les
+    annonces partageant au moins une bande sont comparées, au lieu de toute
+    la base. L'index est conservé d'une exécution à l'autre.
+    
+    Bandes : 16 bandes de 4 valeurs MinHash (textes similaires à plus de ~50 %
+    presque toujours candidats), et 8 bandes de 8 bits dHash (deux images à
+    moins de 8 bits d'écart partagent forcément une bande).
+    
+    Une seule image commune ne suffit pas : les images doivent se recouvrir
+    (image_share du plus petit des deux jeux), les images présentes dans plus
+    de common_image_ads annonces (logo, photo d'illustration) ne comptent
+    pas, et le prix ou le texte doit aussi correspondre.
+    """
+    
+    TEXT_BANDS = 16
+    IMAGE_BANDS = 8
+    
+    def __init__(self, path: str = "data/duplicates.sqlite",
+                 text_similarity: float = 0.7, image_distance: int = 6,
+                 image_share: float = 0.5, common_image_ads: int = 5,
+                 image_text_similarity: float = 0.4):
+        """
+        Args:
+            path: Base SQLite des empreintes
+            text_similarity: Similarité de Jaccard estimée à partir de laquelle deux
+                textes sont considérés comme la même annonce
+            image_distance: Écart maximal (bits dHash) entre deux images identiques
+            image_share: Part minimale d'images communes, rapportée au plus petit
+                des deux jeux d'images
+            common_image_ads: Nombre d'annonces au-delà duquel une image est
+                trop courante pour désigner une annonce
+            image_text_similarity: Similarité de texte qui confirme des images
+                communes quand le prix a changé
+        """
+        self.path = path
+        self.text_similarity = text_similarity
+        self.image_distance = min(image_distance, self.IMAGE_BANDS - 1)
+        self.image_share = image_share
+        self.common_image_ads = common_image_ads
+        self.image_text_similarity = image_text_similarity
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ads (
+                ad_id TEXT PRIMARY KEY,
+                url TEXT,
+                price TEXT
+            );
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                ad_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS fingerprints_band ON fingerprints (kind, band, value);
+            CREATE INDEX IF NOT EXISTS fingerprints_ad ON fingerprints (ad_id, kind);
+        """)
+        self.conn.commit()
+    
+    @staticmethod
+    def encode(kind: str, fingerprint) -> str:
+        if kind == 'text':
+            return ''.join(f"{value:08x}" for value in fingerprint)
+        return f"{fingerprint:016x}"
+    
+    @staticmethod
+    def decode(kind: str, text: str):
+        if kind == 'text':
+            return [int(text[i:i + 8], 16) for i in range(0, len(text), 8)]
+        return int(text, 16)
+    
+    def bands(self, kind: str, fingerprint) -> List[Tuple[int, int]]:
+        """Découpe d'une empreinte en (numéro de bande, valeur de la bande)"""
+        if kind == 'text':
+            rows = len(fingerprint) // self.TEXT_BANDS
+            return [
+                (band, int.from_bytes(hashlib.blake2b(
+                    repr(fingerprint[band * rows:(band + 1) * rows]).encode(), digest_size=7
+                ).digest(), 'big'))
+                for band in range(self.TEXT_BANDS)
+            ]
+        width = 64 // self.IMAGE_BANDS
+        return [(band, fingerprint >> (band * width) & ((1 << width) - 1))
+                for band in range(self.IMAGE_BANDS)]
+    
+    def similarity(self, kind: str, a, b) -> float:
+        """Similarité de deux empreintes, entre 0 et 1"""
+        if kind == 'text':
+            return sum(x == y for x, y in zip(a, b)) / len(a)
+        return 1 - bin(a ^ b).count('1') / 64
+    
+    def candidates(self, kind: str, fingerprint, exclude_ad_id: str) -> Dict[str, Tuple[str, float]]:
+        """
+        Annonces indexées proches d'une empreinte, au-delà du seuil de similarité
         
-        # Vues
-        views_pattern = r'(\d+)\s*(?:vues?|views?)'
-        views_match = re.search(views_pattern, soup.get_text(), re.IGNORECASE)
-        if views_match:
-            metadata['views'] = int(views_match.group(1))
+        Returns:
+            {ad_id: (url, meilleure similarité)}
+        """
+        threshold = self.text_similarity if kind == 'text' else 1 - self.image_distance / 64
+        bands = self.bands(kind, fingerprint)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT f.ad_id, a.url, f.hash FROM fingerprints f "
+                "JOIN ads a ON a.ad_id = f.ad_id WHERE f.kind = ? AND f.ad_id != ? "
+                # Une annonce déjà indexée n'est comparée qu'à celles vues avant elle
+                "AND a.rowid < COALESCE((SELECT rowid FROM ads WHERE ad_id = ?), 9223372036854775807) AND ("
+                + " OR ".join("(f.band = ? AND f.value = ?)" for _ in bands) + ")",
+                [kind, exclude_ad_id, exclude_ad_id] + [v for band in bands for v in band]
+            ).fetchall()
+        found: Dict[str, Tuple[str, float]] = {}
+        for ad_id, url, other in rows:
+            score = self.similarity(kind, fingerprint, self.decode(kind, other))
+            if score >= threshold and score > found.get(ad_id, (url, -1.0))[1]:
+                found[ad_id] = (url, score)
+        return found
+    
+    def find(self, kind: str, fingerprints: List, exclude_ad_id: str) -> Optional[Dict]:
+        """
+        Annonce indexée la plus proche, au-delà du seuil de similarité
         
-        # Date de publication
-        date_selectors = ['.posted-date', '.publish-date', '[class*="date"]']
-        for selector in date_selectors:
-            element = soup.select_one(selector)
-            if element:
-                metadata['posted_date'] = element.text.strip()
-                break
+        Returns:
+            {'ad_id', 'url', 'match', 'similarity'} ou None
+        """
+        best = None
+        for fingerprint in fingerprints:
+            for ad_id, (url, score) in self.candidates(kind, fingerprint, exclude_ad_id).items():
+                if best is None or score > best['similarity']:
+                    best = {'ad_id': ad_id, 'url': url, 'match': kind, 'similarity': round(score, 3)}
+        return best
+    
+    def add(self, kind: str, fingerprints: List, ad_data: Dict):
+        """Remplace les empreintes d'un type pour une annonce"""
+        ad_id = ad_data['ad_id']
+        encoded = list(dict.fromkeys(self.encode(kind, fingerprint) for fingerprint in fingerprints))
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO ads (ad_id, url, price) VALUES (?, ?, ?) "
+                "ON CONFLICT(ad_id) DO UPDATE SET url = excluded.url, price = excluded.price",
+                (ad_id, ad_data['url'], str(ad_data.get('price') or ''))
+            )
+            self.conn.execute("DELETE FROM fingerprints WHERE ad_id = ? AND kind = ?", (ad_id, kind))
+            self.conn.executemany(
+                "INSERT INTO fingerprints (ad_id, kind, hash, band, value) VALUES (?, ?, ?, ?, ?)",
+                [(ad_id, kind, text, band, value)
+                 for text in encoded for band, value in self.bands(kind, self.decode(kind, text))]
+            )
+            self.conn.commit()
+    
+    def check_text(self, ad_data: Dict) -> Optional[Dict]:
+        """Compare le titre et la description aux annonces indexées, puis indexe l'annonce"""
+        signature = minhash(f"{ad_data.get('title', '')} {ad_data.get('description', '')}")
+        if signature is None:
+            return None
+        match = self.find('text', [signature], ad_data['ad_id'])
+        # Même texte mais prix différent : annonce voisine plutôt que republication
+        if match is not None and not self._same_price(match['ad_id'], ad_data):
+            match = None
+        self.add('text', [signature], ad_data)
+        return match
+    
+    def check_images(self, ad_data: Dict) -> Optional[Dict]:
+        """Compare les images téléchargées aux annonces indexées, puis indexe l'annonce"""
+        hashes = [
+            value for value in (
+                image_dhash(img['local_path']) for img in ad_data.get('images', []) if img.get('local_path')
+            ) if value is not None
+        ]
+        if not hashes:
+            return None
+        hashes = list(dict.fromkeys(hashes))
         
-        return metadata
+        # Images communes par annonce candidate, sans les images trop courantes
+        shared: Dict[str, List[float]] = {}
+        urls: Dict[str, str] = {}
+        own_images = 0
+        for image_hash in hashes:
+            found = self.candidates('image', image_hash, ad_data['ad_id'])
+            if len(found) > self.common_image_ads:
+                continue
+            own_images += 1
+            for ad_id, (url, score) in found.items():
+                shared.setdefault(ad_id, []).append(score)
+                urls[ad_id] = url
+        
+        best = None
+        if shared:
+            image_counts = self._image_counts(list(shared))
+            signature = minhash(f"{ad_data.get('title', '')} {ad_data.get('description', '')}")
+            for ad_id, scores in shared.items():
+                if len(scores) < self.image_share * min(own_images, image_counts.get(ad_id, 0)):
+                    continue
+                if not ((ad_data.get('price') and self._same_price(ad_id, ad_data))
+                        or self._text_similarity(ad_id, signature) >= self.image_text_similarity):
+                    continue
+                score = sum(scores) / len(scores)
+                if best is None or (len(scores), score) > (best['images'], best['similarity']):
+                    best = {'ad_id': ad_id, 'url': urls[ad_id], 'match': 'image',
+                            'similarity': round(score, 3), 'images': len(scores)}
+        self.add('image', hashes, ad_data)
+        return best
+    
+    def _image_counts(self, ad_ids: List[str]) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.conn.execute(
+                "SELECT ad_id, count(DISTINCT hash) FROM fingerprints WHERE kind = 'image' "
+                f"AND ad_id IN ({', '.join('?' * len(ad_ids))}) GROUP BY ad_id", ad_ids
+            ).fetchall())
+    
+    def _text_similarity(self, ad_id: str, signature) -> float:
+        if signature is None:
+            return 0.0
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT hash FROM fingerprints WHERE ad_id = ? AND kind = 'text' LIMIT 1", (ad_id,)
+            ).fetchone()
+        return self.similarity('text', signature, self.decode('text', row[0])) if row else 0.0
+    
+    def _same_price(self, ad_id: str, ad_data: Dict) -> bool:
+        with self._lock:
+            row = self.conn.execute("SELECT price FROM ads WHERE ad_id = ?", (ad_id,)).fetchone()
+        return row is None or row[0] == str(ad_data.get('price') or '')
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class JsonlResultWriter:
+    """
+    Écriture en flux des annonces, une ligne JSON par annonce
+    
+    Chaque ligne est écrite et vidée vers le système dès que l'annonce est prête ;
+    fsync n'est appelé que par lots. Le document final au format habituel peut
+    être reconstruit à partir du fichier sans charger toutes les annonces.
+    """
+    
+    def __init__(self, path: str, fsync_every: int = 20):
+        """
+        Args:
+            path: Fichier .jsonl (ouvert en ajout, une reprise le complète)
+            fsync_every: Nombre d'annonces entre deux fsync
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._file = open(path, 'a', encoding='utf-8')
+    
+    def write(self, category_key: str, ad_data: Dict):
+        """Ajoute une annonce au fichier"""
+        line = json.dumps({'category_key': category_key, 'ad': ad_data}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+    
+    def sync(self):
+        """Force l'écriture sur le disque des annonces en attente"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+    
+    def iter_records(self):
+        """Parcourt les enregistrements (category_key, annonce) du fichier"""
+        self.sync()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt brutal
+                    logger.warning(f"Ligne illisible ignorée dans {self.path}")
+                    continue
+                yield record['category_key'], record['ad']
+    
+    def write_document(self, filename: str, metadata: Dict):
+        """
+        Écrit le document final {'metadata', 'ads_by_category'} à partir du flux
+        
+        Une passe par catégorie : seule une annonce à la fois est en mémoire.
+        """
+        category_keys = []
+        for category_key, _ in self.iter_records():
+            if category_key not in category_keys:
+                category_keys.append(category_key)
+        
+        def indented(value, level: int) -> str:
+            text = json.dumps(value, ensure_ascii=False, indent=2)
+            return text.replace('\n', '\n' + '  ' * level)
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('{\n  "metadata": ' + indented(metadata, 1) + ',\n  "ads_by_category": {')
+            for cat_idx, category_key in enumerate(category_keys):
+                f.write(',' if cat_idx else '')
+                f.write(f'\n    {json.dumps(category_key)}: [')
+                first = True
+                for record_key, ad_data in self.iter_records():
+                    if record_key != category_key:
+                        continue
+                    f.write('' if first else ',')
+                    f.write('\n      ' + indented(ad_data, 3))
+                    first = False
+                f.write('\n    ]' if not first else ']')
+            f.write('\n  }\n}' if category_keys else '}\n}')
+    
+    def close(self):
+        self.sync()
+        with self._lock:
+            self._file.close()
+
+
+class CrawlCheckpoint:
+    """
+    Point de reprise d'un crawl, sauvegardé de façon atomique en JSON
+    
+    Contient la configuration du crawl, le fichier JSONL de sortie, les
+    catégories terminées et, pour la catégorie en cours, la prochaine page de
+    listing à charger ainsi que les URLs d'annonces trouvées et terminées.
+    """
+    
+    def __init__(self, path: str = "data/checkpoint.json", config: Optional[Dict] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {
+            'created_at': datetime.now().isoformat(),
+            'config': config or {},
+            'output_path': None,
+            'stats': {},
+            'completed_categories': [],
+            'current': None
+        }
+    
+    @classmethod
+    def load(cls, path: str = "data/checkpoint.json") -> 'CrawlCheckpoint':
+        """Recharge un point de reprise existant"""
+        checkpoint = cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint.state = json.load(f)
+        return checkpoint
+    
+    @property
+    def config(self) -> Dict:
+        return self.state['config']
+    
+    def save(self, stats: Optional[Dict] = None):
+        """Écrit le point de reprise (fichier temporaire puis renommage)"""
+        with self._lock:
+            if stats is not None:
+                self.state['stats'] = {k: v for k, v in stats.items() if isinstance(v, int)}
+            data = json.dumps(self.state, ensure_ascii=False, indent=2)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+    
+    def is_completed(self, category_key: str) -> bool:
+        return category_key in self.state['completed_categories']
+    
+    def category_state(self, category_key: str) -> Dict:
+        """État de la catégorie en cours (réinitialisé si c'est une autre catégorie)"""
+        with self._lock:
+            current = self.state['current']
+            if not current or current['category'] != category_key:
+                current = {
+                    'category': category_key,
+                    'next_page': 1,
+                    'listing_done': False,
+                    'ad_urls': [],
+                    'done_urls': []
+                }
+                self.state['current'] = current
+            return current
+    
+    def update_listing(self, next_page: int, ad_urls: List[str], listing_done: bool = False):
+        """Enregistre la progression de la pagination de la catégorie en cours"""
+        with self._lock:
+            current = self.state['current']
+            current['next_page'] = next_page
+            current['ad_urls'] = list(ad_urls)
+            current['listing_done'] = listing_done
+    
+    def mark_ad_done(self, ad_url: str):
+        with self._lock:
+            self.state['current']['done_urls'].append(ad_url)
+    
+    def finish_category(self, category_key: str):
+        with self._lock:
+            self.state['completed_categories'].append(category_key)
+            self.state['current'] = None
+    
+    def remove(self):
+        """Supprime le point de reprise une fois le crawl terminé"""
+        for path in (self.path, f"{self.path}.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class HtmlArchive:
+    """
+    Archive compressée des pages brutes (listings et annonces), façon WARC
+    
+    Chaque page est un enregistrement (en-têtes WARC + corps) compressé
+    indépendamment (membre gzip ou trame zstd) et ajouté au segment courant ;
+    index.jsonl donne pour chaque enregistrement son segment, son décalage et
+    sa longueur, ce qui permet de relire une page sans décompresser le reste.
+    """
+    
+    EXTENSIONS = {'gzip': '.warc.gz', 'zstd': '.warc.zst'}
+    
+    def __init__(self, root: str = "data/archive", compression: str = 'gzip',
+                 max_segment_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            root: Dossier de l'archive
+            compression: 'gzip' ou 'zstd' (nécessite le paquet zstandard)
+            max_segment_bytes: Taille à partir de laquelle un nouveau segment est ouvert
+        """
+        if compression not in self.EXTENSIONS:
+            raise ValueError(f"Compression inconnue: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("La compression 'zstd' nécessite: pip install zstandard")
+        
+        self.root = root
+        self.compression = compression
+        self.max_segment_bytes = max_segment_bytes
+        os.makedirs(root, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._segment = None
+        self._segment_name = None
+        self._segment_count = len([name for name in os.listdir(root) if name.startswith('segment-')])
+        self._index = open(os.path.join(root, 'index.jsonl'), 'a', encoding='utf-8')
+    
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=6).compress(data)
+        return gzip.compress(data, compresslevel=6)
+    
+    def _open_segment(self):
+        """Ouvre un nouveau segment (un par exécution, puis à chaque dépassement de taille)"""
+        if self._segment is not None:
+            self._segment.close()
+        self._segment_count += 1
+        self._segment_name = f"segment-{self._segment_count:05d}{self.EXTENSIONS[self.compression]}"
+        self._segment = open(os.path.join(self.root, self._segment_name), 'ab')
+    
+    def add(self, url: str, content: str, page_type: str, source: str,
+            content_type: str = 'text/html'):
+        """
+        Ajoute une page à l'archive
+        
+        Args:
+            url: URL de la page
+            content: Contenu brut (HTML ou JSON)
+            page_type: 'listing' ou 'ad'
+            source: Origine du contenu : 'selenium', 'http' ou 'next-data'
+            content_type: Type MIME du contenu
+        """
+        body = content.encode('utf-8')
+        date = datetime.now().isoformat()
+        header = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {date}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"X-Page-Type: {page_type}\r\n"
+            f"X-Fetch-Source: {source}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode('utf-8')
+        record = self._compress(header + body + b"\r\n\r\n")
+        
+        with self._lock:
+            if self._segment is None or self._segment.tell() >= self.max_segment_bytes:
+                self._open_segment()
+            offset = self._segment.tell()
+            self._segment.write(record)
+            self._segment.flush()
+            
+            self._index.write(json.dumps({
+                'url': url,
+                'page_type': page_type,
+                'source': source,
+                'date': date,
+                'segment': self._segment_name,
+                'offset': offset,
+                'length': len(record)
+            }, ensure_ascii=False) + '\n')
+            self._index.flush()
+    
+    @staticmethod
+    def iter_index(root: str = "data/archive"):
+        """Parcourt les entrées de l'index d'une archive"""
+        with open(os.path.join(root, 'index.jsonl'), 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+    
+    @staticmethod
+    def read(root: str, entry: Dict) -> str:
+        """Relit le contenu d'une page archivée à partir de son entrée d'index"""
+        with open(os.path.join(root, entry['segment']), 'rb') as f:
+            f.seek(entry['offset'])
+            data = f.read(entry['length'])
+        
+        if entry['segment'].endswith('.zst'):
+            if zstandard is None:
+                raise ValueError("Lecture d'une archive zstd: pip install zstandard")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = gzip.decompress(data)
+        
+        _, _, body = data.partition(b"\r\n\r\n")
+        return body[:-4].decode('utf-8')
+    
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+            self._index.close()
+
+
+def resolve_driver_path(cache_path: str = "data/chromedriver.json",
+                        refresh: bool = False) -> Optional[str]:
+    """
+    Trouve le binaire chromedriver sans solliciter le réseau à chaque exécution
+    
+    Ordre : variable CHROMEDRIVER_PATH, chemin mis en cache par une exécution
+    précédente, webdriver-manager (téléchargement, puis mise en cache), et enfin
+    un chromedriver présent dans le PATH.
+    
+    Args:
+        cache_path: Fichier mémorisant le chemin obtenu via webdriver-manager
+        refresh: Ignore le cache (par exemple après une mise à jour de Chrome)
+        
+    Returns:
+        Le chemin du binaire, ou None pour laisser Selenium Manager le résoudre
+    """
+    env_path = os.environ.get('CHROMEDRIVER_PATH')
+    if env_path:
+        return env_path
+    
+    if not refresh and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f).get('path')
+            if cached and os.path.exists(cached):
+                return cached
+        except (OSError, ValueError):
+            pass
+    
+    try:
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        logger.warning(f"webdriver-manager indisponible ({e}), recherche de chromedriver dans le PATH")
+        return shutil.which('chromedriver')
+    
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'resolved_at': datetime.now().isoformat()}, f)
+    except OSError as e:
+        logger.warning(f"Mise en cache du chemin de chromedriver impossible: {e}")
+    return path
+
+
+# Messages de Chrome/chromedriver signalant une session perdue (crash du rendu, etc.)
+DEAD_SESSION_MARKERS = (
+    'invalid session id', 'session deleted', 'disconnected', 'tab crashed',
+    'chrome not reachable', 'target window already closed', 'no such window'
+)
+
+
+def is_dead_session(error: Exception) -> bool:
+    """Indique si une erreur Selenium signifie que le navigateur est inutilisable"""
+    if isinstance(error, (InvalidSessionIdException, Urllib3Error, ConnectionError)):
+        return True
+    message = str(getattr(error, 'msg', None) or error).lower()
+    return any(marker in message for marker in DEAD_SESSION_MARKERS)
+
+
+class DriverPool:
+    """
+    Pool de navigateurs Chrome prêtés aux threads du scraper
+    
+    Un driver est recyclé (fermé puis remplacé au prochain besoin) après
+    max_pages chargements ou quand ses processus dépassent max_rss_mb de
+    mémoire (si psutil est installé). Le pool peut garder des navigateurs de
+    réserve démarrés en arrière-plan, pour que ni le début du crawl ni un
+    recyclage n'attendent le lancement de Chrome.
+    """
+    
+    def __init__(self, factory: Callable, max_pages: int = 200,
+                 max_rss_mb: Optional[int] = 1500, spare: int = 0):
+        """
+        Args:
+            factory: Fonction lançant un nouveau driver
+            max_pages: Nombre de pages chargées avant recyclage (0 = jamais)
+            max_rss_mb: Mémoire maximale de Chrome (Mo) avant recyclage (None = illimitée)
+            spare: Nombre de navigateurs gardés prêts en réserve
+        """
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.spare = spare
+        self.recycled = 0
+        self._idle = queue.Queue()
+        self._drivers: Dict[int, object] = {}
+        self._pages: Dict[int, int] = {}
+        self._warming = 0
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    def _start(self):
+        driver = self.factory()
+        with self._lock:
+            self._drivers[id(driver)] = driver
+            self._pages[id(driver)] = 0
+        return driver
+    
+    def _warm_one(self):
+        try:
+            driver = self._start()
+        except Exception as e:
+            logger.error(f"Préchauffage d'un navigateur impossible: {e}")
+            driver = None
+        
+        with self._lock:
+            self._warming -= 1
+            closed = self._closed
+        if driver is None:
+            return
+        if closed:
+            self.discard(driver)
+        else:
+            self._idle.put(driver)
+    
+    def warm(self, count: int):
+        """Démarre en arrière-plan de quoi avoir count navigateurs libres"""
+        with self._lock:
+            missing = count - self._idle.qsize() - self._warming
+            if self._closed or missing <= 0:
+                return
+            self._warming += missing
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, name="voursa-driver-warmup", daemon=True).start()
+    
+    def acquire(self):
+        """Prête un navigateur libre, en attend un en préchauffage, ou en lance un"""
+        driver = None
+        while driver is None:
+            try:
+                driver = self._idle.get(timeout=0.5) if self._warming else self._idle.get_nowait()
+            except queue.Empty:
+                if not self._warming:
+                    break
+        if driver is None:
+            driver = self._start()
+        if self.spare:
+            self.warm(self.spare)
+        return driver
+    
+    def release(self, driver):
+        """Rend un navigateur au pool (ou le ferme s'il doit être recyclé)"""
+        if self._closed or self.needs_recycle(driver):
+            self.discard(driver)
+        else:
+            self._idle.put(driver)
+    
+    def idle(self) -> int:
+        """Nombre de navigateurs libres, prêts à être prêtés"""
+        return self._idle.qsize()
+    
+    def page_loaded(self, driver):
+        """Comptabilise un chargement de page pour le driver"""
+        with self._lock:
+            if id(driver) in self._pages:
+                self._pages[id(driver)] += 1
+    
+    def rss_mb(self, driver) -> Optional[float]:
+        """Mémoire résidente (Mo) de chromedriver et des processus Chrome qu'il a lancés"""
+        pid = getattr(getattr(getattr(driver, 'service', None), 'process', None), 'pid', None)
+        if psutil is None or pid is None:
+            return None
+        try:
+            process = psutil.Process(pid)
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    pass
+        except psutil.Error:
+            return None
+        return rss / (1024 * 1024)
+    
+    def total_rss_mb(self) -> Optional[float]:
+        """Mémoire résidente (Mo) de tous les navigateurs du pool"""
+        with self._lock:
+            drivers = list(self._drivers.values())
+        sizes = [self.rss_mb(driver) for driver in drivers]
+        if not sizes or None in sizes:
+            return None
+        return sum(sizes)
+    
+    def needs_recycle(self, driver) -> bool:
+        """Indique si le driver a atteint sa limite de pages ou de mémoire"""
+        with self._lock:
+            pages = self._pages.get(id(driver), 0)
+        if self.max_pages and pages >= self.max_pages:
+            return True
+        if self.max_rss_mb and pages:
+            rss = self.rss_mb(driver)
+            if rss is not None and rss > self.max_rss_mb:
+                logger.info(f"Navigateur à {rss:.0f} Mo après {pages} pages")
+                return True
+        return False
+    
+    def discard(self, driver):
+        """Ferme un navigateur usé ou mort et l'oublie"""
+        with self._lock:
+            self._drivers.pop(id(driver), None)
+            self._pages.pop(id(driver), None)
+            self.recycled += 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Fermeture d'un navigateur recyclé: {e}")
+    
+    def close(self):
+        """Ferme tous les navigateurs, prêtés ou libres"""
+        with self._lock:
+            self._closed = True
+            drivers = list(self._drivers.values())
+            self._drivers.clear()
+            self._pages.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+                logger.info("Driver fermé correctement")
+            except Exception as e:
+                logger.error(f"Erreur fermeture driver: {e}")
+
+
+# Bornes (secondes) des histogrammes de durée des étapes
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class ScraperMetrics:
+    """
+    Mesures du crawl, exposées au format texte de Prometheus
+    
+    Histogrammes de durée par étape (chargement, attente du DOM, parsing,
+    téléchargement des images...), compteurs (octets transférés, réponses
+    HTTP, essais et succès de chaque sélecteur des listes de repli) et jauges
+    lues à la demande (profondeur des files d'attente). Les mesures peuvent
+    être écrites dans un fichier (collecteur textfile de node_exporter) ou
+    servies en HTTP sur /metrics.
+    """
+    
+    def __init__(self, prefix: str = 'voursa'):
+        self.prefix = prefix
+        self._histograms: Dict[str, List] = {}
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._server = None
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Chronomètre le bloc et l'ajoute à l'histogramme de l'étape"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+    
+    def observe(self, stage: str, seconds: float):
+        """Ajoute une durée (secondes) à l'histogramme d'une étape"""
+        idx = next((i for i, bound in enumerate(METRIC_BUCKETS) if seconds <= bound), len(METRIC_BUCKETS))
+        with self._lock:
+            histogram = self._histograms.setdefault(stage, [[0] * (len(METRIC_BUCKETS) + 1), 0.0])
+            histogram[0][idx] += 1
+            histogram[1] += seconds
+    
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, amount: float = 1):
+        """Incrémente un compteur, éventuellement étiqueté"""
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+    
+    def add_bytes(self, kind: str, amount: int):
+        """Comptabilise des octets reçus ('http' pour les pages, 'image' pour les images)"""
+        self.inc('bytes_received_total', {'kind': kind}, amount)
+    
+    def selector(self, field: str, selector: str, hit: bool):
+        """Comptabilise l'essai d'un sélecteur de repli, et son succès"""
+        labels = {'field': field, 'selector': selector}
+        self.inc('selector_attempts_total', labels)
+        if hit:
+            self.inc('selector_hits_total', labels)
+    
+    def gauge(self, name: str, read: Callable[[], float]):
+        """Enregistre une jauge, lue à chaque export"""
+        with self._lock:
+            self._gauges[name] = read
+    
+    def stage_total(self, stage: str) -> Tuple[int, float]:
+        """(nombre de mesures, durée cumulée en secondes) d'une étape"""
+        with self._lock:
+            counts, total = self._histograms.get(stage, ([], 0.0))
+            return sum(counts), total
+    
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        """Valeur d'un compteur"""
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted((labels or {}).items())), 0)
+    
+    def selector_rates(self) -> List[Tuple[str, str, int, int]]:
+        """(champ, sélecteur, succès, essais) pour chaque sélecteur essayé"""
+        with self._lock:
+            attempts = dict(self._counters.get('selector_attempts_total', {}))
+            hits = dict(self._counters.get('selector_hits_total', {}))
+        return [
+            (dict(key)['field'], dict(key)['selector'], int(hits.get(key, 0)), int(count))
+            for key, count in sorted(attempts.items())
+        ]
+    
+    @staticmethod
+    def _labels(labels) -> str:
+        if not labels:
+            return ''
+        escaped = (
+            f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+            for key, value in labels
+        )
+        return '{' + ','.join(escaped) + '}'
+    
+    def render(self) -> str:
+        """Toutes les mesures au format d'exposition texte de Prometheus"""
+        name = f"{self.prefix}_stage_duration_seconds"
+        lines = [f"# HELP {name} Durée des étapes du crawl", f"# TYPE {name} histogram"]
+        with self._lock:
+            histograms = {stage: (list(counts), total) for stage, (counts, total) in self._histograms.items()}
+            counters = {key: dict(series) for key, series in self._counters.items()}
+            gauges = dict(self._gauges)
+        
+        for stage, (counts, total) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(METRIC_BUCKETS + ('+Inf',), counts):
+                cumulative += count
+                labels = self._labels((('stage', stage), ('le', str(bound))))
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = self._labels((('stage', stage),))
+            lines.append(f"{name}_sum{labels} {total:.6f}")
+            lines.append(f"{name}_count{labels} {cumulative}")
+        
+        for counter, series in sorted(counters.items()):
+            lines.append(f"# TYPE {self.prefix}_{counter} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{self.prefix}_{counter}{self._labels(labels)} {value:g}")
+        
+        # Jauges lues hors du verrou : une lecture peut elle-même en prendre un
+        for gauge, read in sorted(gauges.items()):
+            try:
+                value = read()
+            except Exception as e:
+                logger.debug(f"Jauge {gauge} illisible: {e}")
+                continue
+            lines.append(f"# TYPE {self.prefix}_{gauge} gauge")
+            lines.append(f"{self.prefix}_{gauge} {value:g}")
+        
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path: str):
+        """Écrit les mesures dans un fichier, remplacé d'un seul coup"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+    
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        """Sert les mesures sur http://host:port/metrics depuis un thread d'arrière-plan"""
+        metrics = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="voursa-metrics", daemon=True).start()
+        logger.info(f"Mesures disponibles sur http://{host}:{self._server.server_port}/metrics")
+    
+    def close(self):
+        """Arrête le serveur des mesures"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class VoursaCompleteScraper:
+    """Scraper complet pour toutes les catégories de Voursa"""
+    
+    # Sélecteurs des liens d'annonces sur les pages de listing
+    # Adapter ces sélecteurs selon la structure réelle du site
+    LISTING_SELECTORS = [
+        "a[href*='/ads/']",
+        ".ad-item a",
+        ".listing-item a",
+        "[class*='ad-link']",
+        "[class*='listing-link']"
+    ]
+    NEXT_PAGE_SELECTOR = "a[rel='next'], .pagination-next, [class*='next-page']"
+    
+    # Sélecteurs des photos d'une annonce
+    IMAGE_SELECTORS = [
+        '.gallery img',
+        '.carousel img',
+        '[class*="gallery"] img',
+        '[class*="slider"] img',
+        '.ad-images img',
+        'img[src*="/uploads/"]',
+        'img[src*="/images/"]'
+    ]
+    
+    # Éléments attendus avant de lire une page, par type de page ; les photos
+    # du site sont servies par /_next/image (URL source encodée dans src)
+    READY_SELECTORS = {
+        'listing': ", ".join(LISTING_SELECTORS),
+        'ad': ", ".join(['h1'] + IMAGE_SELECTORS + ['img[src*="_next/image"]'])
+    }
+    
+    # Catégories principales du site
+    CATEGORIES = {
+        'real_estate': 'Immobilier',
+        'vehicles': 'Véhicules',
+        'electronics': 'Électronique',
+        'furniture': 'Meubles',
+        'jobs': 'Emplois',
+        'services': 'Services',
+        'fashion': 'Mode',
+        'sports': 'Sports & Loisirs',
+        'animals': 'Animaux',
+        'others': 'Autres'
+    }
+    
+    def __init__(self, ads_per_category: int = 20, headless: bool = True, 
+                 download_images: bool = True, image_quality: str = 'high',
+                 workers: int = 1, request_delay: float = 2.0,
+                 fetch_mode: str = 'selenium', image_workers: int = 8,
+                 image_store: bool = True, image_sizes: Optional[List[str]] = None,
+                 incremental: bool = False, index_path: str = "data/seen_ads.sqlite",
+                 stream_output: bool = False, final_document: bool = True,
+                 checkpoint: Optional[CrawlCheckpoint] = None,
+                 parser: str = 'html.parser', archive_dir: Optional[str] = None,
+                 browser_profile: str = 'full',
+                 blocked_resources: Optional[Dict[str, List[str]]] = None,
+                 max_pages_per_driver: int = 200, max_driver_rss_mb: Optional[int] = 1500,
+                 prewarm_drivers: bool = True, discovery: str = 'listing',
+                 listing_prefetch: int = 2, duplicates: Optional[str] = None,
+                 duplicates_path: str = "data/duplicates.sqlite",
+                 metrics_path: Optional[str] = "data/metrics.prom",
+                 metrics_port: Optional[int] = None, profile: Optional[str] = None,
+                 profile_dir: str = "data/profiles",
+                 base_url: str = "https://www.voursa.com/EN",
+                 postprocess_images: bool = False,
+                 image_renditions: Optional[Dict[str, int]] = None,
+                 image_formats: Optional[List[str]] = None,
+                 postprocess_workers: Optional[int] = None,
+                 http_cache: bool = False, http_cache_dir: str = "data/http_cache",
+                 http_cache_max_mb: int = 1024, learn_selectors: bool = False,
+                 selector_cache_path: Optional[str] = "data/selector_cache.json",
+                 search_index: Optional[str] = None):
+        """
+        Initialise le scraper
+        
+        Args:
+            ads_per_category: Nombre d'annonces à récupérer par catégorie
+            headless: Si True, lance Chrome sans interface graphique
+            download_images: Si True, télécharge les images des annonces
+            image_quality: 'high', 'medium', 'thumbnail' ou 'original' (fichier S3 source)
+            workers: Nombre d'instances Chrome travaillant en parallèle sur les annonces
+            request_delay: Délai minimal (secondes) entre deux pages d'un même hôte,
+                tous workers confondus ; allongé automatiquement quand le serveur
+                ralentit ou répond 429
+            fetch_mode: 'selenium' (navigateur) ou 'http' (requêtes HTTP et données
+                Next.js, Selenium n'étant lancé qu'en cas d'échec)
+            image_workers: Nombre de téléchargements d'images simultanés en arrière-plan
+            image_store: Si True, déduplique les images entre les exécutions via
+                un stockage adressé par contenu (images/store)
+            image_sizes: Qualités supplémentaires à enregistrer en plus de
+                image_quality, par exemple ['thumbnail']
+            incremental: Si True, ne recharge que les annonces nouvelles ou dont la
+                carte du listing a changé, et arrête la pagination sur les annonces connues
+            index_path: Base SQLite des annonces déjà vues (mode incrémental)
+            stream_output: Si True, chaque annonce est ajoutée dès qu'elle est prête à
+                data/voursa_ads_<date>.jsonl au lieu d'être gardée en mémoire
+            final_document: En mode flux, produit aussi le document JSON final
+            checkpoint: Point de reprise tenu à jour pendant le crawl (active la
+                sortie en flux, qui conserve les annonces déjà extraites)
+            parser: Backend de parsing HTML : 'html.parser', 'lxml', 'html5lib'
+                ou 'selectolax' (voir --bench-parsers pour les comparer)
+            archive_dir: Si renseigné, conserve le HTML brut des listings et des
+                annonces dans une archive compressée (voir --reparse)
+            browser_profile: 'full' (Chrome charge tout) ou 'lean' (ni images, ni
+                styles, ni polices, ni traceurs ; chargement 'eager')
+            blocked_resources: Familles de ressources bloquées par type de page,
+                remplaçant celles du profil, par exemple {'ad': ['images', 'trackers']}
+            max_pages_per_driver: Pages chargées par un navigateur avant son
+                remplacement (0 = jamais)
+            max_driver_rss_mb: Mémoire de Chrome (Mo) au-delà de laquelle le
+                navigateur est remplacé (nécessite psutil)
+            prewarm_drivers: En mode selenium, démarre les navigateurs en
+                arrière-plan dès le début du crawl et en garde un en réserve
+            discovery: 'listing' (pagination des catégories) ou 'sitemap' (URLs
+                lues dans le sitemap du site, avec repli sur la pagination)
+            listing_prefetch: En mode http, nombre de pages de listing suivantes
+                téléchargées pendant l'analyse de la page courante
+            duplicates: Détection des republications (texte et images proches
+                d'une annonce déjà vue) : None (désactivée), 'tag' (annonce marquée
+                'duplicate_of') ou 'skip' (marquée, et ses images ne sont pas
+                téléchargées quand le texte suffit à la reconnaître)
+            duplicates_path: Base SQLite des empreintes des annonces
+            metrics_path: Fichier des mesures au format Prometheus, réécrit après
+                chaque catégorie et en fin de crawl (None = pas de fichier)
+            metrics_port: Si renseigné, sert les mesures sur
+                http://127.0.0.1:<port>/metrics pendant le crawl
+            profile: Profilage de l'extraction des annonces : None, 'cprofile'
+                (fichiers .prof) ou 'pyinstrument' (pages .html) ; une annonce
+                à la fois, le thread qui l'extrait seulement
+            profile_dir: Dossier des profils, un fichier par annonce
+            base_url: Racine du site (à remplacer par celle de MockVoursaServer
+                pour travailler hors ligne)
+            postprocess_images: Si True, chaque image téléchargée est vérifiée
+                et mesurée, et l'image principale déclinée aux tailles de
+                l'application, sans métadonnées (nécessite Pillow)
+            image_renditions: Déclinaisons (nom -> plus grand côté en pixels),
+                par défaut IMAGE_RENDITIONS
+            image_formats: Formats des déclinaisons, par défaut ['webp'] ;
+                'avif' et 'jpg' sont aussi possibles
+            postprocess_workers: Processus de post-traitement (None = un par cœur)
+            http_cache: Si True, les pages lues sans navigateur et les images sont
+                revalidées (ETag / Last-Modified) auprès du serveur et relues
+                depuis le disque quand il répond 304
+            http_cache_dir: Dossier du cache HTTP
+            http_cache_max_mb: Taille maximale des pages gardées dans le cache
+            learn_selectors: Si True, les sélecteurs de repli qui échouent
+                systématiquement sur un gabarit de page ne sont évalués que si
+                le HTML peut les satisfaire (voir SelectorCache) ; l'ordre des
+                listes et les résultats sont inchangés
+            selector_cache_path: Fichier des sélecteurs appris, conservés d'une
+                exécution à l'autre (None = non conservés)
+            search_index: Base SQLite de recherche (voir SearchIndex) mise à jour
+                au fil du crawl, une fois les images de chaque annonce terminées
+        """
+        check_parser_backend(parser)
+        if profile not in (None, 'cprofile', 'pyinstrument'):
+            raise ValueError(f"Profileur inconnu: {profile}")
+        if profile == 'pyinstrument' and Profiler is None:
+            raise ValueError("Le profilage 'pyinstrument' nécessite: pip install pyinstrument")
+        if duplicates not in (None, 'tag', 'skip'):
+            raise ValueError(f"Mode de détection des doublons inconnu: {duplicates}")
+        if discovery not in ('listing', 'sitemap'):
+            raise ValueError(f"Mode de découverte inconnu: {discovery}")
+        if browser_profile not in BROWSER_PROFILES:
+            raise ValueError(f"Profil de navigateur inconnu: {browser_profile}")
+        self.blocked_resources = {**BROWSER_PROFILES[browser_profile], **(blocked_resources or {})}
+        for families in self.blocked_resources.values():
+            for family in families:
+                if family not in RESOURCE_BLOCK_PATTERNS:
+                    raise ValueError(f"Famille de ressources inconnue: {family}")
+        for quality in [image_quality] + list(image_sizes or []):
+            if quality not in IMAGE_QUALITY_PRESETS:
+                raise ValueError(f"Qualité d'image inconnue: {quality}")
+        
+        self.ads_per_category = ads_per_category
+        self.download_images = download_images
+        self.image_quality = image_quality
+        self.image_sizes = [q for q in (image_sizes or []) if q != image_quality]
+        self.workers = max(1, workers)
+        self.fetch_mode = fetch_mode
+        self.parser = parser
+        self.browser_profile = browser_profile
+        self.discovery = discovery
+        self.listing_prefetch = max(0, listing_prefetch)
+        self.duplicates = duplicates
+        self.metrics_path = metrics_path
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self._profile_lock = threading.Lock()
+        self.base_url = base_url.rstrip('/')
+        
+        # Mesures du crawl (durées par étape, octets, sélecteurs, files d'attente)
+        self.metrics = ScraperMetrics()
+        self.selector_cache = SelectorCache(selector_cache_path) if learn_selectors else None
+        self._ad_queue: Optional[queue.Queue] = None
+        
+        # Politesse par hôte et état partagé entre les workers
+        self.rate_limiter = AdaptiveRateLimiter(request_delay)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        
+        # Configuration de Selenium
+        self.options = webdriver.ChromeOptions()
+        if headless:
+            self.options.add_argument('--headless=new')
+        
+        # Options pour éviter la détection
+        self.options.add_argument('--no-sandbox')
+        self.options.add_argument('--disable-dev-shm-usage')
+        self.options.add_argument('--disable-blink-features=AutomationControlled')
+        self.options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        self.options.add_experimental_option('useAutomationExtension', False)
+        self.options.add_argument(f'--user-agent={USER_AGENT}')
+        
+        # Profil léger : les src des images restent dans le DOM sans être téléchargées,
+        # et driver.get rend la main dès DOMContentLoaded
+        if browser_profile == 'lean':
+            self.options.page_load_strategy = 'eager'
+            self.options.add_experimental_option(
+                'prefs', {'profile.managed_default_content_settings.images': 2}
+            )
+            self.options.add_argument('--blink-settings=imagesEnabled=false')
+        
+        # Les navigateurs ne sont lancés qu'au premier besoin (ou préchauffés en mode
+        # selenium), ce qui évite de démarrer Chrome en mode HTTP sans repli
+        self._driver_path = None
+        self.prewarm_drivers = prewarm_drivers
+        self.driver_pool = DriverPool(
+            self.create_driver, max_pages=max_pages_per_driver,
+            max_rss_mb=max_driver_rss_mb, spare=1 if prewarm_drivers else 0
+        )
+        
+        # Identifiant de build Next.js, utilisé pour les routes /_next/data
+        self._next_build_id = None
+        
+        # Entrées (URL, lastmod) du sitemap, lues une fois par exécution
+        self._sitemap_entries: Optional[List[Tuple[str, str]]] = None
+        self._sitemap_lock = threading.Lock()
+        
+        # Index des annonces déjà vues et empreintes des cartes du listing courant ;
+        # hors mode flux, une annonce n'est notée vue qu'une fois sauvegardée
+        self.seen_index = None
+        self.listing_texts: Dict[str, List[str]] = {}
+        self._unsaved_seen: List[Tuple[Dict, Optional[str]]] = []
+        self._unsaved_seen_lock = threading.Lock()
+        
+        # Archive des pages brutes
+        self.archive = HtmlArchive(archive_dir) if archive_dir else None
+        
+        # Annonces des catégories terminées, sauvegardées si le crawl est interrompu
+        self.all_ads: Dict[str, List[Dict]] = {}
+        
+        # Sortie en flux (JSONL) et point de reprise
+        self.final_document = final_document
+        self.results_writer = None
+        self.checkpoint = checkpoint
+        
+        # Cache HTTP partagé par les pages et les images
+        self.http_cache = HttpCache(http_cache_dir, max_size_mb=http_cache_max_mb) if http_cache else None
+        
+        # Les images sont téléchargées en arrière-plan pendant l'extraction
+        self.image_downloader = None
+        if download_images:
+            store = ImageStore() if image_store else None
+            self.image_downloader = ImageDownloader(image_workers, store=store, metrics=self.metrics,
+                                                    cache=self.http_cache)
+        self.image_processor = None
+        if download_images and postprocess_images:
+            self.image_processor = ImagePostProcessor(
+                postprocess_workers, renditions=image_renditions, formats=image_formats
+            )
+        
+        # Créer les dossiers nécessaires
+        self.create_directories()
+        
+        if incremental:
+            self.seen_index = SeenAdsIndex(index_path)
+        self.duplicate_index = DuplicateIndex(duplicates_path) if duplicates else None
+        self.search_index = SearchIndex(search_index, batch_size=50) if search_index else None
+        if stream_output or checkpoint is not None:
+            output_path = checkpoint.state['output_path'] if checkpoint else None
+            if not output_path:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                output_path = f"data/voursa_ads_{timestamp}.jsonl"
+            self.results_writer = JsonlResultWriter(output_path)
+        
+        # Statistiques
+        self.stats = {
+            'total_ads': 0,
+            'total_images': 0,
+            'reused_images': 0,
+            'invalid_images': 0,
+            'errors': 0,
+            'duplicates': 0,
+            'start_time': datetime.now()
+        }
+        
+        if checkpoint is not None:
+            # Reprise : cumuler avec les statistiques déjà enregistrées
+            self.stats.update(checkpoint.state['stats'])
+            checkpoint.state['output_path'] = self.results_writer.path
+            checkpoint.save(self.stats)
+        
+        self.metrics.gauge('ads_scraped', lambda: self.stats['total_ads'])
+        self.metrics.gauge('images_downloaded', lambda: self.stats['total_images'])
+        self.metrics.gauge('errors', lambda: self.stats['errors'])
+        self.metrics.gauge('idle_drivers', self.driver_pool.idle)
+        self.metrics.gauge('ad_queue_depth', lambda: self._ad_queue.qsize() if self._ad_queue else 0)
+        if self.image_downloader is not None:
+            self.metrics.gauge('image_queue_depth', self.image_downloader.pending)
+        if self.image_processor is not None:
+            self.metrics.gauge('image_postprocess_queue_depth', self.image_processor.pending)
+        if profile:
+            os.makedirs(profile_dir, exist_ok=True)
+        if metrics_port is not None:
+            self.metrics.serve(metrics_port)
+    
+    @property
+    def driver(self):
+        """Driver du thread courant, emprunté au pool au premier besoin"""
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            driver = self.driver_pool.acquire()
+            self._local.driver = driver
+            self._local.wait = WebDriverWait(driver, 15)
+        return driver
+    
+    @property
+    def wait(self) -> WebDriverWait:
+        """WebDriverWait associé au driver du thread courant"""
+        self.driver
+        return self._local.wait
+    
+    def replace_driver(self):
+        """Ferme le driver du thread courant ; le suivant sera pris dans le pool"""
+        driver = getattr(self._local, 'driver', None)
+        self._local.driver = None
+        self._local.wait = None
+        self._local.blocked_urls = None
+        if driver is not None:
+            self.driver_pool.discard(driver)
+    
+    @property
+    def http(self) -> requests.Session:
+        """Session HTTP du thread courant (connexions keep-alive réutilisées)"""
+        session = getattr(self._local, 'http', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers * 2)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept-Language': 'en,fr;q=0.8,ar;q=0.6'
+            })
+            self._local.http = session
+        return session
+    
+    def create_driver(self):
+        """Lance une nouvelle instance de Chrome avec les options du scraper"""
+        if self._driver_path is None:
+            self._driver_path = resolve_driver_path()
+        try:
+            driver = webdriver.Chrome(service=Service(self._driver_path), options=self.options)
+        except SessionNotCreatedException:
+            # Chrome a pu être mis à jour depuis la mise en cache du driver
+            logger.warning("chromedriver incompatible, nouvelle résolution du binaire")
+            self._driver_path = resolve_driver_path(refresh=True)
+            driver = webdriver.Chrome(service=Service(self._driver_path), options=self.options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if self.blocked_resources:
+            driver.execute_cdp_cmd('Network.enable', {})
+        return driver
+    
+    def apply_resource_blocking(self, page_type: Optional[str]):
+        """
+        Bloque dans le navigateur du thread les ressources inutiles au type de page
+        
+        Les motifs ne sont renvoyés à Chrome que lorsque le type de page change.
+        """
+        if not self.blocked_resources:
+            return
+        patterns = [
+            pattern
+            for family in self.blocked_resources.get(page_type, [])
+            for pattern in RESOURCE_BLOCK_PATTERNS[family]
+        ]
+        driver = self.driver
+        if getattr(self._local, 'blocked_urls', None) == (id(driver), patterns):
+            return
+        try:
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            self._local.blocked_urls = (id(driver), patterns)
+        except WebDriverException as e:
+            logger.debug(f"Blocage des ressources impossible: {e}")
+    
+    def _increment_stat(self, key: str, amount: int = 1):
+        """Incrémente une statistique de façon sûre entre les threads"""
+        with self._stats_lock:
+            self.stats[key] += amount
+    
+    def load_page(self, url: str, page_type: Optional[str] = None):
+        """
+        Charge une page en respectant la limite de politesse de l'hôte
+        
+        Args:
+            url: URL de la page
+            page_type: 'listing' ou 'ad', pour attendre les éléments propres à la page
+        """
+        driver = getattr(self._local, 'driver', None)
+        if driver is not None and self.driver_pool.needs_recycle(driver):
+            logger.info("Recyclage du navigateur")
+            self.replace_driver()
+        
+        self.apply_resource_blocking(page_type)
+        with self.metrics.stage('rate_limit_wait'):
+            self.rate_limiter.wait(url)
+        start = time.monotonic()
+        with self.metrics.stage('page_load'):
+            try:
+                self.driver.get(url)
+            except (WebDriverException, Urllib3Error, ConnectionError) as e:
+                if isinstance(e, TimeoutException) or not is_dead_session(e):
+                    raise
+                # Renderer planté ou Chrome disparu : nouveau navigateur, même page
+                logger.warning(f"Session du navigateur perdue, remplacement: {e}")
+                self.metrics.inc('driver_crashes_total')
+                self.replace_driver()
+                self.apply_resource_blocking(page_type)
+                self.driver.get(url)
+        self.driver_pool.page_loaded(self.driver)
+        with self.metrics.stage('page_ready'):
+            self.wait_for_page_load(self.READY_SELECTORS.get(page_type))
+        self.rate_limiter.record(url, time.monotonic() - start)
+    
+    def http_get(self, url: str) -> Optional[requests.Response]:
+        """
+        Requête GET via la session du thread, soumise au limiteur de l'hôte
+        
+        Avec le cache HTTP, la requête est conditionnelle et une réponse 304
+        est rendue comme une réponse 200 portant le corps en cache.
+        
+        Returns:
+            La réponse (quel que soit son code), ou None si la requête a échoué
+        """
+        cached = self.http_cache.lookup(url) if self.http_cache is not None else None
+        with self.metrics.stage('rate_limit_wait'):
+            self.rate_limiter.wait(url)
+        start = time.monotonic()
+        try:
+            response = self.http.get(url, timeout=10, headers=HttpCache.conditional_headers(cached))
+        except requests.RequestException as e:
+            self.rate_limiter.record(url, time.monotonic() - start, failed=True)
+            self.metrics.inc('http_responses_total', {'status': 'error'})
+            logger.warning(f"Échec de la requête HTTP {url}: {e}")
+            return None
+        
+        self.metrics.observe('http_request', time.monotonic() - start)
+        self.metrics.inc('http_responses_total', {'status': str(response.status_code)})
+        self.metrics.add_bytes('http', len(response.content))
+        if self.http_cache is not None:
+            if response.status_code == 304 and cached is not None:
+                self.http_cache.touch(url, response.headers)
+                HttpCache.revive(response, cached, self.http_cache.read(cached))
+                self.metrics.inc('http_cache_total', {'kind': 'page', 'result': 'hit'})
+            elif response.status_code == 200:
+                self.http_cache.store(url, response.headers, body=response.content)
+                self.metrics.inc('http_cache_total', {'kind': 'page', 'result': 'miss'})
+        retry_after = response.headers.get('Retry-After', '')
+        self.rate_limiter.record(
+            url, time.monotonic() - start, response.status_code,
+            retry_after=float(retry_after) if retry_after.isdigit() else None
+        )
+        return response
+    
+    def fetch_html(self, url: str) -> Optional[str]:
+        """
+        Récupère le HTML rendu côté serveur d'une page, sans navigateur
+        
+        Args:
+            url: URL de la page
+            
+        Returns:
+            Le HTML de la page, ou None si la requête échoue
+        """
+        response = self.http_get(url)
+        if response is None:
+            return None
+        
+        if response.status_code != 200:
+            logger.warning(f"Réponse HTTP {response.status_code} pour {url}")
+            return None
+        return response.text
+    
+    def archive_page(self, url: str, content: str, page_type: str, source: str):
+        """Ajoute une page brute à l'archive, si elle est activée"""
+        if self.archive is None or not content:
+            return
+        content_type = 'application/json' if source == 'next-data' else 'text/html'
+        try:
+            self.archive.add(url, content, page_type, source, content_type)
+        except OSError as e:
+            logger.warning(f"Archivage impossible pour {url}: {e}")
+    
+    def fetch_next_data(self, url: str) -> Optional[Dict]:
+        """
+        Récupère les props Next.js d'une page via la route /_next/data
+        
+        Cette route renvoie uniquement le JSON de la page (sans HTML) ; elle
+        n'est utilisable qu'une fois l'identifiant de build connu.
+        
+        Args:
+            url: URL de la page
+            
+        Returns:
+            Le JSON de la page, ou None si la route n'est pas disponible
+        """
+        if not self._next_build_id:
+            return None
+        
+        parsed = urlparse(url)
+        data_url = f"{parsed.scheme}://{parsed.netloc}/_next/data/{self._next_build_id}{parsed.path}.json"
+        if parsed.query:
+            data_url += f"?{parsed.query}"
+        response = self.http_get(data_url)
+        try:
+            if response is not None and response.status_code == 200:
+                return response.json()
+        except ValueError as e:
+            logger.debug(f"Route /_next/data indisponible pour {url}: {e}")
+        
+        # Build obsolète ou route absente : revenir au HTML
+        self._next_build_id = None
+        return None
+    
+    def parse_next_data(self, html: str) -> Optional[Dict]:
+        """Extrait le JSON __NEXT_DATA__ d'une page HTML"""
+        match = NEXT_DATA_RE.search(html)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            return None
+        
+        if data.get('buildId'):
+            self._next_build_id = data['buildId']
+        return data
+    
+    def create_directories(self):
+        """Crée les dossiers nécessaires pour le stockage"""
+        directories = ['data', 'images', 'logs']
+        for directory in directories:
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+                logger.info(f"Dossier créé: {directory}")
+    
+    def get_category_url(self, category_key: str) -> str:
+        """Construit l'URL d'une catégorie"""
+        return f"{self.base_url}/categories/{category_key}"
+    
+    def wait_for_page_load(self, ready_selector: Optional[str] = None, timeout: float = 2.0,
+                           quiet_ms: int = 300, max_quiet_ms: int = 3000):
+        """
+        Attend que la page soit prête à être lue
+        
+        Plutôt qu'une pause fixe : chargement du document, présence de l'élément
+        dont l'extracteur a besoin, puis un court instant sans modification du
+        DOM (quiet_ms), borné par max_quiet_ms. Si l'élément n'apparaît pas
+        (mise en page inattendue), la page est lue après l'attente de stabilité.
+        
+        Args:
+            ready_selector: Sélecteur CSS de l'élément attendu (None = aucun)
+            timeout: Délai maximal d'attente de l'élément (secondes)
+            quiet_ms: Durée sans mutation du DOM considérée comme stable
+            max_quiet_ms: Durée maximale d'attente de la stabilité
+        """
+        # En chargement 'eager', le DOM suffit : les ressources restantes sont bloquées
+        ready_states = ('interactive', 'complete') if self.browser_profile == 'lean' else ('complete',)
+        try:
+            self.wait.until(
+                lambda driver: driver.execute_script("return document.readyState") in ready_states
+            )
+        except TimeoutException:
+            logger.warning("Timeout lors du chargement de la page")
+            return
+        
+        if ready_selector:
+            try:
+                WebDriverWait(self.driver, timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+                )
+            except TimeoutException:
+                logger.debug(f"Élément attendu absent après {timeout} s: {ready_selector}")
+        
+        try:
+            self.driver.execute_async_script(DOM_QUIET_SCRIPT, quiet_ms, max_quiet_ms)
+        except WebDriverException as e:
+            logger.debug(f"Attente de stabilité du DOM impossible: {e}")
+    
+    def extract_ad_urls_from_listing(self, category_url: str, max_ads: int,
+                                     start_page: int = 1,
+                                     ad_urls: Optional[List[str]] = None) -> List[str]:
+        """
+        Extrait les URLs des annonces depuis une page de catégorie
+        
+        En mode http, les pages suivantes sont téléchargées en arrière-plan
+        pendant l'analyse de la page courante (listing_prefetch).
+        
+        Args:
+            category_url: URL de la catégorie
+            max_ads: Nombre maximum d'annonces à récupérer
+            start_page: Première page à charger (reprise)
+            ad_urls: URLs déjà trouvées sur les pages précédentes (reprise)
+            
+        Returns:
+            Liste des URLs d'annonces
+        """
+        ad_urls = list(ad_urls or [])
+        seen_urls = set(ad_urls)
+        page = start_page
+        
+        if self.discovery == 'sitemap' and start_page == 1 and not ad_urls:
+            ad_urls = self.discover_from_sitemap(category_url, max_ads)
+            if ad_urls:
+                return ad_urls
+            logger.info("Aucune annonce dans le sitemap, repli sur la pagination")
+        
+        prefetcher = None
+        if self.fetch_mode == 'http' and self.listing_prefetch:
+            prefetcher = ThreadPoolExecutor(max_workers=self.listing_prefetch,
+                                            thread_name_prefix="voursa-listing")
+        pending: Dict[int, Future] = {}
+        
+        try:
+            while len(ad_urls) < max_ads:
+                try:
+                    page_url = self.listing_page_url(category_url, page)
+                    logger.info(f"Scraping page {page}: {page_url}")
+                    
+                    links, has_next = None, False
+                    with self.metrics.stage('listing_page'):
+                        if prefetcher is not None:
+                            future = pending.pop(page, None)
+                            links, has_next = (future.result() if future is not None
+                                               else self.extract_listing_links_http(page_url))
+                            # Pages suivantes : seulement si elles existent, et autant
+                            # qu'il en faut (au rythme de cette page) pour atteindre max_ads
+                            if links and has_next:
+                                remaining = max_ads - len(ad_urls) - len(links)
+                                depth = min(self.listing_prefetch, -(-remaining // len(links)))
+                                for ahead in range(page + 1, page + depth + 1):
+                                    if ahead not in pending:
+                                        pending[ahead] = prefetcher.submit(
+                                            self.extract_listing_links_http,
+                                            self.listing_page_url(category_url, ahead)
+                                        )
+                        elif self.fetch_mode == 'http':
+                            links, has_next = self.extract_listing_links_http(page_url)
+                        # Le navigateur ne prend le relais que si la page n'a pas pu être lue
+                        if links is None:
+                            links, has_next = self.extract_listing_links_selenium(page_url)
+                    
+                    links_found, known_ids = self.collect_ad_urls(links, ad_urls, seen_urls, max_ads)
+                    if len(ad_urls) >= max_ads:
+                        return ad_urls[:max_ads]
+                    
+                    if not links_found:
+                        if known_ids:
+                            logger.info(f"Page {page}: uniquement des annonces déjà connues, arrêt")
+                        else:
+                            logger.warning(f"Aucune annonce trouvée sur la page {page}")
+                        break
+                    
+                    # Vérifier s'il y a une page suivante
+                    if not has_next:
+                        logger.info("Dernière page atteinte")
+                        break
+                    
+                    page += 1
+                    if self.checkpoint is not None:
+                        self.checkpoint.update_listing(page, ad_urls)
+                        self.checkpoint.save(self.stats)
+                    
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'extraction des URLs page {page}: {e}")
+                    break
+        finally:
+            if prefetcher is not None:
+                prefetcher.shutdown(wait=False, cancel_futures=True)
+        
+        return ad_urls[:max_ads]
+    
+    def listing_page_url(self, category_url: str, page: int) -> str:
+        """URL d'une page de listing (la première page n'a pas de paramètre)"""
+        return f"{category_url}?page={page}" if page > 1 else category_url
+    
+    def collect_ad_urls(self, links: List[str], ad_urls: List[str], seen_urls: set,
+                        max_ads: int) -> Tuple[bool, List[str]]:
+        """
+        Ajoute à ad_urls les liens nouveaux, dans l'ordre, jusqu'à max_ads
+        
+        En mode incrémental, les annonces connues et inchangées sont écartées
+        et leur date de dernière apparition mise à jour.
+        
+        Returns:
+            (au moins un lien ajouté, identifiants des annonces connues écartées)
+        """
+        links_found = False
+        known_ids: Dict[str, None] = {}
+        for href in links:
+            if href in seen_urls:
+                continue
+            
+            if self.seen_index is not None:
+                ad_id = self.extract_ad_id(href)
+                if not self.seen_index.needs_refresh(ad_id, self.listing_fingerprint(href)):
+                    known_ids[ad_id] = None
+                    continue
+            
+            ad_urls.append(href)
+            seen_urls.add(href)
+            links_found = True
+            
+            if len(ad_urls) >= max_ads:
+                break
+        
+        if self.seen_index is not None:
+            self.seen_index.touch(list(known_ids))
+        return links_found, list(known_ids)
+    
+    def sitemap_entries(self) -> List[Tuple[str, str]]:
+        """
+        Toutes les URLs (avec leur lastmod) des sitemaps du site, lues une fois
+        
+        Les sitemaps sont trouvés via robots.txt, à défaut /sitemap.xml ; les
+        index de sitemaps sont suivis et leurs fichiers téléchargés en parallèle.
+        """
+        with self._sitemap_lock:
+            if self._sitemap_entries is not None:
+                return self._sitemap_entries
+            
+            parsed = urlparse(self.base_url)
+            origin = f"{parsed.scheme}://{parsed.netloc}"
+            robots = self.fetch_html(f"{origin}/robots.txt") or ''
+            pending = ROBOTS_SITEMAP_RE.findall(robots) or [f"{origin}/sitemap.xml"]
+            
+            entries = []
+            visited = set()
+            with ThreadPoolExecutor(max_workers=4, thread_name_prefix="voursa-sitemap") as executor:
+                while pending:
+                    batch = [url for url in dict.fromkeys(pending) if url not in visited]
+                    visited.update(batch)
+                    pending = []
+                    for xml in executor.map(self.fetch_sitemap, batch):
+                        for kind, body in SITEMAP_ENTRY_RE.findall(xml or ''):
+                            loc = SITEMAP_LOC_RE.search(body)
+                            if not loc:
+                                continue
+                            if kind == 'sitemap':
+                                pending.append(loc.group(1))
+                            else:
+                                lastmod = SITEMAP_LASTMOD_RE.search(body)
+                                entries.append((loc.group(1), lastmod.group(1) if lastmod else ''))
+            
+            logger.info(f"Sitemap: {len(entries)} URLs dans {len(visited)} fichiers")
+            self._sitemap_entries = entries
+            return entries
+    
+    def fetch_sitemap(self, url: str) -> Optional[str]:
+        """Télécharge un fichier sitemap, éventuellement compressé (.xml.gz)"""
+        response = self.http_get(url)
+        if response is None or response.status_code != 200:
+            return None
+        if url.endswith('.gz'):
+            try:
+                return gzip.decompress(response.content).decode('utf-8', 'replace')
+            except OSError:
+                pass
+        return response.text
+    
+    def discover_from_sitemap(self, category_url: str, max_ads: int) -> List[str]:
+        """
+        URLs des annonces d'une catégorie d'après le sitemap, les plus récentes d'abord
+        
+        La date lastmod sert d'empreinte de listing en mode incrémental : une
+        annonce modifiée depuis le dernier passage est rechargée.
+        """
+        prefix = f"{category_url}/"
+        entries = [
+            (loc, lastmod) for loc, lastmod in self.sitemap_entries()
+            if loc.startswith(prefix) and '/ads/' in loc
+        ]
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        
+        if self.seen_index is not None:
+            for loc, lastmod in entries:
+                self.remember_listing_text(loc, lastmod)
+        
+        ad_urls: List[str] = []
+        self.collect_ad_urls([loc for loc, _ in entries], ad_urls, set(), max_ads)
+        if ad_urls and self.checkpoint is not None:
+            self.checkpoint.update_listing(1, ad_urls, listing_done=True)
+            self.checkpoint.save(self.stats)
+        return ad_urls
+    
+    def remember_listing_text(self, href: str, text: str):
+        """Mémorise le texte d'un lien du listing (titre, prix...) pour son empreinte"""
+        text = text.strip()
+        if text:
+            texts = self.listing_texts.setdefault(href, [])
+            if text not in texts:
+                texts.append(text)
+    
+    def listing_fingerprint(self, href: str) -> Optional[str]:
+        """Empreinte de la carte d'une annonce dans le listing (None si sans texte)"""
+        texts = self.listing_texts.get(href)
+        return SeenAdsIndex.fingerprint(' | '.join(texts)) if texts else None
+    
+    def extract_listing_links_http(self, page_url: str) -> Tuple[Optional[List[str]], bool]:
+        """
+        Extrait les liens d'annonces d'une page de listing, sans navigateur
+        
+        Le JSON Next.js de la page est utilisé s'il contient les liens et la
+        pagination ; sinon le HTML rendu côté serveur est analysé.
+        
+        Returns:
+            (liens trouvés, existence d'une page suivante) ; une page
+            inexistante (404, au-delà de la dernière page) n'a aucun lien, et
+            les liens valent None si la page n'a pas pu être téléchargée
+        """
+        next_data = self.fetch_next_data(page_url)
+        if next_data:
+            links, has_next = self.parse_listing_next_data(next_data, page_url)
+            if links and has_next is not None:
+                self.archive_page(page_url, json.dumps(next_data, ensure_ascii=False), 'listing', 'next-data')
+                return links, has_next
+        
+        response = self.http_get(page_url)
+        if response is not None and response.status_code in (404, 410):
+            return [], False
+        if response is None or response.status_code != 200:
+            if response is not None:
+                logger.warning(f"Réponse HTTP {response.status_code} pour {page_url}")
+            return None, False
+        html = response.text
+        self.archive_page(page_url, html, 'listing', 'http')
+        self.parse_next_data(html)
+        return self.parse_listing_html(page_url, html)
+    
+    def parse_listing_html(self, page_url: str, html: str) -> Tuple[List[str], bool]:
+        """
+        Liens d'annonces et existence d'une page suivante dans le HTML d'un listing
+        
+        Returns:
+            (liens trouvés, existence d'une page suivante)
+        """
+        start = time.perf_counter()
+        page = make_page(html, self.parser)
+        page.template = page_template('listing', page_url)
+        
+        links = []
+        elements = self.first_match(page, 'listing', self.LISTING_SELECTORS,
+                                    lambda selector: page.select(selector) or None)
+        for element in elements or []:
+            href = element.get('href')
+            if href:
+                href = urljoin(page_url, href)
+                if '/ads/' in href:
+                    links.append(href)
+                    if self.seen_index is not None:
+                        self.remember_listing_text(href, element.get_text(' ', strip=True))
+        
+        next_link = page.select_one(self.NEXT_PAGE_SELECTOR)
+        has_next = (
+            next_link is not None
+            and next_link.get('disabled') is None
+            and next_link.get('aria-disabled') != 'true'
+        )
+        self.metrics.observe('parse_listing', time.perf_counter() - start)
+        return links, has_next
+    
+    def parse_listing_next_data(self, next_data: Dict, page_url: str) -> Tuple[List[str], Optional[bool]]:
+        """
+        Liens d'annonces et pagination contenus dans les props Next.js d'un listing
+        
+        Returns:
+            (liens trouvés, existence d'une page suivante ou None si la
+            pagination n'apparaît pas dans le JSON)
+        """
+        links: Dict[str, None] = {}
+        pagination: Dict[str, object] = {}
+        
+        def walk(node):
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if key in ('totalPages', 'pageCount', 'lastPage', 'hasNextPage', 'hasMore',
+                               'currentPage', 'page') and key not in pagination \
+                            and isinstance(value, (int, bool)):
+                        pagination[key] = value
+                    if isinstance(value, str) and '/ads/' in value and '/categories/' in value:
+                        href = urljoin(page_url, value)
+                        if href not in links:
+                            links[href] = None
+                            if self.seen_index is not None:
+                                self.remember_listing_text(href, ' '.join(
+                                    str(v) for v in node.values() if isinstance(v, (str, int, float))
+                                ))
+                    else:
+                        walk(value)
+            elif isinstance(node, list):
+                for item in node:
+                    walk(item)
+        
+        walk(next_data.get('pageProps') or next_data.get('props', {}).get('pageProps', {}))
+        
+        has_next = None
+        if isinstance(pagination.get('hasNextPage', pagination.get('hasMore')), bool):
+            has_next = pagination.get('hasNextPage', pagination.get('hasMore'))
+        else:
+            total = pagination.get('totalPages', pagination.get('pageCount', pagination.get('lastPage')))
+            current = pagination.get('currentPage', pagination.get('page'))
+            if isinstance(total, int) and isinstance(current, int):
+                has_next = current < total
+        return list(links), has_next
+    
+    def extract_listing_links_selenium(self, page_url: str) -> Tuple[List[str], bool]:
+        """
+        Extrait les liens d'annonces d'une page de listing rendue par Chrome
+        
+        Le DOM rendu est récupéré en un seul aller-retour WebDriver puis analysé
+        localement, plutôt qu'un appel get_attribute par lien.
+        
+        Returns:
+            (liens trouvés, existence d'une page suivante)
+        """
+        self.load_page(page_url, 'listing')
+        with self.metrics.stage('page_source'):
+            html = self.driver.page_source
+        self.archive_page(page_url, html, 'listing', 'selenium')
+        return self.parse_listing_html(page_url, html)
+    
+    def extract_ad_details(self, ad_url: str) -> Dict:
+        """
+        Extrait tous les détails d'une annonce
+        
+        Args:
+            ad_url: URL de l'annonce
+            
+        Returns:
+            Dictionnaire contenant tous les détails
+        """
+        ad_data = self.new_ad_data(ad_url)
+        
+        try:
+            logger.info(f"Extraction des détails: {ad_url}")
+            
+            if not (self.fetch_mode == 'http' and self.extract_ad_details_http(ad_url, ad_data)):
+                self.load_page(ad_url, 'ad')
+                with self.metrics.stage('page_source'):
+                    html = self.driver.page_source
+                self.archive_page(ad_url, html, 'ad', 'selenium')
+                self.parse_ad_page(html, ad_data)
+            
+            self.apply_image_quality(ad_data)
+            
+        except Exception as e:
+            logger.error(f"Erreur extraction annonce {ad_url}: {e}")
+            self._increment_stat('errors')
+        
+        return ad_data
+    
+    def new_ad_data(self, ad_url: str) -> Dict:
+        """Structure vide d'une annonce"""
+        return {
+            'url': ad_url,
+            'ad_id': self.extract_ad_id(ad_url),
+            'scraping_date': datetime.now().isoformat(),
+            'title': '',
+            'price': '',
+            'currency': '',
+            'description': '',
+            'location': '',
+            'category': '',
+            'subcategory': '',
+            'images': [],
+            'details': {},
+            'seller': {
+                'name': '',
+                'phone': '',
+                'type': ''  # particulier ou professionnel
+            },
+            'metadata': {
+                'views': 0,
+                'posted_date': '',
+                'modified_date': ''
+            }
+        }
+    
+    def apply_image_quality(self, ad_data: Dict):
+        """
+        Réécrit les URLs des images selon image_quality et image_sizes
+        
+        L'URL principale suit image_quality ; chaque qualité de image_sizes est
+        ajoutée dans 'sizes'. Les variantes d'une même photo (miniature et
+        galerie) sont d'abord regroupées, pour ne la télécharger qu'une fois.
+        """
+        parsed_base = urlparse(self.base_url)
+        origin = f"{parsed_base.scheme}://{parsed_base.netloc}"
+        
+        images = group_image_variants(ad_data['images'])
+        for img in images:
+            img['url'] = rewrite_image_url(img['url'], self.image_quality, origin)
+            if self.image_sizes:
+                img['sizes'] = {
+                    quality: {'url': rewrite_image_url(img['url'], quality, origin)}
+                    for quality in self.image_sizes
+                }
+        ad_data['images'] = images
+    
+    def extract_ad_details_http(self, ad_url: str, ad_data: Dict) -> bool:
+        """
+        Extrait une annonce sans navigateur (JSON Next.js puis HTML serveur)
+        
+        Args:
+            ad_url: URL de l'annonce
+            ad_data: Dictionnaire de l'annonce à remplir
+            
+        Returns:
+            True si l'annonce a pu être extraite, False pour basculer sur Selenium
+        """
+        next_data = self.fetch_next_data(ad_url)
+        if next_data is not None:
+            self.archive_page(ad_url, json.dumps(next_data, ensure_ascii=False), 'ad', 'next-data')
+            if self.parse_http_ad(ad_data, next_data=next_data):
+                return True
+            logger.debug(f"Pas d'annonce dans le JSON Next.js, lecture du HTML serveur: {ad_url}")
+        
+        html = self.fetch_html(ad_url)
+        if html:
+            self.archive_page(ad_url, html, 'ad', 'http')
+            if self.parse_http_ad(ad_data, html):
+                return True
+        logger.info(f"Extraction HTTP incomplète, repli sur Selenium: {ad_url}")
+        return False
+    
+    def parse_http_ad(self, ad_data: Dict, html: Optional[str] = None,
+                      next_data: Optional[Dict] = None) -> bool:
+        """
+        Remplit une annonce depuis une réponse HTTP (JSON Next.js et/ou HTML serveur)
+        
+        Returns:
+            True si l'annonce contient au moins un titre ou des images
+        """
+        if next_data is None and html:
+            next_data = self.parse_next_data(html)
+        if next_data:
+            with self.metrics.stage('parse_next_data'):
+                self.extract_from_next_data(next_data, ad_data)
+        
+        # Compléter avec le HTML serveur les champs absents du JSON
+        if html and not (ad_data['title'] and ad_data['images']):
+            self.parse_ad_page(html, ad_data, overwrite=False)
+        
+        return bool(ad_data['title'] or ad_data['images'])
+    
+    def parse_archived_ad(self, entry: Dict, content: str) -> Dict:
+        """
+        Ré-extrait une annonce à partir d'une page archivée, sans réseau
+        
+        Args:
+            entry: Entrée de l'index de l'archive
+            content: Contenu archivé (HTML ou JSON Next.js)
+            
+        Returns:
+            Les données de l'annonce, comme lors du crawl
+        """
+        ad_data = self.new_ad_data(entry['url'])
+        ad_data['scraping_date'] = entry['date']
+        
+        if entry['source'] == 'selenium':
+            self.parse_ad_page(content, ad_data)
+        elif entry['source'] == 'next-data':
+            self.parse_http_ad(ad_data, next_data=json.loads(content))
+        else:
+            self.parse_http_ad(ad_data, html=content)
+        
+        self.apply_image_quality(ad_data)
+        category_key = self.category_key_from_url(entry['url'])
+        ad_data['category'] = self.CATEGORIES.get(category_key, category_key)
+        return ad_data
+    
+    def category_key_from_url(self, url: str) -> str:
+        """Clé de catégorie contenue dans une URL (/categories/<clé>/...), 'others' à défaut"""
+        match = CATEGORY_KEY_RE.search(url)
+        return match.group(1) if match else 'others'
+    
+    def find_next_ad(self, node) -> Optional[Dict]:
+        """Recherche récursivement l'objet annonce dans les props Next.js"""
+        if isinstance(node, dict):
+            if 'title' in node and any(k in node for k in ('price', 'images', 'description')):
+                return node
+            children = node.values()
+        elif isinstance(node, list):
+            children = node
+        else:
+            return None
+        
+        for child in children:
+            found = self.find_next_ad(child)
+            if found is not None:
+                return found
+        return None
+    
+    def extract_from_next_data(self, next_data: Dict, ad_data: Dict):
+        """
+        Remplit l'annonce depuis les props Next.js (__NEXT_DATA__ ou /_next/data)
+        
+        Args:
+            next_data: JSON de la page
+            ad_data: Dictionnaire de l'annonce à remplir
+        """
+        props = next_data.get('pageProps') or next_data.get('props', {}).get('pageProps', {})
+        ad = self.find_next_ad(props)
+        if not ad:
+            return
+        
+        def text(value) -> str:
+            if isinstance(value, dict):
+                value = value.get('name') or value.get('title') or value.get('label') or ''
+            return str(value).strip() if value is not None else ''
+        
+        ad_data['title'] = text(ad.get('title'))
+        ad_data['description'] = text(ad.get('description') or ad.get('body'))
+        
+        price = ad.get('price')
+        if price not in (None, ''):
+            price_text = f"{price} {ad.get('currency', '')}".strip()
+            ad_data['price'] = self.extract_price(price_text)
+            ad_data['currency'] = text(ad.get('currency')) or self.extract_currency(price_text)
+        
+        location = ad.get('location') or ad.get('city') or ad.get('address')
+        if location:
+            ad_data['location'] = text(location)
+        
+        category = ad.get('category')
+        if category:
+            ad_data['category'] = text(category)
+        subcategory = ad.get('subcategory') or ad.get('subCategory')
+        if subcategory:
+            ad_data['subcategory'] = text(subcategory)
+        
+        images = []
+        for idx, image in enumerate(ad.get('images') or []):
+            src = image if isinstance(image, str) else (
+                image.get('url') or image.get('src') or image.get('key') or ''
+            )
+            if not src:
+                continue
+            if not src.startswith('http'):
+                src = urljoin(self.base_url, src)
+            images.append({
+                'url': src,
+                'alt': image.get('alt', '') if isinstance(image, dict) else '',
+                'title': ''
+            })
+        if images:
+            ad_data['images'] = group_image_variants(images)
+        
+        for key, value in (ad.get('details') or ad.get('attributes') or {}).items():
+            if value not in (None, '', [], {}):
+                ad_data['details'][self.normalize_key(str(key))] = text(value)
+        
+        seller = ad.get('user') or ad.get('seller') or ad.get('owner') or {}
+        if isinstance(seller, dict):
+            ad_data['seller']['name'] = text(seller.get('name') or seller.get('username'))
+            ad_data['seller']['phone'] = text(seller.get('phone') or ad.get('phone'))
+            ad_data['seller']['type'] = text(seller.get('type'))
+        
+        views = ad.get('views') or ad.get('viewCount')
+        if isinstance(views, (int, str)) and str(views).isdigit():
+            ad_data['metadata']['views'] = int(views)
+        ad_data['metadata']['posted_date'] = text(ad.get('createdAt') or ad.get('created_at'))
+        ad_data['metadata']['modified_date'] = text(ad.get('updatedAt') or ad.get('updated_at'))
+    
+    def parse_ad_page(self, html: str, ad_data: Dict, overwrite: bool = True):
+        """
+        Remplit l'annonce depuis le HTML d'une page d'annonce
+        
+        Args:
+            html: HTML de la page (rendu par Chrome ou par le serveur)
+            ad_data: Dictionnaire de l'annonce à remplir
+            overwrite: Si False, ne remplace pas les champs déjà renseignés
+        """
+        # Parser avec le backend configuré ; le texte de la page est partagé
+        start = time.perf_counter()
+        page = make_page(html, self.parser)
+        page.template = page_template('ad', ad_data['url'])
+        parsed = {}
+        
+        # Titre
+        title_selectors = ['h1', '.ad-title', '.title', '[class*="title"]']
+        element = self.select_first(page, 'title', title_selectors, require_text=True)
+        if element is not None:
+            parsed['title'] = element.text.strip()
+        
+        # Prix
+        price_selectors = ['.price', '.ad-price', '[class*="price"]']
+        element = self.select_first(page, 'price', price_selectors)
+        if element is not None:
+            price_text = element.text.strip()
+            parsed['price'] = self.extract_price(price_text)
+            parsed['currency'] = self.extract_currency(price_text)
+        
+        # Description
+        desc_selectors = ['.description', '.ad-description', '[class*="description"]']
+        element = self.select_first(page, 'description', desc_selectors)
+        if element is not None:
+            parsed['description'] = element.text.strip()
+        
+        # Localisation
+        location_selectors = ['.location', '.ad-location', '[class*="location"]', 
+                             '[class*="address"]']
+        element = self.select_first(page, 'location', location_selectors)
+        if element is not None:
+            parsed['location'] = element.text.strip()
+        
+        # Images
+        parsed['images'] = self.extract_images(page)
+        
+        # Détails spécifiques (surface, chambres, année, kilométrage, etc.)
+        parsed['details'] = self.extract_specific_details(page)
+        
+        # Informations vendeur
+        parsed['seller'] = self.extract_seller_info(page)
+        
+        # Métadonnées
+        parsed['metadata'] = self.extract_metadata(page)
+        
+        # Catégorie depuis le breadcrumb ou l'URL
+        parsed['category'] = self.extract_category(page, ad_data['url'])
+        
+        for key, value in parsed.items():
+            current = ad_data.get(key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                for sub_key, sub_value in value.items():
+                    if overwrite or not current.get(sub_key):
+                        current[sub_key] = sub_value
+            elif overwrite or not current:
+                ad_data[key] = value
+        self.metrics.observe('parse_ad', time.perf_counter() - start)
+    
+    def select_first(self, page: PageContext, field: str, selectors: List[str],
+                     require_text: bool = False):
+        """
+        Premier élément trouvé par une liste de sélecteurs de repli
+        
+        Args:
+            page: Page analysée
+            field: Champ recherché (étiquette des mesures)
+            selectors: Sélecteurs CSS, du plus précis au plus général
+            require_text: Si True, ignore les éléments sans texte
+        """
+        def probe(selector: str):
+            element = page.select_one(selector)
+            if element is None or (require_text and not element.text.strip()):
+                return None
+            return element
+        
+        return self.first_match(page, field, selectors, probe)
+    
+    def first_match(self, page: PageContext, field: str, selectors: List[str],
+                    probe: Callable[[str], object]):
+        """
+        Premier résultat (autre que None) d'une liste de sélecteurs de repli
+        
+        Avec learn_selectors, les sélecteurs qui échouent toujours sur le
+        gabarit de la page ne sont essayés que si le HTML contient leurs
+        textes indispensables ; le résultat est le même que sans cache.
+        Chaque essai est comptabilisé dans les mesures, pour repérer les
+        sélecteurs qui ne servent plus.
+        """
+        def attempt(selector: str):
+            result = probe(selector)
+            self.metrics.selector(field, selector, result is not None)
+            return result
+        
+        if self.selector_cache is None:
+            for selector in selectors:
+                result = attempt(selector)
+                if result is not None:
+                    return result
+            return None
+        
+        result, outcome = self.selector_cache.find(page.template, field, selectors, attempt,
+                                                   attributes=lambda: page.attributes)
+        self.metrics.inc('selector_cache_total', {'field': field, 'result': outcome})
+        return result
+    
+    def extract_ad_id(self, url: str) -> str:
+        """Extrait l'ID unique de l'annonce depuis l'URL"""
+        match = AD_ID_RE.search(url)
+        if match:
+            return match.group(1)
+        return hashlib.md5(url.encode()).hexdigest()[:10]
+    
+    def extract_price(self, price_text: str) -> str:
+        """Extrait le prix numérique du texte"""
+        price_match = PRICE_RE.search(price_text)
+        if price_match:
+            return price_match.group().strip().replace(' ', '').replace(',', '.')
+        return price_text
+    
+    def extract_currency(self, price_text: str) -> str:
+        """Extrait la devise du prix"""
+        currencies = ['MRU', 'EUR', '$', '€', 'USD']
+        for currency in currencies:
+            if currency in price_text:
+                return currency
+        return 'MRU'  # Devise par défaut pour la Mauritanie
+    
+    def extract_images(self, page: PageContext) -> List[Dict]:
+        """Extrait les photos distinctes de l'annonce, avec leurs variantes"""
+        images = []
+        
+        for selector in self.IMAGE_SELECTORS:
+            elements = page.select(selector)
+            self.metrics.selector('images', selector, bool(elements))
+            for img in elements:
+                src = img.get('src') or img.get('data-src')
+                if src and not src.endswith('.svg'):
+                    # Construire l'URL complète si nécessaire
+                    if not src.startswith('http'):
+                        src = urljoin(self.base_url, src)
+                    
+                    images.append({
+                        'url': src,
+                        'alt': img.get('alt', ''),
+                        'title': img.get('title', '')
+                    })
+        
+        # Une entrée par photo, quelles que soient ses variantes
+        return group_image_variants(images)
+    
+    def extract_specific_details(self, page: PageContext) -> Dict:
+        """Extrait les détails spécifiques selon le type d'annonce"""
+        details = {}
+        
+        # Chercher les paires clé-valeur
+        detail_selectors = [
+            '.detail-item',
+            '.property-detail',
+            '[class*="detail"]',
+            '.specs li',
+            '.characteristics li'
+        ]
+        
+        for selector in detail_selectors:
+            elements = page.select(selector)
+            self.metrics.selector('details', selector, bool(elements))
+            for element in elements:
+                text = element.text.strip()
+                
+                # Chercher les patterns clé:valeur
+                if ':' in text:
+                    key, value = text.split(':', 1)
+                    details[self.normalize_key(key.strip())] = value.strip()
+                elif '：' in text:  # Deux-points pleine largeur
+                    key, value = text.split('：', 1)
+                    details[self.normalize_key(key.strip())] = value.strip()
+        
+        # Chercher des patterns spécifiques
+        self.extract_real_estate_details(page, details)
+        self.extract_vehicle_details(page, details)
+        
+        return details
+    
+    def extract_real_estate_details(self, page: PageContext, details: Dict):
+        """Extrait les détails spécifiques à l'immobilier"""
+        self.apply_detail_patterns(REAL_ESTATE_PATTERNS, page.text, details)
+    
+    def extract_vehicle_details(self, page: PageContext, details: Dict):
+        """Extrait les détails spécifiques aux véhicules"""
+        self.apply_detail_patterns(VEHICLE_PATTERNS, page.text, details)
+    
+    def apply_detail_patterns(self, patterns: Dict[str, re.Pattern], text: str, details: Dict):
+        """Applique des expressions précompilées au texte de la page, sans écraser les clés existantes"""
+        for key, pattern in patterns.items():
+            if key in details:
+                continue
+            match = pattern.search(text)
+            if match:
+                details[key] = match.group(1)
+    
+    def normalize_key(self, key: str) -> str:
+        """Normalise les clés pour uniformiser les données"""
+        translations = {
+            'superficie': 'surface',
+            'pièces': 'rooms',
+            'chambres': 'bedrooms',
+            'année': 'year',
+            'kilométrage': 'mileage',
+            'carburant': 'fuel',
+            'boîte de vitesse': 'transmission',
+            'puissance': 'power',
+            'étage': 'floor'
+        }
+        
+        key_lower = key.lower()
+        return translations.get(key_lower, key_lower.replace(' ', '_'))
+    
+    def extract_seller_info(self, page: PageContext) -> Dict:
+        """Extrait les informations du vendeur"""
+        seller = {'name': '', 'phone': '', 'type': ''}
+        
+        # Nom du vendeur
+        name_selectors = ['.seller-name', '.vendor-name', '[class*="seller"]']
+        element = self.select_first(page, 'seller_name', name_selectors)
+        if element is not None:
+            seller['name'] = element.text.strip()
+        
+        # Téléphone
+        phone_selectors = ['a[href^="tel:"]', '.phone', '[class*="phone"]']
+        element = self.select_first(page, 'seller_phone', phone_selectors)
+        if element is not None:
+            phone = element.text.strip()
+            if not phone and element.get('href'):
+                phone = element['href'].replace('tel:', '')
+            seller['phone'] = phone
+        
+        # Type (particulier/professionnel)
+        text = page.text_lower
+        if 'professionnel' in text or 'agence' in text:
+            seller['type'] = 'professionnel'
+        elif 'particulier' in text:
+            seller['type'] = 'particulier'
+        
+        return seller
+    
+    def extract_metadata(self, page: PageContext) -> Dict:
+        """Extrait les métadonnées de l'annonce"""
+        metadata = {'views': 0, 'posted_date': '', 'modified_date': ''}
+        
+        # Vues
+        views_match = VIEWS_RE.search(page.text)
+        if views_match:
+            metadata['views'] = int(views_match.group(1))
+        
+        # Date de publication
+        date_selectors = ['.posted-date', '.publish-date', '[class*="date"]']
+        element = self.select_first(page, 'posted_date', date_selectors)
+        if element is not None:
+            metadata['posted_date'] = element.text.strip()
+        
+        return metadata
+    
+    def extract_category(self, page: PageContext, url: str) -> str:
+        """Extrait la catégorie depuis le breadcrumb ou l'URL"""
+        # Depuis le breadcrumb
+        breadcrumb = page.select_one('.breadcrumb, [class*="breadcrumb"]')
+        if breadcrumb:
+            items = breadcrumb.select('a, span')
+            if len(items) > 1:
+                return items[1].text.strip()
+        
+        # Depuis l'URL
+        for key, name in self.CATEGORIES.items():
+            if f'/categories/{key}' in url:
+                return name
+        
+        return 'Autres'
+    
+    def download_ad_images(self, ad_data: Dict, folder: str = "images",
+                           on_complete: Optional[Callable[[], None]] = None) -> List[Future]:
+        """
+        Planifie le téléchargement des images d'une annonce
+        
+        Les images sont téléchargées en arrière-plan ; 'local_path' est renseigné
+        et les statistiques mises à jour à la fin de chaque téléchargement.
+        
+        Args:
+            ad_data: Données de l'annonce
+            folder: Dossier de destination
+            on_complete: Appelé une fois toutes les images de l'annonce traitées
+                (immédiatement s'il n'y a rien à télécharger)
+            
+        Returns:
+            Liste des téléchargements planifiés
+        """
+        if not self.download_images or not ad_data.get('images'):
+            if on_complete is not None:
+                on_complete()
+            return []
+        
+        ad_id = ad_data['ad_id']
+        ad_folder = os.path.join(folder, ad_id)
+        os.makedirs(ad_folder, exist_ok=True)
+        
+        jobs = []
+        
+        for idx, img_data in enumerate(ad_data['images']):
+            targets = [(img_data, f"{ad_id}_{idx:03d}")]
+            for quality, size_data in img_data.get('sizes', {}).items():
+                targets.append((size_data, f"{ad_id}_{idx:03d}_{quality}"))
+            
+            for target, basename in targets:
+                img_url = target['url']
+                
+                # Déterminer l'extension
+                parsed_url = urlparse(img_url)
+                ext = os.path.splitext(parsed_url.path)[1]
+                if not ext or ext not in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
+                    ext = '.jpg'
+                
+                jobs.append((target, os.path.join(ad_folder, f"{basename}{ext}"), target is img_data))
+        
+        remaining = [len(jobs)]
+        remaining_lock = threading.Lock()
+        
+        def finish():
+            with remaining_lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished and on_complete is not None:
+                on_complete()
+        
+        def on_done(result: Optional[str], target: Dict, filepath: str, main: bool):
+            self._on_image_downloaded(result, target, filepath)
+            if not result or self.image_processor is None:
+                finish()
+                return
+            
+            # Les déclinaisons ne sont produites que pour l'image principale ;
+            # l'annonce n'est terminée qu'une fois ses images post-traitées
+            def on_processed(info: Optional[Dict]):
+                self._on_image_processed(info, target, filepath)
+                finish()
+            self.image_processor.submit(filepath, renditions=main, on_done=on_processed)
+        
+        return [
+            self.image_downloader.submit(
+                target['url'], filepath,
+                lambda result, target=target, filepath=filepath, main=main: on_done(result, target, filepath, main)
+            )
+            for target, filepath, main in jobs
+        ]
+    
+    def _on_image_downloaded(self, result: Optional[str], img_data: Dict, filepath: str):
+        """Enregistre le résultat d'un téléchargement d'image"""
+        if result:
+            img_data['local_path'] = filepath
+            self._increment_stat('total_images')
+            if result == 'reused':
+                self._increment_stat('reused_images')
+            logger.debug(f"Image téléchargée: {os.path.basename(filepath)}")
+    
+    def _on_image_processed(self, info: Optional[Dict], img_data: Dict, filepath: str):
+        """Enregistre les dimensions, la taille et les déclinaisons d'une image"""
+        if info is None:
+            return
+        if 'error' in info:
+            logger.warning(f"Image illisible {os.path.basename(filepath)}: {info['error']}")
+            img_data['invalid'] = True
+            self._increment_stat('invalid_images')
+            return
+        self.metrics.observe('image_postprocess', info.pop('seconds'))
+        if not info['renditions']:
+            del info['renditions']
+        img_data.update(info)
+    
+    def tag_duplicate(self, ad_data: Dict, match: Optional[Dict]):
+        """Marque une annonce comme republication de l'annonce trouvée (la première suffit)"""
+        if match is None or 'duplicate_of' in ad_data:
+            return
+        ad_data['duplicate_of'] = match
+        self._increment_stat('duplicates')
+        logger.info(f"Republication probable: {ad_data['ad_id']} ~ {match['ad_id']} "
+                    f"({match['match']}, similarité {match['similarity']:.0%})")
+    
+    def on_ad_complete(self, category_key: str, ad_data: Dict):
+        """Écrit une annonce terminée dans le flux et le note dans le point de reprise"""
+        self.results_writer.write(category_key, ad_data)
+        self._increment_stat('total_ads')
+        if self.checkpoint is not None:
+            self.checkpoint.mark_ad_done(ad_data['url'])
+            self.checkpoint.save(self.stats)
+    
+    def wait_for_downloads(self):
+        """Attend la fin des téléchargements (et post-traitements) d'images en arrière-plan"""
+        if self.image_downloader is not None:
+            self.image_downloader.join()
+        if self.image_processor is not None:
+            self.image_processor.join()
+    
+    def scrape_category(self, category_key: str) -> List[Dict]:
+        """
+        Scrape toutes les annonces d'une catégorie
+        
+        Args:
+            category_key: Clé de la catégorie
+            
+        Returns:
+            Liste des annonces scrapées
+        """
+        category_name = self.CATEGORIES.get(category_key, category_key)
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Scraping catégorie: {category_name}")
+        logger.info(f"{'='*50}")
+        
+        ads = []
+        category_url = self.get_category_url(category_key)
+        self.listing_texts.clear()
+        
+        # Récupérer les URLs des annonces
+        if self.checkpoint is None:
+            ad_urls = self.extract_ad_urls_from_listing(category_url, self.ads_per_category)
+        else:
+            ad_urls = self.resume_category_urls(category_key, category_url)
+        logger.info(f"Trouvé {len(ad_urls)} annonces dans {category_name}")
+        
+        # Extraire les détails de chaque annonce
+        if self.workers > 1 and len(ad_urls) > 1:
+            return self.scrape_ads_parallel(ad_urls, category_key)
+        
+        for idx, ad_url in enumerate(ad_urls, 1):
+            logger.info(f"[{idx}/{len(ad_urls)}] Extraction: {ad_url}")
+            ad_data = self.scrape_ad(ad_url, category_key)
+            if ad_data is not None:
+                ads.append(ad_data)
+        
+        return ads
+    
+    def resume_category_urls(self, category_key: str, category_url: str) -> List[str]:
+        """
+        URLs restant à extraire pour une catégorie, d'après le point de reprise
+        
+        La pagination reprend à la dernière page enregistrée ; les annonces
+        déjà écrites dans le fichier de sortie sont écartées.
+        """
+        state = self.checkpoint.category_state(category_key)
+        
+        if state['listing_done']:
+            ad_urls = state['ad_urls']
+        else:
+            if state['next_page'] > 1:
+                logger.info(f"Reprise de la pagination à la page {state['next_page']}")
+            ad_urls = self.extract_ad_urls_from_listing(
+                category_url, self.ads_per_category,
+                start_page=state['next_page'], ad_urls=state['ad_urls']
+            )
+            self.checkpoint.update_listing(state['next_page'], ad_urls, listing_done=True)
+            self.checkpoint.save(self.stats)
+        
+        done = set(state['done_urls'])
+        if done:
+            logger.info(f"Reprise: {len(done)} annonces déjà extraites dans {category_key}")
+        return [url for url in ad_urls if url not in done]
+    
+    def scrape_ad(self, ad_url: str, category_key: str) -> Optional[Dict]:
+        """
+        Extrait une annonce et télécharge ses images
+        
+        Args:
+            ad_url: URL de l'annonce
+            category_key: Clé de la catégorie de l'annonce
+            
+        Returns:
+            Les données de l'annonce, ou None en cas d'erreur
+        """
+        try:
+            with self.metrics.stage('ad'), self.profile_ad(ad_url):
+                ad_data = self.extract_ad_details(ad_url)
+            ad_data['category'] = self.CATEGORIES.get(category_key, category_key)
+            
+            listing_fingerprint = self.listing_fingerprint(ad_url)
+            
+            # Republication : le texte est comparé tout de suite, les images une
+            # fois téléchargées
+            if self.duplicate_index is not None:
+                self.tag_duplicate(ad_data, self.duplicate_index.check_text(ad_data))
+            
+            skip_images = self.duplicates == 'skip' and 'duplicate_of' in ad_data
+            
+            def on_complete():
+                if self.duplicate_index is not None:
+                    self.tag_duplicate(ad_data, self.duplicate_index.check_images(ad_data))
+                if self.search_index is not None:
+                    self.search_index.add(category_key, ad_data)
+                if self.results_writer is not None:
+                    self.on_ad_complete(category_key, ad_data)
+                
+                # Une annonce vide (extraction échouée) ou à laquelle il manque
+                # des images sera retentée au prochain passage
+                if self.seen_index is None or not (ad_data['title'] or ad_data['images']):
+                    return
+                if self.download_images and not skip_images \
+                        and not all(img.get('local_path') for img in ad_data['images']):
+                    return
+                if self.results_writer is not None:
+                    self.seen_index.record(ad_data, listing_fingerprint)
+                else:
+                    with self._unsaved_seen_lock:
+                        self._unsaved_seen.append((ad_data, listing_fingerprint))
+            
+            # Télécharger les images ; en mode flux, l'annonce est écrite (et
+            # comptée) une fois ses images terminées
+            if skip_images:
+                on_complete()
+            else:
+                self.download_ad_images(ad_data, on_complete=on_complete)
+            if self.results_writer is None:
+                self._increment_stat('total_ads')
+            return ad_data
+            
+        except Exception as e:
+            logger.error(f"Erreur annonce {ad_url}: {e}")
+            self._increment_stat('errors')
+            return None
+    
+    @contextmanager
+    def profile_ad(self, ad_url: str):
+        """
+        Profile le bloc si le profilage est activé et qu'aucune autre annonce
+        n'est en cours de profilage ; le profil est écrit dans profile_dir
+        """
+        if self.profile is None or not self._profile_lock.acquire(blocking=False):
+            yield
+            return
+        
+        path = os.path.join(self.profile_dir, self.extract_ad_id(ad_url))
+        try:
+            if self.profile == 'pyinstrument':
+                profiler = Profiler()
+                profiler.start()
+                try:
+                    yield
+                finally:
+                    profiler.stop()
+                    with open(f"{path}.html", 'w', encoding='utf-8') as f:
+                        f.write(profiler.output_html())
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    yield
+                finally:
+                    profiler.disable()
+                    profiler.dump_stats(f"{path}.prof")
+        finally:
+            self._profile_lock.release()
+    
+    def scrape_ads_parallel(self, ad_urls: List[str], category_key: str) -> List[Dict]:
+        """
+        Extrait les annonces avec un pool de workers, chacun avec son propre Chrome
+        
+        Les workers consomment une file d'URLs partagée ; la limite de politesse
+        par hôte reste globale. L'ordre des annonces de la page de listing est conservé.
+        
+        Args:
+            ad_urls: URLs des annonces à extraire
+            category_key: Clé de la catégorie des annonces
+            
+        Returns:
+            Liste des annonces scrapées
+        """
+        ad_queue = queue.Queue()
+        for idx, ad_url in enumerate(ad_urls):
+            ad_queue.put((idx, ad_url))
+        self._ad_queue = ad_queue
+        
+        results: List[Optional[Dict]] = [None] * len(ad_urls)
+        
+        def worker():
+            try:
+                while True:
+                    try:
+                        idx, ad_url = ad_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    logger.info(f"[{idx + 1}/{len(ad_urls)}] Extraction: {ad_url}")
+                    results[idx] = self.scrape_ad(ad_url, category_key)
+            finally:
+                driver = getattr(self._local, 'driver', None)
+                if driver is not None:
+                    self.driver_pool.release(driver)
+                self._local.driver = None
+                self._local.wait = None
+        
+        threads = [
+            threading.Thread(target=worker, name=f"voursa-worker-{i}", daemon=True)
+            for i in range(min(self.workers, len(ad_urls)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._ad_queue = None
+        
+        return [ad for ad in results if ad is not None]
+    
+    def scrape_all_categories(self, categories: List[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Scrape toutes les catégories spécifiées
+        
+        Args:
+            categories: Liste des clés de catégories à scraper (None = toutes)
+            
+        Returns:
+            Dictionnaire avec les annonces par catégorie
+        """
+        if categories is None:
+            categories = list(self.CATEGORIES.keys())
+        
+        if self.fetch_mode == 'selenium' and self.prewarm_drivers:
+            # Navigateur du listing et des workers, démarrés pendant la préparation
+            self.driver_pool.warm(1 + (self.workers if self.workers > 1 else 0))
+        
+        self.all_ads = all_ads = {}
+        
+        for category_key in categories:
+            if category_key not in self.CATEGORIES:
+                logger.warning(f"Catégorie inconnue: {category_key}")
+                continue
+            
+            if self.checkpoint is not None and self.checkpoint.is_completed(category_key):
+                logger.info(f"Catégorie déjà terminée, ignorée: {category_key}")
+                all_ads[category_key] = []
+                continue
+            
+            try:
+                ads = self.scrape_category(category_key)
+                
+                if self.checkpoint is not None:
+                    # Toutes les annonces doivent être écrites avant de clore la catégorie
+                    self.wait_for_downloads()
+                    self.checkpoint.finish_category(category_key)
+                    self.checkpoint.save(self.stats)
+                if self.search_index is not None:
+                    self.search_index.flush()
+                self.write_metrics()
+                
+                # En mode flux, les annonces sont déjà sur le disque
+                if self.results_writer is not None:
+                    all_ads[category_key] = []
+                    continue
+                
+                all_ads[category_key] = ads
+                
+            except Exception as e:
+                logger.error(f"Erreur catégorie {category_key}: {e}")
+                all_ads[category_key] = []
+                continue
+            
+            # Sauvegarder après chaque catégorie, une fois les chemins des images
+            # écrits dans les annonces par les threads de téléchargement
+            self.wait_for_downloads()
+            try:
+                self.save_intermediate_results(all_ads)
+            except (OSError, TypeError, ValueError) as e:
+                # Les annonces restent en mémoire pour la sauvegarde finale
+                logger.error(f"Sauvegarde intermédiaire impossible après {category_key}: {e}")
+        
+        return all_ads
+    
+    def save_intermediate_results(self, data: Dict):
+        """Sauvegarde intermédiaire des résultats"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"data/voursa_intermediate_{timestamp}.json"
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        
+        logger.debug(f"Sauvegarde intermédiaire: {filename}")
+        self.record_saved_ads(data)
+    
+    def record_saved_ads(self, data: Dict):
+        """Note comme vues, pour le mode incrémental, les annonces terminées présentes dans data"""
+        if self.seen_index is None:
+            return
+        saved = {id(ad) for ads in data.values() for ad in ads}
+        with self._unsaved_seen_lock:
+            records = [record for record in self._unsaved_seen if id(record[0]) in saved]
+            self._unsaved_seen = [record for record in self._unsaved_seen if id(record[0]) not in saved]
+        for ad_data, listing_fingerprint in records:
+            self.seen_index.record(ad_data, listing_fingerprint)
+    
+    def save_results(self, data: Dict, filename: str = None):
+        """
+        Sauvegarde les résultats finaux
+        
+        En mode flux, les annonces sont relues depuis le fichier JSONL et data
+        est ignoré ; le document final n'est produit que si final_document.
+        
+        Args:
+            data: Données à sauvegarder
+            filename: Nom du fichier (auto-généré si None)
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"data/voursa_ads_{timestamp}.json"
+        
+        # Les chemins locaux et le compteur d'images doivent être complets
+        self.wait_for_downloads()
+        
+        # Ajouter les statistiques
+        final_data = {
+            'metadata': {
+                'scraping_date': datetime.now().isoformat(),
+                'total_ads': self.stats['total_ads'],
+                'total_images': self.stats['total_images'],
+                'reused_images': self.stats['reused_images'],
+                'errors': self.stats['errors'],
+                'duration': str(datetime.now() - self.stats['start_time']),
+                'parameters': {
+                    'ads_per_category': self.ads_per_category,
+                    'download_images': self.download_images,
+                    'image_quality': self.image_quality,
+                    'image_sizes': self.image_sizes
+                }
+            },
+            'ads_by_category': data
+        }
+        
+        if self.results_writer is not None:
+            self.results_writer.sync()
+            logger.info(f"\n✅ Annonces enregistrées en flux: {self.results_writer.path}")
+            if self.final_document:
+                self.results_writer.write_document(filename, final_data['metadata'])
+                logger.info(f"✅ Résultats sauvegardés: {filename}")
+            self.print_statistics()
+            return
+        
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(final_data, f, ensure_ascii=False, indent=2)
+        
+        logger.info(f"\n✅ Résultats sauvegardés: {filename}")
+        self.record_saved_ads(data)
+        self.print_statistics()
+    
+    def write_metrics(self):
+        """Réécrit le fichier des mesures (si metrics_path est renseigné)"""
+        if self.metrics_path:
+            try:
+                self.metrics.write(self.metrics_path)
+            except OSError as e:
+                logger.warning(f"Écriture des mesures impossible: {e}")
+    
+    def print_statistics(self):
+        """Affiche les statistiques du scraping"""
+        duration = datetime.now() - self.stats['start_time']
+        
+        print("\n" + "="*50)
+        print("STATISTIQUES DU SCRAPING")
+        print("="*50)
+        print(f"📊 Annonces extraites: {self.stats['total_ads']}")
+        print(f"🖼️  Images téléchargées: {self.stats['total_images']} "
+              f"(dont {self.stats['reused_images']} reprises du stockage)")
+        if self.image_processor is not None:
+            print(f"🧪 Images illisibles: {self.stats.get('invalid_images', 0)}")
+        if self.duplicate_index is not None:
+            print(f"🔁 Republications détectées: {self.stats.get('duplicates', 0)}")
+        print(f"❌ Erreurs rencontrées: {self.stats['errors']}")
+        unused = [f"{field} {selector}" for field, selector, hits, attempts in self.metrics.selector_rates()
+                  if attempts >= 10 and not hits]
+        if unused:
+            print(f"🔎 Sélecteurs sans résultat: {', '.join(unused)}")
+        if self.selector_cache is not None:
+            rates = self.selector_cache.rates()
+            hits = sum(counts['hit'] for _, _, _, counts in rates)
+            checked = hits + sum(counts['relearn'] for _, _, _, counts in rates)
+            skipped = sum(counts['skipped'] for _, _, _, counts in rates)
+            if checked:
+                print(f"🧭 Sélecteurs appris: {hits}/{checked} inchangés ({hits / checked:.0%}), "
+                      f"{skipped} essais évités")
+            drifted = [f"{field} ({template}) ×{counts['relearn']}"
+                       for template, field, _, counts in rates if counts['relearn']]
+            if drifted:
+                print(f"🧭 Sélecteurs réappris (mise en page modifiée ?): {', '.join(drifted)}")
+        if self.metrics_path:
+            print(f"📈 Mesures: {self.metrics_path}")
+        print(f"⏱️  Durée totale: {duration}")
+        print(f"📅 Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("="*50)
+    
+    def close(self):
+        """Ferme les navigateurs et nettoie les ressources"""
+        if self.image_downloader is not None:
+            self.image_downloader.close()
+        if self.image_processor is not None:
+            self.image_processor.close()
+        self.write_metrics()
+        self.metrics.close()
+        if self.selector_cache is not None:
+            try:
+                self.selector_cache.save()
+            except OSError as e:
+                logger.warning(f"Sauvegarde des sélecteurs appris impossible: {e}")
+        if self.seen_index is not None:
+            self.seen_index.close()
+        if self.duplicate_index is not None:
+            self.duplicate_index.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+        if self.search_index is not None:
+            self.search_index.close()
+        if self.results_writer is not None:
+            self.results_writer.close()
+        if self.archive is not None:
+            self.archive.close()
+        
+        self.driver_pool.close()
+
+
+def iter_result_ads(path: str):
+    """
+    Parcourt les annonces (category_key, annonce) d'un fichier de résultats
+    
+    Accepte le document JSON final (ou celui de --reparse) comme le fichier
+    JSONL écrit en flux.
+    """
+    if path.endswith('.jsonl'):
+        yield from JsonlResultWriter(path).iter_records()
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    for category_key, ads in document.get('ads_by_category', {}).items():
+        for ad in ads:
+            yield category_key, ad
+
+
+def slugify(text: str) -> str:
+    """Slug ASCII (minuscules, tirets) ; un hachage court si le texte n'a aucun caractère latin"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    slug = re.sub(r'[^a-z0-9]+', '-', ascii_text.lower()).strip('-')
+    return slug or hashlib.sha1(text.encode('utf-8')).hexdigest()[:10]
+
+
+def sql_literal(value) -> str:
+    """Littéral SQL PostgreSQL pour une valeur Python"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (dict, list)):
+        return sql_literal(json.dumps(value, ensure_ascii=False)) + '::jsonb'
+    return "'" + str(value).replace('\x00', '').replace("'", "''") + "'"
+
+
+class ListarExporter:
+    """
+    Export des annonces vers la base PostgreSQL du backend ListarPro (listar-backend)
+    
+    Les annonces sont regroupées par lots de batch_size et chaque lot est
+    écrit en quelques requêtes multi-lignes, suivant le schéma Prisma :
+    catégories et villes dans categories (type 'category' / 'location'),
+    annonces dans listings, liens dans listing_categories et photos dans
+    galleries. Les annonces sont identifiées par le slug voursa-<ad_id> :
+    un nouvel export met à jour les annonces existantes (INSERT ... ON
+    CONFLICT), sans doublon. Les slugs des villes sont préfixés par celui
+    du pays (mr-<ville>), les slugs étant communs à toute la table categories.
+    
+    Les requêtes sont écrites dans un fichier SQL (psql -f) et, si
+    database_url est renseigné, exécutées directement (psycopg2).
+    """
+    
+    # Catégories Voursa -> slugs des catégories de l'application (prisma/seed.ts)
+    CATEGORY_SLUGS = {
+        'real_estate': 'real-estate',
+        'vehicles': 'automobiles',
+        'jobs': 'job-offers'
+    }
+    COUNTRY = {'slug': 'mr', 'name': 'Mauritanie',
+               'translations': {'en': 'Mauritania', 'fr': 'Mauritanie', 'ar': 'موريتانيا'}}
+    OWNER_EMAIL = 'voursa-import@listarpro.local'
+    
+    def __init__(self, output: Optional[str] = None, database_url: Optional[str] = None,
+                 batch_size: int = 500, status: str = 'publish',
+                 image_base_url: Optional[str] = None):
+        """
+        Args:
+            output: Fichier SQL produit (data/listar_import_<date>.sql par défaut)
+            database_url: URL PostgreSQL du backend (DATABASE_URL), pour un import direct
+            batch_size: Nombre d'annonces par lot de requêtes
+            status: Statut des nouvelles annonces ('publish' ou 'pending' pour modération)
+            image_base_url: URL publique des images téléchargées (ex:
+                http://localhost:3000/uploads/) ; à défaut, URLs d'origine
+        """
+        if database_url and psycopg2 is None:
+            raise ValueError("L'import direct dans PostgreSQL nécessite: pip install psycopg2-binary")
+        
+        if output is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output = f"data/listar_import_{timestamp}.sql"
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        
+        self.path = output
+        self.batch_size = batch_size
+        self.status = status
+        self.image_base_url = image_base_url.rstrip('/') + '/' if image_base_url else None
+        self.exported = 0
+        self._batch: List[Tuple[str, Dict]] = []
+        self._category_slugs = set()
+        self._file = open(output, 'w', encoding='utf-8')
+        # Prisma ajoute ?schema=... à DATABASE_URL, paramètre inconnu de libpq
+        self._conn = psycopg2.connect(re.sub(r'[?&]schema=[^&]*', '', database_url)) if database_url else None
+        
+        self._execute([
+            "INSERT INTO users (email, password, display_name, role, updated_at) VALUES "
+            f"({sql_literal(self.OWNER_EMAIL)}, '!', 'Voursa', 'user', now()) "
+            "ON CONFLICT (email) DO NOTHING",
+            "INSERT INTO categories (name, slug, type, translations, updated_at) VALUES "
+            f"({sql_literal(self.COUNTRY['name'])}, {sql_literal(self.COUNTRY['slug'])}, 'location', "
+            f"{sql_literal(self.COUNTRY['translations'])}, now()) ON CONFLICT (slug) DO NOTHING"
+        ])
+    
+    def _execute(self, statements: List[str]):
+        """Écrit un groupe de requêtes dans le fichier SQL et, le cas échéant, l'exécute"""
+        self._file.write("BEGIN;\n" + "".join(f"{statement};\n" for statement in statements) + "COMMIT;\n\n")
+        if self._conn is not None:
+            with self._conn:
+                with self._conn.cursor() as cursor:
+                    for statement in statements:
+                        cursor.execute(statement)
+    
+    def add(self, category_key: str, ad: Dict):
+        """Ajoute une annonce au lot courant (envoyé dès qu'il est plein)"""
+        # Une republication reste une seule fiche : celle de l'annonce d'origine
+        if not ad.get('ad_id') or not ad.get('title') or ad.get('duplicate_of'):
+            return
+        self._batch.append((category_key, ad))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+    
+    def category_slug(self, category_key: str) -> str:
+        return self.CATEGORY_SLUGS.get(category_key, category_key.replace('_', '-'))
+    
+    def image_url(self, image: Dict) -> str:
+        if self.image_base_url and image.get('local_path'):
+            return self.image_base_url + image['local_path'].replace(os.sep, '/')
+        return image['url']
+    
+    def flush(self):
+        """Envoie le lot courant en requêtes multi-lignes"""
+        if not self._batch:
+            return
+        
+        # Une même annonce ne peut apparaître qu'une fois par requête ON CONFLICT DO UPDATE
+        batch = {f"voursa-{ad['ad_id']}": (category_key, ad) for category_key, ad in self._batch}
+        
+        categories = {}
+        cities = {}
+        listings = []
+        links = []
+        photos = []
+        for slug, (category_key, ad) in batch.items():
+            category_slug = self.category_slug(category_key)
+            categories.setdefault(
+                category_slug,
+                ad.get('category') or VoursaCompleteScraper.CATEGORIES.get(category_key, category_key)
+            )
+            
+            city = (ad.get('location') or '').split(',')[0].strip()
+            city_slug = f"{self.COUNTRY['slug']}-{slugify(city)}" if city else None
+            if city_slug:
+                cities[city_slug] = city
+            
+            images = ad.get('images') or []
+            description = ad.get('description') or ''
+            price = ad.get('price')
+            listings.append((
+                ad['title'], slug, description, description[:200] or None,
+                self.status, self.image_url(images[0]) if images else None,
+                ad.get('location') or None, (ad.get('seller') or {}).get('phone') or None,
+                str(price) if price not in (None, '') else None,
+                int((ad.get('metadata') or {}).get('views') or 0), city_slug
+            ))
+            links.append((slug, category_slug))
+            for order, image in enumerate(images):
+                thumb = image.get('sizes', {}).get('thumbnail')
+                photos.append((slug, self.image_url(image), self.image_url(thumb) if thumb else None, order))
+        
+        def values(rows) -> str:
+            return ",\n".join("(" + ", ".join(sql_literal(v) for v in row) + ")" for row in rows)
+        
+        country = f"(SELECT id FROM categories WHERE slug = {sql_literal(self.COUNTRY['slug'])})"
+        owner = f"(SELECT id FROM users WHERE email = {sql_literal(self.OWNER_EMAIL)})"
+        slugs = ", ".join(sql_literal(row[1]) for row in listings)
+        
+        statements = [
+            # Les catégories déjà créées dans l'application gardent leur nom et leur icône
+            "INSERT INTO categories (name, slug, type, updated_at)\n"
+            "SELECT v.name, v.slug, 'category', now() FROM (VALUES\n"
+            + values((name, slug) for slug, name in categories.items())
+            + "\n) AS v(name, slug)\nON CONFLICT (slug) DO NOTHING",
+            "INSERT INTO categories (name, slug, type, parent_id, updated_at)\n"
+            f"SELECT v.name, v.slug, 'location', {country}, now() FROM (VALUES\n"
+            + values((name, slug) for slug, name in cities.items())
+            + "\n) AS v(name, slug)\nON CONFLICT (slug) DO NOTHING" if cities else None,
+            # Le statut n'est pas réécrit : une annonce modérée garde sa décision
+            "INSERT INTO listings (user_id, title, slug, content, excerpt, status, thumbnail, address,\n"
+            "    phone, price_min, view_count, country_id, city_id, updated_at)\n"
+            f"SELECT {owner}, v.title, v.slug, v.content, v.excerpt, v.status, v.thumbnail, v.address,\n"
+            f"    v.phone, v.price_min, v.view_count, {country}, c.id, now() FROM (VALUES\n"
+            + values(listings)
+            + "\n) AS v(title, slug, content, excerpt, status, thumbnail, address, phone, price_min,\n"
+            "    view_count, city_slug)\nLEFT JOIN categories c ON c.slug = v.city_slug AND c.type = 'location'\n"
+            "ON CONFLICT (slug) DO UPDATE SET title = EXCLUDED.title, content = EXCLUDED.content,\n"
+            "    excerpt = EXCLUDED.excerpt, thumbnail = EXCLUDED.thumbnail, address = EXCLUDED.address,\n"
+            "    phone = EXCLUDED.phone, price_min = EXCLUDED.price_min,\n"
+            "    view_count = GREATEST(listings.view_count, EXCLUDED.view_count),\n"
+            "    city_id = EXCLUDED.city_id, updated_at = now()",
+            # Liens remplacés comme les galeries : une annonce déplacée quitte son ancienne catégorie
+            "DELETE FROM listing_categories WHERE type = 'category' AND listing_id IN "
+            f"(SELECT id FROM listings WHERE slug IN ({slugs}))",
+            "INSERT INTO listing_categories (listing_id, category_id, type)\n"
+            "SELECT l.id, c.id, 'category' FROM (VALUES\n"
+            + values(links)
+            + "\n) AS v(listing_slug, category_slug)\n"
+            "JOIN listings l ON l.slug = v.listing_slug\n"
+            "JOIN categories c ON c.slug = v.category_slug AND c.type = 'category'\n"
+            "ON CONFLICT (listing_id, category_id, type) DO NOTHING",
+            # Galeries remplacées en bloc : un réexport reflète l'ordre et les photos actuels
+            f"DELETE FROM galleries WHERE listing_id IN (SELECT id FROM listings WHERE slug IN ({slugs}))",
+            "INSERT INTO galleries (listing_id, \"full\", thumb, \"order\")\n"
+            "SELECT l.id, v.full_url, v.thumb, v.position FROM (VALUES\n"
+            + values(photos)
+            + "\n) AS v(listing_slug, full_url, thumb, position)\n"
+            "JOIN listings l ON l.slug = v.listing_slug" if photos else None
+        ]
+        self._execute([statement for statement in statements if statement])
+        
+        self._category_slugs.update(categories)
+        self.exported += len(self._batch)
+        logger.info(f"Export ListarPro: {self.exported} annonces")
+        self._batch = []
+    
+    def close(self) -> str:
+        """Envoie le dernier lot, met à jour les compteurs de catégories et ferme"""
+        self.flush()
+        if self._category_slugs:
+            # Toutes les catégories : celles que des annonces ont quittées comprises
+            self._execute([
+                "UPDATE categories c SET count = (SELECT count(*) FROM listing_categories lc "
+                "WHERE lc.category_id = c.id), updated_at = now() WHERE c.type = 'category'"
+            ])
+        self._file.close()
+        if self._conn is not None:
+            self._conn.close()
+        return self.path
+
+
+def export_listar(results_path: str, output: Optional[str] = None,
+                  database_url: Optional[str] = None, batch_size: int = 500,
+                  image_base_url: Optional[str] = None) -> str:
+    """
+    Exporte un fichier de résultats vers le backend ListarPro
+    
+    Returns:
+        Le chemin du fichier SQL produit
+    """
+    start = time.perf_counter()
+    exporter = ListarExporter(output, database_url=database_url, batch_size=batch_size,
+                              image_base_url=image_base_url)
+    try:
+        for category_key, ad in iter_result_ads(results_path):
+            exporter.add(category_key, ad)
+    finally:
+        path = exporter.close()
+    
+    target = "PostgreSQL et " if database_url else ""
+    logger.info(f"✅ {exporter.exported} annonces exportées vers {target}{path} "
+                f"en {time.perf_counter() - start:.1f}s")
+    return path
+
+
+# Détails numériques des annonces : clé de details -> (colonne Parquet, type Arrow)
+NUMERIC_DETAILS = {
+    'surface': ('surface_m2', 'float64'),
+    'rooms': ('rooms', 'int32'),
+    'bedrooms': ('bedrooms', 'int32'),
+    'bathrooms': ('bathrooms', 'int32'),
+    'floor': ('floor', 'int32'),
+    'year': ('year', 'int32'),
+    'mileage': ('mileage_km', 'int64'),
+    'power': ('power_hp', 'int32')
+}
+TEXT_DETAILS = ('fuel', 'transmission')
+
+
+def parse_number_column(values: List[Optional[str]], type_alias: str = 'float64'):
+    """
+    Convertit d'un bloc une colonne de nombres écrits en texte (pyarrow.compute)
+    
+    Seul le premier nombre du texte est lu (voir parse_number) :
+    '1.500.000', '2,500,000' et '1 500 000' sont lus comme des milliers,
+    '85,5' comme un décimal, et '120 m2' donne 120. Les valeurs sans
+    nombre deviennent nulles.
+    """
+    text = pc.struct_field(
+        pc.extract_regex(pa.array(values, pa.string()), NUMBER_RE.pattern), 'number'
+    )
+    grouped = pc.match_substring_regex(text, f'^(?:{GROUPED_NUMBER_RE.pattern})$')
+    text = pc.if_else(grouped, pc.replace_substring_regex(text, r'[^\d]', ''),
+                      pc.replace_substring(text, ',', '.'))
+    numbers = pc.cast(text, pa.float64())
+    arrow_type = pa.type_for_alias(type_alias)
+    if pa.types.is_floating(arrow_type):
+        return pc.cast(numbers, arrow_type)
+    return pc.cast(pc.round(numbers), arrow_type)
+
+
+def parse_date_column(values: List[Optional[str]]):
+    """Convertit une colonne de dates ISO (2025-08-01, 2025-08-01T10:00) ou françaises (01/08/2025)"""
+    text = pc.utf8_slice_codeunits(pc.utf8_trim_whitespace(pa.array(values, pa.string())), 0, 10)
+    iso = pc.strptime(text, format='%Y-%m-%d', unit='s', error_is_null=True)
+    french = pc.strptime(text, format='%d/%m/%Y', unit='s', error_is_null=True)
+    return pc.cast(pc.coalesce(iso, french), pa.date32())
+
+
+def ads_to_table(records: List[Tuple[str, Dict]]):
+    """
+    Table Arrow typée d'un lot d'annonces
+    
+    Les champs texte sont collectés en colonnes puis convertis d'un bloc :
+    prix, détails numériques (surface, kilométrage...), vues et dates.
+    Le texte d'origine du prix, de la date de publication et des détails
+    reste disponible dans price_raw, posted_raw et details_json.
+    """
+    columns: Dict[str, List] = {name: [] for name in (
+        'category_key', 'ad_id', 'url', 'title', 'category', 'subcategory', 'price_raw',
+        'currency', 'location', 'seller_name', 'seller_phone', 'seller_type', 'views',
+        'posted_raw', 'scraping_raw', 'image_count', 'details_json', 'duplicate_of'
+    )}
+    details_columns: Dict[str, List] = {key: [] for key in list(NUMERIC_DETAILS) + list(TEXT_DETAILS)}
+    
+    for category_key, ad in records:
+        seller = ad.get('seller') or {}
+        metadata = ad.get('metadata') or {}
+        details = ad.get('details') or {}
+        columns['category_key'].append(category_key)
+        columns['ad_id'].append(str(ad.get('ad_id') or ''))
+        columns['url'].append(ad.get('url'))
+        columns['title'].append(ad.get('title'))
+        columns['category'].append(ad.get('category'))
+        columns['subcategory'].append(ad.get('subcategory'))
+        columns['price_raw'].append(str(ad.get('price') or '') or None)
+        columns['currency'].append(ad.get('currency') or None)
+        columns['location'].append(ad.get('location') or None)
+        columns['seller_name'].append(seller.get('name') or None)
+        columns['seller_phone'].append(seller.get('phone') or None)
+        columns['seller_type'].append(seller.get('type') or None)
+        columns['views'].append(str(metadata['views']) if metadata.get('views') not in (None, '') else None)
+        columns['posted_raw'].append(metadata.get('posted_date') or None)
+        columns['scraping_raw'].append(ad.get('scraping_date') or '')
+        columns['image_count'].append(len(ad.get('images') or []))
+        columns['details_json'].append(json.dumps(details, ensure_ascii=False) if details else None)
+        columns['duplicate_of'].append((ad.get('duplicate_of') or {}).get('ad_id'))
+        for key, values in details_columns.items():
+            value = details.get(key)
+            values.append(str(value) if value not in (None, '') else None)
+    
+    scraping = pa.array(columns.pop('scraping_raw'), pa.string())
+    arrays = {name: pa.array(values) if name == 'image_count' else pa.array(values, pa.string())
+              for name, values in columns.items()}
+    arrays['price'] = parse_number_column(columns['price_raw'], 'float64')
+    arrays['views'] = parse_number_column(columns['views'], 'int64')
+    arrays['posted_date'] = parse_date_column(columns['posted_raw'])
+    arrays['scraped_at'] = pc.strptime(pc.utf8_slice_codeunits(scraping, 0, 19),
+                                       format='%Y-%m-%dT%H:%M:%S', unit='s', error_is_null=True)
+    arrays['scrape_date'] = pc.utf8_slice_codeunits(scraping, 0, 10)
+    for key, (column, type_alias) in NUMERIC_DETAILS.items():
+        arrays[column] = parse_number_column(details_columns[key], type_alias)
+    for key in TEXT_DETAILS:
+        arrays[key] = pa.array(details_columns[key], pa.string())
+    return pa.table(arrays)
+
+
+def export_parquet(results_path: str, root: str = "data/parquet", batch_size: int = 5000) -> str:
+    """
+    Exporte un fichier de résultats en jeu de données Parquet partitionné
+    
+    Les fichiers sont rangés par catégorie et date de collecte
+    (category_key=<clé>/scrape_date=<AAAA-MM-JJ>/), lisibles directement par
+    pyarrow.dataset, pandas, DuckDB ou Spark avec filtrage par partition.
+    Réexporter le même fichier de résultats remplace ses fichiers Parquet.
+    
+    Returns:
+        Le dossier racine du jeu de données
+    """
+    if pa is None:
+        raise ValueError("L'export Parquet nécessite: pip install pyarrow")
+    
+    start = time.perf_counter()
+    stem = os.path.splitext(os.path.basename(results_path))[0]
+    written = 0
+    batch_no = 0
+    batch: List[Tuple[str, Dict]] = []
+    
+    def write_batch():
+        pq.write_to_dataset(
+            ads_to_table(batch), root,
+            partition_cols=['category_key', 'scrape_date'],
+            basename_template=f"{stem}-{batch_no:04d}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+    
+    for record in iter_result_ads(results_path):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            write_batch()
+            written += len(batch)
+            batch_no += 1
+            batch = []
+    if batch:
+        write_batch()
+        written += len(batch)
+    
+    logger.info(f"✅ {written} annonces exportées en Parquet dans {root} "
+                f"en {time.perf_counter() - start:.1f}s")
+    return root
+
+
+def parse_number(value) -> Optional[float]:
+    """
+    Premier nombre d'un texte, lu comme parse_number_column ; None s'il n'y en a pas
+    
+    '1 200 000 MRU' donne 1200000, '3,5' donne 3.5 et '120 m2' donne 120.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = NUMBER_RE.search(str(value or ''))
+    if match is None:
+        return None
+    text = match.group('number')
+    if GROUPED_NUMBER_RE.fullmatch(text):
+        return float(re.sub(r'\D', '', text))
+    return float(text.replace(',', '.'))
+
+
+# Tris proposés par SearchIndex.search ('relevance' : score BM25, ou plus récentes sans requête)
+SEARCH_SORTS = {
+    'relevance': None,
+    'recent': 'ads.scraped_at DESC',
+    'price': 'ads.price IS NULL, ads.price',
+    '-price': 'ads.price IS NULL, ads.price DESC',
+    'year': 'ads.year IS NULL, ads.year',
+    '-year': 'ads.year IS NULL, ads.year DESC',
+    'mileage': 'ads.mileage IS NULL, ads.mileage'
+}
+
+
+class SearchIndex:
+    """
+    Index de recherche local des annonces (SQLite FTS5)
+    
+    Le texte (titre, description, localisation, catégorie et détails
+    normalisés) est indexé en plein texte, sans tenir compte des accents ;
+    le prix, l'année et le kilométrage sont des colonnes numériques indexées
+    qui servent de filtres et de facettes. Les annonces sont identifiées par
+    leur ad_id : réindexer une annonce la met à jour, et une annonce
+    inchangée (même empreinte de contenu) n'est pas réécrite. Les
+    republications (duplicate_of) sont retirées de l'index.
+    
+    La table ads ne garde que les colonnes des filtres et de l'affichage ;
+    le texte long (description, détails) n'est stocké que dans ads_fts, pour
+    que les filtres et facettes parcourent des lignes courtes.
+    """
+    
+    # Poids BM25 des colonnes plein texte : title, description, location, category, details
+    WEIGHTS = (10.0, 1.0, 3.0, 2.0, 2.0)
+    
+    def __init__(self, path: str = "data/search.sqlite", batch_size: int = 500):
+        """
+        Args:
+            path: Base SQLite de l'index
+            batch_size: Nombre d'annonces écrites par transaction
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.indexed = 0
+        self._batch: List[Tuple[str, Dict]] = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ads (
+                id INTEGER PRIMARY KEY,
+                ad_id TEXT NOT NULL UNIQUE,
+                category_key TEXT,
+                url TEXT,
+                title TEXT,
+                location TEXT,
+                price REAL,
+                currency TEXT,
+                year INTEGER,
+                mileage INTEGER,
+                thumbnail TEXT,
+                scraped_at TEXT,
+                fingerprint TEXT
+            );
+            CREATE INDEX IF NOT EXISTS ads_facets ON ads (category_key, year, price, mileage);
+            CREATE INDEX IF NOT EXISTS ads_price ON ads (price);
+            CREATE INDEX IF NOT EXISTS ads_year ON ads (year);
+            CREATE INDEX IF NOT EXISTS ads_mileage ON ads (mileage);
+            CREATE INDEX IF NOT EXISTS ads_scraped_at ON ads (scraped_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS ads_fts USING fts5(
+                title, description, location, category, details,
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            );
+        """)
+        self.conn.commit()
+
+    def add(self, category_key: str, ad: Dict):
+        """Ajoute une annonce au lot courant (écrit dès qu'il est plein)"""
+        if not ad.get('ad_id'):
+            return
+        with self._lock:
+            self._batch.append((category_key, ad))
+            full = len(self._batch) >= self.batch_size
+        if full:
+            self.flush()
+
+    @staticmethod
+    def rows(category_key: str, ad: Dict) -> Tuple[Tuple, Tuple]:
+        """Lignes d'une annonce : colonnes de la table ads, texte de ads_fts"""
+        details = ad.get('details') or {}
+        images = ad.get('images') or []
+        year = parse_number(details.get('year'))
+        mileage = parse_number(details.get('mileage'))
+        row = (
+            category_key, ad.get('url'), ad.get('title') or '', ad.get('location') or '',
+            parse_number(ad.get('price')), ad.get('currency') or None,
+            round(year) if year is not None else None,
+            round(mileage) if mileage is not None else None,
+            (images[0].get('local_path') or images[0].get('url')) if images else None,
+            ad.get('scraping_date'), SeenAdsIndex.content_fingerprint(ad)
+        )
+        text = (
+            ad.get('title') or '', ad.get('description') or '', ad.get('location') or '',
+            ad.get('category') or '',
+            " ".join(f"{key} {value}" for key, value in details.items() if value not in (None, ''))
+        )
+        return row, text
+
+    def flush(self):
+        """Écrit le lot courant en une transaction"""
+        with self._lock:
+            batch, self._batch = self._batch, []
+            if not batch:
+                return
+            # La dernière version de chaque annonce du lot
+            ads = {str(ad['ad_id']): (category_key, ad) for category_key, ad in batch}
+            existing = {}
+            ad_ids = list(ads)
+            for i in range(0, len(ad_ids), 500):
+                chunk = ad_ids[i:i + 500]
+                existing.update((ad_id, (row_id, fingerprint)) for ad_id, row_id, fingerprint in self.conn.execute(
+                    f"SELECT ad_id, id, fingerprint FROM ads WHERE ad_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ))
+
+            with self.conn:
+                for ad_id, (category_key, ad) in ads.items():
+                    row_id, fingerprint = existing.get(ad_id, (None, None))
+                    # Une republication n'a pas sa propre fiche
+                    if ad.get('duplicate_of') or not ad.get('title'):
+                        if row_id is not None:
+                            self.conn.execute("DELETE FROM ads WHERE id = ?", (row_id,))
+                            self.conn.execute("DELETE FROM ads_fts WHERE rowid = ?", (row_id,))
+                        continue
+
+                    row, text = self.rows(category_key, ad)
+                    if row_id is None:
+                        row_id = self.conn.execute(
+                            "INSERT INTO ads (ad_id, category_key, url, title, location, price, currency, "
+                            "year, mileage, thumbnail, scraped_at, fingerprint) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (ad_id,) + row
+                        ).lastrowid
+                    elif fingerprint != row[-1]:
+                        self.conn.execute(
+                            "UPDATE ads SET category_key = ?, url = ?, title = ?, location = ?, price = ?, "
+                            "currency = ?, year = ?, mileage = ?, thumbnail = ?, scraped_at = ?, "
+                            "fingerprint = ? WHERE id = ?", row + (row_id,)
+                        )
+                        self.conn.execute("DELETE FROM ads_fts WHERE rowid = ?", (row_id,))
+                    else:
+                        continue
+                    self.conn.execute(
+                        "INSERT INTO ads_fts (rowid, title, description, location, category, details) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", (row_id,) + text
+                    )
+                    self.indexed += 1
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        """Requête FTS5 : chaque mot de la recherche, en préfixe (« toyo » trouve « Toyota »)"""
+        return " ".join(f'"{term}"*' for term in re.findall(r'\w+', query))
+
+    def search(self, query: str = '', category: Optional[str] = None,
+               price: Tuple[Optional[float], Optional[float]] = (None, None),
+               year: Tuple[Optional[float], Optional[float]] = (None, None),
+               mileage: Tuple[Optional[float], Optional[float]] = (None, None),
+               sort: str = 'relevance', limit: int = 20, offset: int = 0,
+               facets: bool = True) -> Dict:
+        """
+        Recherche des annonces
+
+        Les facettes (annonces par catégorie et par année, bornes du prix et
+        du kilométrage) portent sur tous les résultats, pas seulement la page
+        renvoyée ; elles sont calculées en un seul passage, sur l'index
+        ads_facets quand la recherche n'a pas de mots.
+
+        Args:
+            query: Mots recherchés (tous requis, en préfixe) ; vide = toutes les annonces
+            category: Clé de catégorie (ex: 'vehicles')
+            price, year, mileage: Bornes (min, max) incluses, None = sans borne
+            sort: Clé de SEARCH_SORTS
+            limit, offset: Page de résultats
+            facets: Si True, calcule les facettes
+
+        Returns:
+            {'total', 'results', 'facets', 'ms'}
+        """
+        if sort not in SEARCH_SORTS:
+            raise ValueError(f"Tri inconnu: {sort} (choix: {', '.join(SEARCH_SORTS)})")
+        start = time.perf_counter()
+        self.flush()
+
+        match = self.match_expression(query)
+        source = "ads_fts JOIN ads ON ads.id = ads_fts.rowid" if match else "ads"
+        conditions, params = [], []
+        if match:
+            conditions.append("ads_fts MATCH ?")
+            params.append(match)
+        if category:
+            conditions.append("ads.category_key = ?")
+            params.append(category)
+        for column, (low, high) in (('price', price), ('year', year), ('mileage', mileage)):
+            if low is not None:
+                conditions.append(f"ads.{column} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"ads.{column} <= ?")
+                params.append(high)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        order = SEARCH_SORTS[sort]
+        if order is None:
+            weights = ", ".join(str(weight) for weight in self.WEIGHTS)
+            order = f"bm25(ads_fts, {weights})" if match else SEARCH_SORTS['recent']
+        snippet = "snippet(ads_fts, 1, '[', ']', '…', 12)" if match else "NULL"
+
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT ads.ad_id, ads.category_key, ads.title, ads.price, ads.currency, ads.location, "
+                f"ads.year, ads.mileage, ads.url, ads.thumbnail, {snippet} FROM {source}{where} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?", params + [limit, offset]
+            ).fetchall()
+            if facets:
+                groups = self.conn.execute(
+                    f"SELECT ads.category_key, ads.year, count(*), min(ads.price), max(ads.price), "
+                    f"count(ads.price), min(ads.mileage), max(ads.mileage), count(ads.mileage) "
+                    f"FROM {source}{where} GROUP BY ads.category_key, ads.year", params
+                ).fetchall()
+                total = sum(group[2] for group in groups)
+            else:
+                total = self.conn.execute(f"SELECT count(*) FROM {source}{where}", params).fetchone()[0]
+
+        facet_counts = {}
+        if facets and total:
+            categories: Dict[str, int] = {}
+            years: Dict[int, int] = {}
+            for category_key, group_year, count, *_ in groups:
+                categories[category_key] = categories.get(category_key, 0) + count
+                if group_year is not None:
+                    years[group_year] = years.get(group_year, 0) + count
+            facet_counts['category'] = dict(sorted(categories.items(), key=lambda item: -item[1]))
+            facet_counts['year'] = dict(sorted(years.items(), reverse=True))
+            for column, offset_in_group in (('price', 3), ('mileage', 6)):
+                lows = [group[offset_in_group] for group in groups if group[offset_in_group] is not None]
+                highs = [group[offset_in_group + 1] for group in groups if group[offset_in_group + 1] is not None]
+                facet_counts[column] = {
+                    'min': min(lows) if lows else None,
+                    'max': max(highs) if highs else None,
+                    'count': sum(group[offset_in_group + 2] for group in groups)
+                }
+
+        columns = ('ad_id', 'category_key', 'title', 'price', 'currency', 'location',
+                   'year', 'mileage', 'url', 'thumbnail', 'snippet')
+        return {
+            'total': total,
+            'results': [dict(zip(columns, row)) for row in rows],
+            'facets': facet_counts,
+            'ms': (time.perf_counter() - start) * 1000
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT count(*) FROM ads").fetchone()[0]
+    
+    def close(self):
+        """Écrit le dernier lot, compacte l'index plein texte s'il a changé et ferme"""
+        self.flush()
+        with self._lock:
+            if self.indexed:
+                self.conn.execute("INSERT INTO ads_fts (ads_fts) VALUES ('optimize')")
+                self.conn.commit()
+            self.conn.close()
+
+
+def build_search_index(results_paths: List[str], index_path: str = "data/search.sqlite") -> str:
+    """
+    Indexe (ou met à jour) des fichiers de résultats dans l'index de recherche
+    
+    Returns:
+        Le chemin de l'index
+    """
+    start = time.perf_counter()
+    index = SearchIndex(index_path)
+    try:
+        for results_path in results_paths:
+            for category_key, ad in iter_result_ads(results_path):
+                index.add(category_key, ad)
+        index.flush()
+        total = index.count()
+    finally:
+        index.close()
+    
+    logger.info(f"✅ {index.indexed} annonces ajoutées ou mises à jour dans {index_path} "
+                f"({total} au total) en {time.perf_counter() - start:.1f}s")
+    return index_path
+
+
+def parse_range(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """Bornes 'MIN:MAX' d'un filtre (l'une ou l'autre peut manquer : '2015:', ':100000')"""
+    if not text:
+        return None, None
+    low, _, high = text.partition(':') if ':' in text else (text, '', text)
+    try:
+        return (float(low) if low else None), (float(high) if high else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Bornes invalides: {text} (attendu MIN:MAX)")
+
+
+def print_search_results(result: Dict):
+    """Affiche les résultats et les facettes d'une recherche"""
+    print("\n" + "="*50)
+    print(f"RECHERCHE: {result['total']} annonces ({result['ms']:.1f} ms)")
+    print("="*50)
+    for ad in result['results']:
+        price = f"{ad['price']:,.0f} {ad['currency'] or ''}".strip() if ad['price'] is not None else "prix ?"
+        extras = [str(ad['year']) if ad['year'] else '',
+                  f"{ad['mileage']:,} km" if ad['mileage'] is not None else '', ad['location'] or '']
+        print(f"  [{ad['category_key']}] {ad['title']} - {price}"
+              + "".join(f" | {extra}" for extra in extras if extra))
+        if ad['snippet']:
+            print(f"      {ad['snippet']}")
+        print(f"      {ad['url']}")
+    facets = result['facets']
+    if facets:
+        print("-"*50)
+        print("Catégories: " + ", ".join(f"{key} ({count})" for key, count in facets['category'].items()))
+        if facets['year']:
+            print("Années: " + ", ".join(f"{year} ({count})" for year, count in list(facets['year'].items())[:10]))
+        for column, unit in (('price', ''), ('mileage', ' km')):
+            values = facets[column]
+            if values['count']:
+                print(f"{'Prix' if column == 'price' else 'Kilométrage'}: "
+                      f"{values['min']:,.0f} - {values['max']:,.0f}{unit} ({values['count']} annonces)")
+    print("="*50)
+
+
+def benchmark_parsers(paths: List[str], backends: Optional[List[str]] = None,
+                      repeat: int = 3) -> Dict[str, Dict]:
+    """
+    Compare les backends de parsing sur des pages d'annonces enregistrées
     
-    def extract_category(self, soup: BeautifulSoup, url: str) -> str:
-        """Extrait la catégorie depuis le breadcrumb ou l'URL"""
-        # Depuis le breadcrumb
-        breadcrumb = soup.select_one('.breadcrumb, [class*="breadcrumb"]')
-        if breadcrumb:
-            items = breadcrumb.select('a, span')
-            if len(items) > 1:
-                return items[1].text.strip()
+    Chaque backend installé parse toutes les pages avec parse_ad_page ; la
+    sortie est comparée à celle de 'html.parser', qui sert de référence.
+    
+    Args:
+        paths: Fichiers HTML ou dossiers contenant des fichiers .html
+        backends: Backends à comparer (None = tous ceux qui sont installés)
+        repeat: Nombre de passes, le meilleur temps est retenu
         
-        # Depuis l'URL
-        for key, name in self.CATEGORIES.items():
-            if f'/categories/{key}' in url:
-                return name
+    Returns:
+        Pour chaque backend : temps total, temps par page et pages identiques
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.html')
+            ))
+        else:
+            files.append(path)
+    pages = []
+    for filepath in files:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+    if not pages:
+        raise ValueError("Aucune page HTML à comparer")
+    
+    available = []
+    for backend in backends or PARSER_BACKENDS:
+        try:
+            check_parser_backend(backend)
+            available.append(backend)
+        except ValueError as e:
+            logger.warning(f"Backend ignoré: {e}")
+    
+    scraper = VoursaCompleteScraper(download_images=False, metrics_path=None,
+                                    learn_selectors=False)
+    
+    def parse_all() -> List[Dict]:
+        outputs = []
+        for html in pages:
+            ad_data = {'url': '', 'title': '', 'images': [], 'details': {},
+                       'seller': {}, 'metadata': {}}
+            scraper.parse_ad_page(html, ad_data)
+            outputs.append(ad_data)
+        return outputs
+    
+    scraper.parser = 'html.parser'
+    reference = parse_all()
+    
+    results = {}
+    for backend in available:
+        scraper.parser = backend
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs = parse_all()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[backend] = {
+            'seconds': best,
+            'ms_per_page': best * 1000 / len(pages),
+            'identical': sum(a == b for a, b in zip(outputs, reference)),
+            'pages': len(pages)
+        }
+    scraper.close()
+    
+    print("\n" + "="*50)
+    print(f"BENCHMARK DES PARSEURS ({len(pages)} pages)")
+    print("="*50)
+    for backend, result in results.items():
+        print(f"  {backend:<12} {result['ms_per_page']:8.2f} ms/page   "
+              f"identiques: {result['identical']}/{result['pages']}")
+    print("="*50)
+    return results
+
+
+# Scraper propre à chaque processus de --reparse (créé par _init_reparse_worker)
+_reparse_scraper = None
+
+
+def _init_reparse_worker(parser: str, image_quality: str):
+    global _reparse_scraper
+    _reparse_scraper = VoursaCompleteScraper(
+        download_images=False, parser=parser, image_quality=image_quality,
+        metrics_path=None, learn_selectors=False
+    )
+
+
+def _reparse_entry(task: Tuple[str, Dict]) -> Tuple[str, Optional[Dict]]:
+    root, entry = task
+    try:
+        content = HtmlArchive.read(root, entry)
+        ad_data = _reparse_scraper.parse_archived_ad(entry, content)
+    except Exception as e:
+        logger.error(f"Erreur de ré-extraction {entry['url']}: {e}")
+        return entry['url'], None
+    return _reparse_scraper.category_key_from_url(entry['url']), ad_data
+
+
+def reparse_archive(archive_dir: str = "data/archive", filename: Optional[str] = None,
+                    processes: Optional[int] = None, parser: str = 'html.parser',
+                    image_quality: str = 'high') -> str:
+    """
+    Ré-extrait toutes les annonces d'une archive, sans navigateur ni réseau
+    
+    Seule la capture la plus récente de chaque annonce est utilisée. Le parsing
+    est réparti sur un pool de processus (un par cœur par défaut).
+    
+    Args:
+        archive_dir: Dossier de l'archive
+        filename: Fichier de sortie (auto-généré si None)
+        processes: Nombre de processus (None = nombre de cœurs)
+        parser: Backend de parsing HTML
+        image_quality: Qualité d'image appliquée aux URLs
         
-        return 'Autres'
+    Returns:
+        Chemin du fichier de résultats
+    """
+    start = datetime.now()
+    latest = {}
+    for entry in HtmlArchive.iter_index(archive_dir):
+        if entry['page_type'] == 'ad':
+            latest[entry['url']] = entry
+    logger.info(f"Ré-extraction de {len(latest)} annonces depuis {archive_dir}")
+    
+    ads_by_category: Dict[str, List[Dict]] = {}
+    errors = 0
+    tasks = [(archive_dir, entry) for entry in latest.values()]
+    with ProcessPoolExecutor(
+        max_workers=processes or os.cpu_count(),
+        initializer=_init_reparse_worker, initargs=(parser, image_quality)
+    ) as executor:
+        for category_key, ad_data in executor.map(_reparse_entry, tasks, chunksize=16):
+            if ad_data is None:
+                errors += 1
+                continue
+            ads_by_category.setdefault(category_key, []).append(ad_data)
+    
+    if filename is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"data/voursa_ads_reparsed_{timestamp}.json"
+    
+    final_data = {
+        'metadata': {
+            'scraping_date': datetime.now().isoformat(),
+            'source': archive_dir,
+            'total_ads': sum(len(ads) for ads in ads_by_category.values()),
+            'errors': errors,
+            'duration': str(datetime.now() - start),
+            'parameters': {
+                'parser': parser,
+                'image_quality': image_quality
+            }
+        },
+        'ads_by_category': ads_by_category
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(final_data, f, ensure_ascii=False, indent=2)
+    
+    logger.info(f"✅ {final_data['metadata']['total_ads']} annonces ré-extraites: {filename}")
+    return filename
+
+
+class MockVoursaServer:
+    """
+    Faux site Voursa local, pour les benchmarks et les essais hors ligne
     
-    def download_ad_images(self, ad_data: Dict, folder: str = "images"):
+    Sert des listings paginés, des annonces (HTML avec __NEXT_DATA__ et route
+    /_next/data), des images et un sitemap générés de façon déterministe. Les
+    pages d'une archive (voir archive_dir du scraper) remplacent les pages
+    générées de même URL ; leurs liens vers voursa.com sont réécrits vers le
+    serveur local. Son base_url se passe au scraper à la place du site réel.
+    """
+    
+    BUILD_ID = 'mock-build'
+    CITIES = ['Nouakchott', 'Nouadhibou', 'Rosso', 'Kiffa', 'Atar']
+    
+    def __init__(self, archive_dir: Optional[str] = None, port: int = 0,
+                 ads_per_page: int = 20, pages: int = 50, images_per_ad: int = 4,
+                 image_size: Tuple[int, int] = (1280, 960), latency: float = 0.0,
+                 next_data: bool = True):
         """
-        Télécharge les images d'une annonce
-        
         Args:
-            ad_data: Données de l'annonce
-            folder: Dossier de destination
+            archive_dir: Archive de pages enregistrées à servir en priorité
+            port: Port d'écoute sur 127.0.0.1 (0 = port libre)
+            ads_per_page: Annonces par page de listing
+            pages: Nombre de pages de chaque catégorie
+            images_per_ad: Images des annonces générées
+            image_size: Dimensions des images générées (JPEG valides si Pillow
+                est installé, octets aléatoires de taille comparable sinon) ;
+                chaque photo a sa propre image, partagée par ses variantes
+            latency: Délai (secondes) ajouté à chaque réponse, pour simuler le réseau
+            next_data: Si False, les pages générées n'ont ni __NEXT_DATA__ ni
+                route /_next/data, ce qui force l'analyse du HTML
         """
-        if not self.download_images or not ad_data.get('images'):
-            return
-        
-        ad_id = ad_data['ad_id']
-        ad_folder = os.path.join(folder, ad_id)
+        self.ads_per_page = ads_per_page
+        self.next_data = next_data
+        self.pages = pages
+        self.images_per_ad = images_per_ad
+        self.latency = latency
+        self.image_size = image_size
+        if Image is not None:
+            # Fractale légèrement bruitée, commune à toutes les photos : se
+            # compresse à peu près comme une photo
+            self.texture = Image.blend(
+                Image.effect_mandelbrot(image_size, (-2, -1.5, 1, 1.5), 100),
+                Image.effect_noise(image_size, 20), 0.15
+            ).convert('RGB')
+        # Photo (URL de l'image d'origine) -> JPEG, les plus récentes seulement
+        self._images: Dict[str, bytes] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
         
-        if not os.path.exists(ad_folder):
-            os.makedirs(ad_folder)
+        mock = self
         
-        downloaded = []
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, content_type, body = mock.respond(self.path)
+                # Les contenus sont déterministes : leur empreinte sert d'ETag
+                etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    with mock._lock:
+                        mock.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if status == 200:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
         
-        for idx, img_data in enumerate(ad_data['images']):
-            try:
-                img_url = img_data['url']
-                
-                # Déterminer l'extension
-                parsed_url = urlparse(img_url)
-                ext = os.path.splitext(parsed_url.path)[1]
-                if not ext or ext not in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                    ext = '.jpg'
-                
-                filename = f"{ad_id}_{idx:03d}{ext}"
-                filepath = os.path.join(ad_folder, filename)
-                
-                # Télécharger l'image
-                response = requests.get(img_url, timeout=10, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
-                
-                if response.status_code == 200:
-                    with open(filepath, 'wb') as f:
-                        f.write(response.content)
-                    
-                    img_data['local_path'] = filepath
-                    downloaded.append(filepath)
-                    self.stats['total_images'] += 1
-                    logger.debug(f"Image téléchargée: {filename}")
-                
-            except Exception as e:
-                logger.error(f"Erreur téléchargement image {img_url}: {e}")
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.origin = f"http://127.0.0.1:{self.server.server_port}"
+        self.base_url = f"{self.origin}/EN"
         
-        return downloaded
+        # Pages enregistrées : chemin (avec la requête) -> contenu
+        self.recorded_html: Dict[str, str] = {}
+        self.recorded_json: Dict[str, str] = {}
+        if archive_dir:
+            for entry in HtmlArchive.iter_index(archive_dir):
+                parsed = urlparse(entry['url'])
+                path = parsed.path + (f"?{parsed.query}" if parsed.query else '')
+                content = HtmlArchive.read(archive_dir, entry).replace('https://www.voursa.com', self.origin)
+                if entry['source'] == 'next-data':
+                    self.recorded_json[path] = content
+                else:
+                    self.recorded_html[path] = content
+            logger.info(f"Faux site: {len(self.recorded_html) + len(self.recorded_json)} "
+                        f"pages enregistrées chargées depuis {archive_dir}")
     
-    def scrape_category(self, category_key: str) -> List[Dict]:
-        """
-        Scrape toutes les annonces d'une catégorie
-        
-        Args:
-            category_key: Clé de la catégorie
-            
-        Returns:
-            Liste des annonces scrapées
-        """
-        category_name = self.CATEGORIES.get(category_key, category_key)
-        logger.info(f"\n{'='*50}")
-        logger.info(f"Scraping catégorie: {category_name}")
-        logger.info(f"{'='*50}")
+    def start(self) -> 'MockVoursaServer':
+        """Sert les pages depuis un thread d'arrière-plan"""
+        threading.Thread(target=self.server.serve_forever, name="voursa-mock", daemon=True).start()
+        logger.info(f"Faux site Voursa: {self.base_url}")
+        return self
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def respond(self, path: str) -> Tuple[int, str, bytes]:
+        """(code, type de contenu, corps) de la réponse à un chemin"""
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
         
-        ads = []
-        category_url = self.get_category_url(category_key)
+        parsed = urlparse(path)
+        # Comme le site : un numéro de page illisible affiche la première page
+        page_param = parse_qs(parsed.query).get('page', ['1'])[0]
+        page = int(page_param) if page_param.isdigit() else 1
         
-        # Récupérer les URLs des annonces
-        ad_urls = self.extract_ad_urls_from_listing(category_url, self.ads_per_category)
-        logger.info(f"Trouvé {len(ad_urls)} annonces dans {category_name}")
+        if parsed.path in ('/_next/image',) or parsed.path.startswith('/images/'):
+            # Les variantes (/_next/image?url=...&w=...) montrent la photo d'origine
+            photo = parse_qs(parsed.query).get('url', [''])[0] if parsed.path == '/_next/image' else path
+            digest = hashlib.sha256(path.encode('utf-8')).digest()
+            # Octets propres à l'URL après la fin du JPEG : une URL, un fichier
+            return 200, 'image/jpeg', self.image_data(urlparse(photo).path) + digest
+        if parsed.path == '/robots.txt':
+            return 200, 'text/plain', f"User-agent: *\nSitemap: {self.origin}/sitemap.xml\n".encode('utf-8')
+        if parsed.path == '/sitemap.xml':
+            return 200, 'application/xml', self.sitemap().encode('utf-8')
         
-        # Extraire les détails de chaque annonce
-        for idx, ad_url in enumerate(ad_urls, 1):
-            try:
-                logger.info(f"[{idx}/{len(ad_urls)}] Extraction: {ad_url}")
-                
-                ad_data = self.extract_ad_details(ad_url)
-                ad_data['category'] = category_name
-                
-                # Télécharger les images
-                self.download_ad_images(ad_data)
-                
-                ads.append(ad_data)
-                self.stats['total_ads'] += 1
-                
-                # Pause entre les annonces
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Erreur annonce {ad_url}: {e}")
-                self.stats['errors'] += 1
-                continue
+        if parsed.path.startswith('/_next/data/'):
+            # /_next/data/<build>/<chemin>.json : mêmes props que __NEXT_DATA__
+            page_path = '/' + parsed.path.split('/', 4)[-1][:-len('.json')]
+            recorded_key = page_path + (f"?{parsed.query}" if parsed.query else '')
+            if recorded_key in self.recorded_json:
+                return 200, 'application/json', self.recorded_json[recorded_key].encode('utf-8')
+            props = self.page_props(page_path, page) if self.next_data else None
+            if props is None:
+                return 404, 'application/json', b'{}'
+            return 200, 'application/json', json.dumps({'pageProps': props}).encode('utf-8')
         
-        return ads
+        if path in self.recorded_html:
+            return 200, 'text/html; charset=utf-8', self.recorded_html[path].encode('utf-8')
+        html = self.page_html(parsed.path, page)
+        if html is None:
+            return 404, 'text/html', b'<html><body>Not found</body></html>'
+        return 200, 'text/html; charset=utf-8', html.encode('utf-8')
     
-    def scrape_all_categories(self, categories: List[str] = None) -> Dict[str, List[Dict]]:
+    def image_data(self, photo: str, cached: int = 256) -> bytes:
         """
-        Scrape toutes les catégories spécifiées
+        JPEG d'une photo, propre à son chemin (/images/<annonce>_<n>.jpg)
         
-        Args:
-            categories: Liste des clés de catégories à scraper (None = toutes)
-            
-        Returns:
-            Dictionnaire avec les annonces par catégorie
+        Un fond de couleurs tirées du chemin, agrandi et mêlé à la texture
+        commune : deux photos différentes ont des empreintes dHash éloignées.
         """
-        if categories is None:
-            categories = list(self.CATEGORIES.keys())
+        with self._lock:
+            data = self._images.get(photo)
+        if data is not None:
+            return data
         
-        all_ads = {}
-        
-        for category_key in categories:
-            if category_key not in self.CATEGORIES:
-                logger.warning(f"Catégorie inconnue: {category_key}")
-                continue
-            
-            try:
-                ads = self.scrape_category(category_key)
-                all_ads[category_key] = ads
-                
-                # Sauvegarder après chaque catégorie
-                self.save_intermediate_results(all_ads)
-                
-            except Exception as e:
-                logger.error(f"Erreur catégorie {category_key}: {e}")
-                all_ads[category_key] = []
+        rng = random.Random(hashlib.sha256(photo.encode('utf-8')).digest())
+        width, height = self.image_size
+        if Image is not None:
+            field = Image.new('RGB', (12, 9))
+            field.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(12 * 9)])
+            buffer = io.BytesIO()
+            Image.blend(field.resize(self.image_size, Image.BICUBIC), self.texture, 0.5).save(
+                buffer, 'JPEG', quality=80
+            )
+            data = buffer.getvalue()
+        else:
+            data = b'\xff\xd8' + rng.randbytes(width * height // 8) + b'\xff\xd9'
         
-        return all_ads
+        with self._lock:
+            self._images[photo] = data
+            while len(self._images) > cached:
+                self._images.pop(next(iter(self._images)))
+        return data
     
-    def save_intermediate_results(self, data: Dict):
-        """Sauvegarde intermédiaire des résultats"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"data/voursa_intermediate_{timestamp}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        logger.debug(f"Sauvegarde intermédiaire: {filename}")
+    def ad_ids(self, category_key: str, page: int) -> List[int]:
+        """Identifiants des annonces d'une page de listing"""
+        offset = (list(VoursaCompleteScraper.CATEGORIES).index(category_key) + 1) * 1000000
+        start = offset + (page - 1) * self.ads_per_page
+        return list(range(start, start + self.ads_per_page))
     
-    def save_results(self, data: Dict, filename: str = None):
-        """
-        Sauvegarde les résultats finaux
+    def ad_path(self, category_key: str, ad_id: int) -> str:
+        return f"/EN/categories/{category_key}/ads/annonce-{ad_id}"
+    
+    def page_props(self, path: str, page: int) -> Optional[Dict]:
+        """Props Next.js d'une page de listing ou d'annonce générée"""
+        match = re.fullmatch(r'/EN/categories/([^/]+)(?:/ads/annonce-(\d+))?', path)
+        if not match or match.group(1) not in VoursaCompleteScraper.CATEGORIES:
+            return None
+        category_key, ad_id = match.group(1), match.group(2)
         
-        Args:
-            data: Données à sauvegarder
-            filename: Nom du fichier (auto-généré si None)
-        """
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"data/voursa_ads_{timestamp}.json"
+        if ad_id is None:
+            if not 1 <= page <= self.pages:
+                return None
+            return {
+                'ads': [{'id': i, 'title': f"Annonce {i}", 'price': 1000 * (i % 997),
+                         'url': self.ad_path(category_key, i)}
+                        for i in self.ad_ids(category_key, page)],
+                'pagination': {'currentPage': page, 'totalPages': self.pages}
+            }
         
-        # Ajouter les statistiques
-        final_data = {
-            'metadata': {
-                'scraping_date': datetime.now().isoformat(),
-                'total_ads': self.stats['total_ads'],
-                'total_images': self.stats['total_images'],
-                'errors': self.stats['errors'],
-                'duration': str(datetime.now() - self.stats['start_time']),
-                'parameters': {
-                    'ads_per_category': self.ads_per_category,
-                    'download_images': self.download_images
-                }
-            },
-            'ads_by_category': data
-        }
+        ad_id = int(ad_id)
+        rng = random.Random(ad_id)
+        return {'ad': {
+            'id': ad_id,
+            'title': f"Annonce {ad_id} - {VoursaCompleteScraper.CATEGORIES[category_key]}",
+            'price': 1000 * (ad_id % 997),
+            'currency': 'MRU',
+            'description': ' '.join(rng.choice(['très', 'bon', 'état', 'climatisé', 'neuf', 'garage',
+                                                'chambres', 'salon', 'quartier', 'calme', 'proche',
+                                                'marché', 'papiers', 'jour']) for _ in range(60)),
+            'location': {'name': self.CITIES[ad_id % len(self.CITIES)]},
+            'images': [{'url': f"{self.origin}/images/{ad_id}_{n}.jpg", 'alt': f"Image {n + 1}"}
+                       for n in range(self.images_per_ad)],
+            'details': {'Surface': f"{50 + ad_id % 300} m2", 'Année': str(1995 + ad_id % 30),
+                        'Kilométrage': f"{ad_id % 250000} km"},
+            'user': {'name': f"Vendeur {ad_id % 50}", 'phone': f"+222 {ad_id % 100000000:08d}",
+                     'type': 'particulier'},
+            'views': ad_id % 1000,
+            'createdAt': f"2025-{ad_id % 12 + 1:02d}-{ad_id % 28 + 1:02d}"
+        }}
+    
+    def page_html(self, path: str, page: int) -> Optional[str]:
+        """HTML d'une page de listing ou d'annonce générée, avec son __NEXT_DATA__"""
+        props = self.page_props(path, page)
+        if props is None:
+            return None
+        script = ''
+        if self.next_data:
+            next_data = json.dumps({'buildId': self.BUILD_ID, 'props': {'pageProps': props}})
+            script = f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script>'
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(final_data, f, ensure_ascii=False, indent=2)
+        if 'ads' in props:
+            cards = ''.join(
+                f'<div class="ad-item"><a href="{ad["url"]}">{ad["title"]} - {ad["price"]} MRU</a></div>'
+                for ad in props['ads']
+            )
+            next_link = f'<a rel="next" href="{path}?page={page + 1}">Suivant</a>' if page < self.pages else ''
+            return f'<html><body><main>{cards}</main><nav>{next_link}</nav>{script}</body></html>'
         
-        logger.info(f"\n✅ Résultats sauvegardés: {filename}")
-        self.print_statistics()
+        ad = props['ad']
+        images = ''.join(
+            f'<img src="/_next/image?url={quote(image["url"], safe="")}&w=3840&q=75" alt="{image["alt"]}">'
+            for image in ad['images']
+        ) + ''.join(
+            f'<img src="/_next/image?url={quote(image["url"], safe="")}&w=384&q=50" alt="Thumbnail {n + 1}">'
+            for n, image in enumerate(ad['images'])
+        )
+        details = ''.join(f'<li class="detail-item">{key}: {value}</li>' for key, value in ad['details'].items())
+        return (
+            f'<html><body><h1>{ad["title"]}</h1>'
+            f'<div class="price">{ad["price"]} {ad["currency"]}</div>'
+            f'<div class="location">{ad["location"]["name"]}</div>'
+            f'<div class="gallery">{images}</div>'
+            f'<div class="description">{ad["description"]}</div>'
+            f'<ul class="specs">{details}</ul>'
+            f'<div class="seller-name">{ad["user"]["name"]}</div>'
+            f'<a href="tel:{ad["user"]["phone"]}">{ad["user"]["phone"]}</a>'
+            f'<span class="posted-date">{ad["createdAt"]}</span>'
+            f'<p>{ad["views"]} vues</p>{script}</body></html>'
+        )
     
-    def print_statistics(self):
-        """Affiche les statistiques du scraping"""
-        duration = datetime.now() - self.stats['start_time']
-        
-        print("\n" + "="*50)
-        print("STATISTIQUES DU SCRAPING")
-        print("="*50)
-        print(f"📊 Annonces extraites: {self.stats['total_ads']}")
-        print(f"🖼️  Images téléchargées: {self.stats['total_images']}")
-        print(f"❌ Erreurs rencontrées: {self.stats['errors']}")
-        print(f"⏱️  Durée totale: {duration}")
-        print(f"📅 Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*50)
+    def sitemap(self) -> str:
+        """Sitemap de toutes les annonces générées"""
+        urls = [
+            f"<url><loc>{self.origin}{self.ad_path(key, ad_id)}</loc>"
+            f"<lastmod>2025-{ad_id % 12 + 1:02d}-{ad_id % 28 + 1:02d}</lastmod></url>"
+            for key in VoursaCompleteScraper.CATEGORIES
+            for page in range(1, self.pages + 1)
+            for ad_id in self.ad_ids(key, page)
+        ]
+        return f"<?xml version=\"1.0\"?><urlset>{''.join(urls)}</urlset>"
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente (Mo) du processus courant"""
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return None
+
+
+def _bench_crawl_mode(task: Tuple[str, str, str, int, int]) -> Dict:
+    """Crawl d'une catégorie du faux site dans un mode donné (processus dédié)"""
+    base_url, fetch_mode, parser, ads, workers = task
+    logger.setLevel(logging.WARNING)
     
-    def close(self):
-        """Ferme le navigateur et nettoie les ressources"""
+    with tempfile.TemporaryDirectory(prefix='voursa-bench-') as workdir:
+        os.chdir(workdir)
+        scraper = VoursaCompleteScraper(
+            ads_per_category=ads, headless=True, workers=workers, request_delay=0.0,
+            fetch_mode=fetch_mode, parser=parser, image_store=False,
+            metrics_path=None, base_url=base_url
+        )
         try:
-            self.driver.quit()
-            logger.info("Driver fermé correctement")
-        except Exception as e:
-            logger.error(f"Erreur fermeture driver: {e}")
+            start = time.perf_counter()
+            results = scraper.scrape_all_categories(['real_estate'])
+            scraper.wait_for_downloads()
+            elapsed = time.perf_counter() - start
+            browser_mb = scraper.driver_pool.total_rss_mb()
+        finally:
+            scraper.close()
+    
+    scraped = len(results.get('real_estate', []))
+    if not scraped:
+        raise RuntimeError("aucune annonce extraite")
+    parse_count, parse_seconds = scraper.metrics.stage_total('parse_ad')
+    next_count, next_seconds = scraper.metrics.stage_total('parse_next_data')
+    image_mb = scraper.metrics.counter('bytes_received_total', {'kind': 'image'}) / (1024 * 1024)
+    return {
+        'ads': scraped,
+        'errors': scraper.stats['errors'],
+        'seconds': elapsed,
+        'ads_per_sec': scraped / elapsed if elapsed else 0.0,
+        'parse_ms_per_ad': (parse_seconds + next_seconds) * 1000 / scraped if scraped else 0.0,
+        'images': scraper.stats['total_images'],
+        'images_per_sec': scraper.stats['total_images'] / elapsed if elapsed else 0.0,
+        'image_mb_per_sec': image_mb / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'browser_mb': browser_mb
+    }
+
+
+def benchmark_crawl(modes: Optional[List[str]] = None, ads: int = 50, workers: int = 1,
+                    archive_dir: Optional[str] = None, latency: float = 0.0,
+                    next_data: bool = True, output_dir: str = "data/benchmarks") -> Dict[str, Dict]:
+    """
+    Mesure le crawl de bout en bout contre MockVoursaServer, sans réseau
+    
+    Chaque mode crawle la catégorie real_estate dans un processus neuf (mémoire
+    mesurée séparément) et un dossier temporaire. Les résultats sont enregistrés
+    dans output_dir et comparés à ceux de l'exécution précédente.
+    
+    Args:
+        modes: Modes '<fetch_mode>:<parser>', par défaut http avec chaque
+            backend disponible et selenium avec html.parser
+        ads: Nombre d'annonces crawlées par mode
+        workers: Nombre de workers du scraper
+        archive_dir: Archive de pages enregistrées servies par le faux site
+        latency: Délai ajouté à chaque réponse du faux site (secondes)
+        next_data: Si False, le faux site ne sert que du HTML (pour comparer
+            les backends de parsing)
+        output_dir: Dossier des résultats (JSON)
+        
+    Returns:
+        Les mesures par mode
+    """
+    if modes is None:
+        modes = [f"http:{backend}" for backend in PARSER_BACKENDS] + ['selenium:html.parser']
+    
+    server = MockVoursaServer(archive_dir, latency=latency, next_data=next_data).start()
+    results = {}
+    try:
+        for mode in modes:
+            fetch_mode, _, parser = mode.partition(':')
+            parser = parser or 'html.parser'
+            try:
+                check_parser_backend(parser)
+            except ValueError as e:
+                logger.warning(f"Mode ignoré ({mode}): {e}")
+                continue
+            
+            logger.info(f"Benchmark du mode {mode}...")
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                try:
+                    results[mode] = executor.submit(
+                        _bench_crawl_mode, (server.base_url, fetch_mode, parser, ads, workers)
+                    ).result()
+                except Exception as e:
+                    logger.error(f"Benchmark du mode {mode} impossible: {e}")
+    finally:
+        server.close()
+    
+    # Comparaison avec la dernière exécution de mêmes paramètres
+    parameters = {'ads': ads, 'workers': workers, 'latency': latency, 'next_data': next_data}
+    previous = {}
+    os.makedirs(output_dir, exist_ok=True)
+    runs = sorted(f for f in os.listdir(output_dir) if f.startswith('bench_crawl_') and f.endswith('.json'))
+    for run in reversed(runs):
+        with open(os.path.join(output_dir, run), 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        if report.get('parameters') == parameters:
+            previous = report['results']
+            break
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(os.path.join(output_dir, f"bench_crawl_{timestamp}.json"), 'w', encoding='utf-8') as f:
+        json.dump({'date': datetime.now().isoformat(), 'parameters': parameters, 'results': results},
+                  f, indent=2)
+    
+    print("\n" + "="*50)
+    print(f"BENCHMARK DU CRAWL ({ads} annonces, faux site local)")
+    print("="*50)
+    for mode, result in results.items():
+        memory = f"{result['peak_rss_mb']:.0f} Mo" if result['peak_rss_mb'] is not None else "?"
+        if result['browser_mb'] is not None:
+            memory += f" + {result['browser_mb']:.0f} Mo Chrome"
+        trend = ''
+        if mode in previous and previous[mode].get('ads_per_sec'):
+            change = result['ads_per_sec'] / previous[mode]['ads_per_sec'] - 1
+            trend = f"  ({change:+.0%}{' ⚠️' if change < -0.1 else ''})"
+        print(f"  {mode:<22} {result['ads_per_sec']:7.1f} annonces/s{trend}")
+        print(f"  {'':<22} parsing {result['parse_ms_per_ad']:.2f} ms/annonce, "
+              f"images {result['images_per_sec']:.1f}/s ({result['image_mb_per_sec']:.1f} Mo/s), "
+              f"mémoire {memory}, erreurs {result['errors']}")
+    print("="*50)
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Analyse les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Extraction des annonces Voursa")
+    parser.add_argument(
+        '--resume', nargs='?', const='data/checkpoint.json', metavar='CHECKPOINT',
+        help="Reprendre un crawl interrompu depuis son point de reprise "
+             "(par défaut data/checkpoint.json)"
+    )
+    parser.add_argument(
+        '--checkpoint', nargs='?', const='data/checkpoint.json', default=None, metavar='CHECKPOINT',
+        help="Tenir à jour un point de reprise pendant le crawl (par défaut data/checkpoint.json) ; "
+             "les annonces sont alors écrites en flux (JSONL)"
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="Écrire les annonces au fil de l'eau dans un fichier JSONL"
+    )
+    parser.add_argument(
+        '--http-cache', action='store_true',
+        help="Revalider pages et images (ETag / Last-Modified) au lieu de les retélécharger"
+    )
+    parser.add_argument(
+        '--duplicates', choices=['tag', 'skip'], default=None,
+        help="Détecter les republications : 'tag' les marque, 'skip' ne télécharge pas leurs images"
+    )
+    parser.add_argument(
+        '--browser-profile', choices=['full', 'lean'], default='full',
+        help="'lean' : Chrome ne charge ni images, ni styles, ni polices (par défaut: full)"
+    )
+    parser.add_argument(
+        '--update-index', action='store_true',
+        help="Mettre à jour l'index de recherche (--search-index) au fil du crawl"
+    )
+    parser.add_argument(
+        '--bench-parsers', nargs='+', metavar='HTML',
+        help="Comparer les backends de parsing sur des pages enregistrées "
+             "(fichiers ou dossiers .html), sans lancer de crawl"
+    )
+    parser.add_argument(
+        '--bench-crawl', nargs='*', metavar='MODE',
+        help="Mesurer le crawl contre un faux site local, par mode '<fetch_mode>:<parser>' "
+             "(par défaut: http avec chaque backend, et selenium)"
+    )
+    parser.add_argument(
+        '--bench-ads', type=int, default=50,
+        help="Nombre d'annonces crawlées par mode pour --bench-crawl (par défaut: 50)"
+    )
+    parser.add_argument(
+        '--bench-latency', type=float, default=0.0,
+        help="Délai (secondes) ajouté à chaque réponse du faux site"
+    )
+    parser.add_argument(
+        '--mock-server', type=int, metavar='PORT',
+        help="Lancer le faux site Voursa sur ce port (base_url: http://127.0.0.1:PORT/EN)"
+    )
+    parser.add_argument(
+        '--mock-html-only', action='store_true',
+        help="Le faux site ne sert que du HTML (ni __NEXT_DATA__ ni /_next/data)"
+    )
+    parser.add_argument(
+        '--fixtures', metavar='ARCHIVE',
+        help="Archive de pages enregistrées servies par le faux site"
+    )
+    parser.add_argument(
+        '--reparse', nargs='?', const='data/archive', metavar='ARCHIVE',
+        help="Ré-extraire les annonces d'une archive HTML, sans navigateur ni réseau "
+             "(par défaut data/archive)"
+    )
+    parser.add_argument(
+        '--processes', type=int, default=None,
+        help="Nombre de processus pour --reparse (par défaut: un par cœur)"
+    )
+    parser.add_argument(
+        '--export-listar', metavar='RESULTS',
+        help="Exporter un fichier de résultats (.json ou .jsonl) vers le backend "
+             "ListarPro : fichier SQL, et import direct si --database-url est fourni"
+    )
+    parser.add_argument(
+        '--database-url', default=None,
+        help="URL PostgreSQL du backend ListarPro (DATABASE_URL du fichier .env)"
+    )
+    parser.add_argument(
+        '--export-parquet', metavar='RESULTS',
+        help="Exporter un fichier de résultats (.json ou .jsonl) en Parquet typé, "
+             "partitionné par catégorie et date de collecte (nécessite pyarrow)"
+    )
+    parser.add_argument(
+        '--parquet-dir', default='data/parquet',
+        help="Dossier du jeu de données Parquet (par défaut: data/parquet)"
+    )
+    parser.add_argument(
+        '--image-base-url', default=None,
+        help="URL publique des images téléchargées, utilisée à la place des URLs Voursa"
+    )
+    parser.add_argument(
+        '--index', nargs='+', metavar='RESULTS',
+        help="Ajouter des fichiers de résultats (.json ou .jsonl) à l'index de recherche "
+             "(les annonces déjà indexées sont mises à jour)"
+    )
+    parser.add_argument(
+        '--search', nargs='?', const='', metavar='QUERY',
+        help="Rechercher dans l'index (mots en préfixe, sans accents) ; sans mot, "
+             "liste les annonces correspondant aux filtres"
+    )
+    parser.add_argument(
+        '--search-index', default='data/search.sqlite',
+        help="Base de l'index de recherche (par défaut: data/search.sqlite)"
+    )
+    parser.add_argument(
+        '--category', default=None,
+        help="Filtre de --search : clé de catégorie (ex: vehicles)"
+    )
+    parser.add_argument(
+        '--price', type=parse_range, default=(None, None), metavar='MIN:MAX',
+        help="Filtre de --search : prix (ex: 100000:500000, 100000:, :500000)"
+    )
+    parser.add_argument(
+        '--year', type=parse_range, default=(None, None), metavar='MIN:MAX',
+        help="Filtre de --search : année (ex: 2015:)"
+    )
+    parser.add_argument(
+        '--mileage', type=parse_range, default=(None, None), metavar='MIN:MAX',
+        help="Filtre de --search : kilométrage (ex: :150000)"
+    )
+    parser.add_argument(
+        '--sort', default='relevance', choices=list(SEARCH_SORTS),
+        help="Tri des résultats de --search (par défaut: pertinence)"
+    )
+    parser.add_argument(
+        '--limit', type=int, default=20,
+        help="Nombre de résultats de --search (par défaut: 20)"
+    )
+    return parser.parse_args(argv)
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Fonction principale"""
+    args = parse_args(argv)
+    
+    if args.bench_parsers:
+        benchmark_parsers(args.bench_parsers)
+        return
+    
+    if args.bench_crawl is not None:
+        benchmark_crawl(args.bench_crawl or None, ads=args.bench_ads,
+                        archive_dir=args.fixtures, latency=args.bench_latency,
+                        next_data=not args.mock_html_only)
+        return
+    
+    if args.mock_server is not None:
+        server = MockVoursaServer(args.fixtures, port=args.mock_server, latency=args.bench_latency,
+                                  next_data=not args.mock_html_only)
+        server.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.close()
+        return
+    
+    if args.export_parquet:
+        export_parquet(args.export_parquet, args.parquet_dir)
+        return
+    
+    if args.export_listar:
+        export_listar(args.export_listar, database_url=args.database_url,
+                      image_base_url=args.image_base_url)
+        return
+    
+    if args.index:
+        build_search_index(args.index, args.search_index)
+        return
+    
+    if args.search is not None:
+        if not os.path.exists(args.search_index):
+            logger.error(f"Index de recherche introuvable: {args.search_index} (voir --index)")
+            return
+        index = SearchIndex(args.search_index)
+        try:
+            print_search_results(index.search(
+                args.search, category=args.category, price=args.price, year=args.year,
+                mileage=args.mileage, sort=args.sort, limit=args.limit
+            ))
+        finally:
+            index.close()
+        return
     
     # Configuration
     CONFIG = {
         'ads_per_category': 20,  # Nombre d'annonces par catégorie (paramétrable)
         'headless': False,  # True pour exécuter sans interface graphique
         'download_images': True,  # Télécharger les images
-        'image_quality': 'high',  # 'high', 'medium', ou 'thumbnail'
+        'image_workers': 8,  # Téléchargements d'images simultanés
+        'image_store': True,  # Réutiliser les images déjà téléchargées (images/store)
+        'image_quality': 'high',  # 'high', 'medium', 'thumbnail' ou 'original'
+        'image_sizes': [],  # Tailles supplémentaires, ex: ['thumbnail']
+        'postprocess_images': False,  # Vérifier les images et les décliner en WebP (nécessite Pillow)
+        'image_formats': ['webp'],  # Formats des déclinaisons : 'webp', 'avif', 'jpg'
+        'incremental': False,  # Ne recharger que les annonces nouvelles ou modifiées
+        'http_cache': args.http_cache,  # Revalider pages et images (ETag / Last-Modified), --http-cache
+        'learn_selectors': False,  # Éviter les sélecteurs qui échouent toujours sur un gabarit (résultats inchangés)
+        'search_index': args.search_index if args.update_index else None,  # Index tenu à jour, --update-index
+        'stream_output': args.stream,  # Écrire les annonces au fil de l'eau (JSONL), --stream
+        'checkpoint': args.checkpoint,  # Point de reprise (None = désactivé), --checkpoint
+        'workers': 1,  # Nombre de navigateurs en parallèle
+        'fetch_mode': 'selenium',  # 'http' pour extraire sans navigateur (repli Selenium)
+        'request_delay': 2.0,  # Secondes minimum entre deux pages du même hôte
+        'duplicates': args.duplicates,  # Republications : 'tag', 'skip' (sans images) ou None, --duplicates
+        'parser': 'html.parser',  # 'lxml', 'html5lib' ou 'selectolax' (plus rapides)
+        'browser_profile': args.browser_profile,  # 'lean' pour ne charger ni images, ni styles, ni polices
+        'max_pages_per_driver': 200,  # Pages avant remplacement d'un navigateur
+        'max_driver_rss_mb': 1500,  # Mémoire max d'un navigateur (Mo, nécessite psutil)
+        'discovery': 'listing',  # 'sitemap' pour lire les URLs d'annonces dans le sitemap
+        'listing_prefetch': 2,  # Pages de listing téléchargées à l'avance (mode http)
+        'archive_dir': None,  # ex: 'data/archive' pour conserver le HTML brut (--reparse)
+        'metrics_path': 'data/metrics.prom',  # Mesures au format Prometheus (None = désactivé)
+        'metrics_port': None,  # ex: 9108 pour servir les mesures sur /metrics pendant le crawl
+        'profile': None,  # 'cprofile' ou 'pyinstrument' : un profil par annonce (data/profiles)
+        'base_url': 'https://www.voursa.com/EN',  # ex: 'http://127.0.0.1:8000/EN' (--mock-server)
         'categories': None  # None = toutes, ou liste: ['real_estate', 'vehicles']
     }
     
+    if args.reparse:
+        reparse_archive(args.reparse, processes=args.processes,
+                        parser=CONFIG['parser'], image_quality=CONFIG['image_quality'])
+        return
+    
+    # Point de reprise : nouveau crawl, ou reprise avec la configuration d'origine
+    checkpoint = None
+    if args.resume:
+        checkpoint = CrawlCheckpoint.load(args.resume)
+        CONFIG.update(checkpoint.config)
+        logger.info(f"Reprise du crawl depuis {args.resume}")
+    elif CONFIG['checkpoint']:
+        checkpoint = CrawlCheckpoint(CONFIG['checkpoint'], config=CONFIG)
+    
     print("\n" + "="*50)
     print("VOURSA SCRAPER - Extraction Multi-Catégories")
     print("="*50)
@@ -721,6 +6071,8 @@ def main():
     print(f"  • Annonces par catégorie: {CONFIG['ads_per_category']}")
     print(f"  • Mode headless: {CONFIG['headless']}")
     print(f"  • Téléchargement images: {CONFIG['download_images']}")
+    print(f"  • Workers: {CONFIG['workers']}")
+    print(f"  • Reprise: {'oui' if args.resume else 'non'}")
     print("="*50 + "\n")
     
     # Initialiser le scraper
@@ -728,7 +6080,33 @@ def main():
         ads_per_category=CONFIG['ads_per_category'],
         headless=CONFIG['headless'],
         download_images=CONFIG['download_images'],
-        image_quality=CONFIG['image_quality']
+        image_quality=CONFIG['image_quality'],
+        workers=CONFIG['workers'],
+        request_delay=CONFIG['request_delay'],
+        fetch_mode=CONFIG['fetch_mode'],
+        image_workers=CONFIG['image_workers'],
+        image_store=CONFIG['image_store'],
+        image_sizes=CONFIG['image_sizes'],
+        postprocess_images=CONFIG['postprocess_images'],
+        image_formats=CONFIG['image_formats'],
+        incremental=CONFIG['incremental'],
+        http_cache=CONFIG['http_cache'],
+        learn_selectors=CONFIG['learn_selectors'],
+        search_index=CONFIG['search_index'],
+        stream_output=CONFIG['stream_output'],
+        checkpoint=checkpoint,
+        parser=CONFIG['parser'],
+        archive_dir=CONFIG['archive_dir'],
+        browser_profile=CONFIG['browser_profile'],
+        max_pages_per_driver=CONFIG['max_pages_per_driver'],
+        max_driver_rss_mb=CONFIG['max_driver_rss_mb'],
+        discovery=CONFIG['discovery'],
+        listing_prefetch=CONFIG['listing_prefetch'],
+        duplicates=CONFIG['duplicates'],
+        metrics_path=CONFIG['metrics_path'],
+        metrics_port=CONFIG['metrics_port'],
+        profile=CONFIG['profile'],
+        base_url=CONFIG['base_url']
     )
     
     try:
@@ -737,12 +6115,17 @@ def main():
         
         # Sauvegarder les résultats
         scraper.save_results(results)
+        if checkpoint is not None:
+            checkpoint.remove()
         
         print("\n✅ Scraping terminé avec succès!")
         
     except KeyboardInterrupt:
         logger.info("\n⚠️ Scraping interrompu par l'utilisateur")
-        scraper.save_results(results, "data/voursa_ads_partial.json")
+        # Les annonces des catégories terminées (en mode flux, celles du fichier JSONL)
+        scraper.save_results(scraper.all_ads, "data/voursa_ads_partial.json")
+        if checkpoint is not None:
+            logger.info(f"Pour reprendre: python run_scraper.py --resume {checkpoint.path}")
         
     except Exception as e:
         logger.error(f"❌ Erreur fatale: {e}")
@@ -752,4 +6135,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
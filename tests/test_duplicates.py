@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+import run_scraper
+from run_scraper import DuplicateIndex
+
+pytestmark = pytest.mark.skipif(run_scraper.Image is None, reason="Pillow non installé")
+
+DESCRIPTION = "Toyota Hilux double cabine en très bon état, entretien suivi, climatisation, pneus neufs"
+
+
+def photo(tmp_path, seed: int) -> dict:
+    """Image aléatoire propre à une graine, enregistrée comme image téléchargée"""
+    rng = random.Random(seed)
+    img = run_scraper.Image.new('L', (90, 80))
+    img.putdata([rng.randrange(256) for _ in range(90 * 80)])
+    path = tmp_path / f"{seed}.png"
+    img.save(path)
+    return {'local_path': str(path)}
+
+
+def ad(ad_id, images, price='1 500 000', title='Toyota Hilux 2015', description=DESCRIPTION):
+    return {'ad_id': ad_id, 'url': f"https://voursa.com/annonces/{ad_id}", 'price': price,
+            'title': title, 'description': description, 'images': images}
+
+
+@pytest.fixture
+def index(tmp_path):
+    duplicates = DuplicateIndex(str(tmp_path / "duplicates.sqlite"))
+    yield duplicates
+    duplicates.close()
+
+
+def test_repost_with_same_images_and_price(index, tmp_path):
+    images = [photo(tmp_path, seed) for seed in (1, 2, 3)]
+    assert index.check_images(ad('a1', images)) is None
+    match = index.check_images(ad('a2', images[:2], title='Hilux à vendre', description='Urgent'))
+    assert match['ad_id'] == 'a1'
+    assert match['match'] == 'image'
+    assert match['images'] == 2
+
+
+def test_single_shared_image_is_not_a_repost(index, tmp_path):
+    index.check_images(ad('a1', [photo(tmp_path, seed) for seed in (1, 2, 3, 4)]))
+    images = [photo(tmp_path, seed) for seed in (1, 5, 6, 7)]
+    assert index.check_images(ad('a2', images)) is None
+
+
+def test_same_images_need_price_or_text(index, tmp_path):
+    images = [photo(tmp_path, seed) for seed in (1, 2)]
+    index.check_text(ad('a1', images))
+    index.check_images(ad('a1', images))
+    other = ad('a2', images, price='900 000', title='Appartement', description='Trois chambres au centre ville, proche du marché')
+    index.check_text(other)
+    assert index.check_images(other) is None
+
+    # Prix changé mais même texte : toujours la même annonce
+    lowered = ad('a3', images, price='1 400 000')
+    index.check_text(lowered)
+    assert index.check_images(lowered)['ad_id'] == 'a1'
+
+
+def test_common_images_are_ignored(index, tmp_path):
+    logo = photo(tmp_path, 99)
+    for number in range(index.common_image_ads + 1):
+        index.check_images(ad(f"a{number}", [logo, photo(tmp_path, 100 + number)]))
+    assert index.check_images(ad('new', [logo, photo(tmp_path, 200)])) is None
+
+
+def test_text_duplicate_requires_same_price(index, tmp_path):
+    assert index.check_text(ad('a1', [])) is None
+    assert index.check_text(ad('a2', []))['ad_id'] == 'a1'
+    assert index.check_text(ad('a3', [], price='2 000 000')) is None
@@ -0,0 +1,43 @@
+from run_scraper import canonical_image_key, group_image_variants
+
+SOURCE = "https://voursa.s3.eu-west-3.amazonaws.com/ads/42/photo%201.jpg"
+
+
+def next_image(url, width, quality=75):
+    return f"https://www.voursa.com/_next/image?url={url.replace(':', '%3A').replace('/', '%2F')}&w={width}&q={quality}"
+
+
+def test_canonical_image_key_ignores_variant_and_s3_form():
+    key = canonical_image_key(SOURCE)
+    assert key == "s3://voursa/ads/42/photo 1.jpg"
+    assert canonical_image_key(next_image(SOURCE, 3840)) == key
+    assert canonical_image_key(next_image(SOURCE, 384, 50)) == key
+    assert canonical_image_key("http://s3.eu-west-3.amazonaws.com/voursa/ads/42/photo%201.jpg") == key
+    assert canonical_image_key("https://voursa.s3.amazonaws.com/ads/42/photo%202.jpg") != key
+
+
+def test_canonical_image_key_of_other_hosts():
+    assert canonical_image_key("https://WWW.Example.com/a/b.jpg?x=1") == "www.example.com/a/b.jpg"
+
+
+def test_group_image_variants_keeps_largest_and_gallery_alt():
+    other = "https://voursa.s3.amazonaws.com/ads/42/photo2.jpg"
+    photos = group_image_variants([
+        {'url': next_image(SOURCE, 384, 50), 'alt': 'Thumbnail 1'},
+        {'url': next_image(other, 384, 50), 'alt': 'Thumbnail 2'},
+        {'url': next_image(SOURCE, 3840), 'alt': 'Salon'},
+        {'url': next_image(SOURCE, 1920), 'alt': 'Salon'},
+    ])
+    assert len(photos) == 2
+    first, second = photos
+    assert first['url'] == next_image(SOURCE, 3840)
+    assert first['alt'] == 'Salon'
+    assert [variant.get('width') for variant in first['variants']] == [384, 3840, 1920]
+    assert second['alt'] == 'Thumbnail 2'
+    assert len(second['variants']) == 1
+
+
+def test_group_image_variants_prefers_source_file():
+    photos = group_image_variants([{'url': next_image(SOURCE, 3840)}, {'url': SOURCE}])
+    assert len(photos) == 1
+    assert photos[0]['url'] == SOURCE
@@ -0,0 +1,178 @@
+import json
+import os
+
+import pytest
+
+from run_scraper import MockVoursaServer, VoursaCompleteScraper
+
+
+@pytest.fixture
+def server():
+    mock = MockVoursaServer(images_per_ad=2, image_size=(320, 240)).start()
+    yield mock
+    mock.close()
+
+
+@pytest.mark.parametrize("next_data", [True, False], ids=["next-data", "html"])
+def test_http_crawl_of_mock_site(server, tmp_path, monkeypatch, next_data):
+    monkeypatch.chdir(tmp_path)
+    server.next_data = next_data
+    scraper = VoursaCompleteScraper(
+        ads_per_category=3, request_delay=0.0, fetch_mode='http',
+        base_url=server.base_url, metrics_path=None
+    )
+    try:
+        results = scraper.scrape_all_categories(['vehicles'])
+        scraper.save_results(results, 'data/results.json')
+    finally:
+        scraper.close()
+
+    ads = results['vehicles']
+    assert [ad['ad_id'] for ad in ads] == ['2000000', '2000001', '2000002']
+    assert scraper.stats['errors'] == 0
+    for ad in ads:
+        assert ad['title'] == f"Annonce {ad['ad_id']} - Véhicules"
+        assert ad['price'] == str(1000 * (int(ad['ad_id']) % 997))
+        assert ad['location']
+        assert len(ad['images']) == 2
+        for image in ad['images']:
+            assert os.path.getsize(image['local_path']) > 0
+
+    with open('data/results.json', encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved['metadata']['total_ads'] == 3
+    assert saved['metadata']['total_images'] == 6
+    assert saved['ads_by_category']['vehicles'] == ads
+
+
+def test_mock_photos_are_distinct_and_shared_by_variants(server):
+    first = server.respond("/images/2000000_0.jpg")[2]
+    other = server.respond("/images/2000000_1.jpg")[2]
+    variant = server.respond(f"/_next/image?url={server.origin}%2Fimages%2F2000000_0.jpg&w=384&q=50")[2]
+    # 32 derniers octets : empreinte propre à l'URL, après la fin du JPEG
+    assert first[:-32] != other[:-32]
+    assert first[:-32] == variant[:-32]
+
+
+def test_incremental_crawl_records_ads_once_saved(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def crawl(fail_save=False):
+        scraper = VoursaCompleteScraper(
+            ads_per_category=3, request_delay=0.0, fetch_mode='http', base_url=server.base_url,
+            metrics_path=None, incremental=True, index_path='seen.sqlite'
+        )
+        if fail_save:
+            def save_intermediate_results(data):
+                raise OSError("disque plein")
+            scraper.save_intermediate_results = save_intermediate_results
+        try:
+            return [ad['ad_id'] for ad in scraper.scrape_all_categories(['vehicles'])['vehicles']]
+        finally:
+            scraper.close()
+
+    first = ['2000000', '2000001', '2000002']
+    # Rien n'a été sauvegardé : les annonces ne sont pas notées vues
+    assert crawl(fail_save=True) == first
+    assert crawl() == first
+    assert crawl() == ['2000003', '2000004', '2000005']
+
+
+def test_interrupted_crawl_keeps_finished_categories(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scraper = VoursaCompleteScraper(
+        ads_per_category=2, request_delay=0.0, fetch_mode='http',
+        base_url=server.base_url, metrics_path=None, download_images=False
+    )
+    scrape_category = scraper.scrape_category
+
+    def interrupted(category_key):
+        if category_key == 'real_estate':
+            raise KeyboardInterrupt
+        return scrape_category(category_key)
+    monkeypatch.setattr(scraper, 'scrape_category', interrupted)
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            scraper.scrape_all_categories(['vehicles', 'real_estate'])
+        scraper.save_results(scraper.all_ads, 'data/partial.json')
+    finally:
+        scraper.close()
+
+    with open('data/partial.json', encoding='utf-8') as f:
+        saved = json.load(f)
+    assert [ad['ad_id'] for ad in saved['ads_by_category']['vehicles']] == ['2000000', '2000001']
+
+
+def no_browser(*args, **kwargs):
+    raise AssertionError("Selenium ne doit pas être lancé")
+
+
+def test_http_crawl_reads_html_when_next_data_has_no_ad(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    respond = server.respond
+
+    def respond_without_ad(path):
+        if path.startswith('/_next/data/') and '/ads/' in path:
+            return 200, 'application/json', b'{"pageProps": {}}'
+        return respond(path)
+    monkeypatch.setattr(server, 'respond', respond_without_ad)
+
+    scraper = VoursaCompleteScraper(
+        ads_per_category=2, request_delay=0.0, fetch_mode='http',
+        base_url=server.base_url, metrics_path=None, download_images=False
+    )
+    monkeypatch.setattr(scraper, 'load_page', no_browser)
+    monkeypatch.setattr(scraper, 'extract_listing_links_selenium', no_browser)
+    try:
+        ads = scraper.scrape_all_categories(['vehicles'])['vehicles']
+    finally:
+        scraper.close()
+    assert [ad['title'] for ad in ads] == ["Annonce 2000000 - Véhicules", "Annonce 2000001 - Véhicules"]
+
+
+def test_http_crawl_of_empty_category_does_not_start_browser(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock = MockVoursaServer(pages=0).start()
+    scraper = VoursaCompleteScraper(
+        ads_per_category=2, request_delay=0.0, fetch_mode='http',
+        base_url=mock.base_url, metrics_path=None, download_images=False
+    )
+    # Les erreurs d'une page de listing sont journalisées : on compte les appels
+    browser_pages = []
+    monkeypatch.setattr(scraper, 'extract_listing_links_selenium', lambda url: browser_pages.append(url))
+    try:
+        assert scraper.scrape_all_categories(['vehicles']) == {'vehicles': []}
+    finally:
+        scraper.close()
+        mock.close()
+    assert browser_pages == []
+
+
+@pytest.mark.parametrize("max_ads, pages", [(5, ['1']), (12, ['1', '2', '3'])])
+def test_listing_prefetch_stops_at_needed_pages(tmp_path, monkeypatch, max_ads, pages):
+    monkeypatch.chdir(tmp_path)
+    mock = MockVoursaServer(ads_per_page=5).start()
+    scraper = VoursaCompleteScraper(
+        ads_per_category=max_ads, request_delay=0.0, fetch_mode='http', listing_prefetch=3,
+        base_url=mock.base_url, metrics_path=None, download_images=False
+    )
+    fetched = []
+    extract_listing_links_http = scraper.extract_listing_links_http
+
+    def record(url):
+        fetched.append(url.partition('?page=')[2] or '1')
+        return extract_listing_links_http(url)
+    monkeypatch.setattr(scraper, 'extract_listing_links_http', record)
+    try:
+        urls = scraper.extract_ad_urls_from_listing(scraper.get_category_url('vehicles'), max_ads)
+    finally:
+        scraper.close()
+        mock.close()
+    assert len(urls) == max_ads
+    assert sorted(fetched, key=int) == pages
+
+
+def test_mock_listing_with_unreadable_page_shows_first_page(server):
+    first = server.respond("/categories/vehicles")
+    assert server.respond("/categories/vehicles?page=abc") == first
+    assert server.respond("/categories/vehicles?page=") == first
@@ -0,0 +1,36 @@
+import pytest
+
+import run_scraper
+from run_scraper import parse_number
+
+CASES = [
+    ("120 m2", 120.0),
+    ("1 200 000 MRU", 1200000.0),
+    ("3,5", 3.5),
+    ("85,5 m²", 85.5),
+    ("1.500.000", 1500000.0),
+    ("2,500,000 MRU", 2500000.0),
+    ("120 000 km", 120000.0),
+    ("Année 2018", 2018.0),
+    ("5 pièces", 5.0),
+    ("sur demande", None),
+    ("", None),
+    (None, None),
+]
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+def test_parse_number_keeps_numbers():
+    assert parse_number(42) == 42.0
+    assert parse_number(3.5) == 3.5
+
+
+@pytest.mark.skipif(run_scraper.pa is None, reason="pyarrow non installé")
+def test_parse_number_column_matches_parse_number():
+    texts = [text for text, _ in CASES]
+    assert run_scraper.parse_number_column(texts).to_pylist() == [expected for _, expected in CASES]
+    assert run_scraper.parse_number_column(["120 m2", "3,5", None], 'int64').to_pylist() == [120, 4, None]
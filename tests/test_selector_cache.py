@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+import run_scraper
+from run_scraper import SelectorCache, make_page, page_template, selector_tokens
+
+SELECTORS = ['h1.ad-title', '[class*="title"]', 'h1']
+
+
+def probe_on(elements):
+    """Sonde d'une page dont `elements` associe chaque sélecteur trouvé à son texte"""
+    calls = []
+
+    def probe(selector):
+        calls.append(selector)
+        return elements.get(selector)
+    return probe, calls
+
+
+def test_page_template():
+    assert page_template('ad', "https://www.voursa.com/EN/categories/vehicles/ads/annonce-1") == 'ad:vehicles'
+    assert page_template('listing', "https://www.voursa.com/EN") == 'listing:*'
+
+
+def test_selector_tokens():
+    assert selector_tokens('h1.ad-title') == [('<', ' h1 '), ('class', 'ad-title')]
+    assert selector_tokens('[class*="title"]') == [('class', ''), ('class', 'title')]
+    assert selector_tokens('img[src*="/images/"]') == [('src', ''), ('src', 'images'), ('<', ' img ')]
+    assert selector_tokens('#main div.price') == [('<', ' div '), ('class', 'price'), ('id', 'main')]
+    assert selector_tokens('h1, h2') == []
+    assert selector_tokens('li:nth-child(2)') == []
+
+
+@pytest.mark.parametrize("parser", ['html.parser', 'selectolax'])
+def test_page_attributes_ignore_text_and_scripts(parser):
+    if parser == 'selectolax' and run_scraper.LexborHTMLParser is None:
+        pytest.skip("selectolax non installé")
+    page = make_page(
+        '<html><head><title>Titre</title><meta name="description" content="Prix"></head>'
+        '<body><h1 class="ad-title big">Titre</h1><p>price location</p>'
+        '<script id="__NEXT_DATA__">{"price": 1, "location": "x"}</script></body></html>', parser
+    )
+    cache = SelectorCache(path=None)
+    assert not cache.cannot_match('h1.ad-title', page.attributes)
+    assert not cache.cannot_match('[class*="title"]', page.attributes)
+    # Mots présents dans le texte, les métadonnées ou __NEXT_DATA__, mais dans aucune classe
+    assert cache.cannot_match('[class*="price"]', page.attributes)
+    assert cache.cannot_match('[class*="location"]', page.attributes)
+    assert cache.cannot_match('[class*="description"]', page.attributes)
+    assert cache.cannot_match('div.ad-title', page.attributes)
+
+
+def test_find_keeps_selector_order():
+    cache = SelectorCache(path=None)
+    probe, _ = probe_on({'[class*="title"]': 'Div title'})
+    assert cache.find('ad:*', 'title', SELECTORS, probe) == ('Div title', 'learn')
+
+    # Un sélecteur plus prioritaire qui trouve le champ l'emporte sur le sélecteur appris
+    probe, _ = probe_on({'h1.ad-title': 'Real H1', '[class*="title"]': 'Div title'})
+    assert cache.find('ad:*', 'title', SELECTORS, probe) == ('Real H1', 'relearn')
+    probe, _ = probe_on({'h1.ad-title': 'Real H1'})
+    assert cache.find('ad:*', 'title', SELECTORS, probe) == ('Real H1', 'hit')
+
+    probe, _ = probe_on({})
+    assert cache.find('ad:*', 'title', SELECTORS, probe) == (None, 'miss')
+
+
+def test_find_skips_only_selectors_the_page_cannot_match():
+    cache = SelectorCache(path=None, skip_after=2)
+    page = make_page('<html><body><div class="price">10</div><h1>Titre</h1></body></html>')
+    for attempt in range(3):
+        probe, calls = probe_on({'h1': 'Titre'})
+        result = cache.find('ad:*', 'title', SELECTORS, probe, attributes=lambda: page.attributes)
+        assert result == ('Titre', 'hit' if attempt else 'learn')
+    # 'h1.ad-title' et '[class*="title"]' ont échoué deux fois et aucune classe de la page ne convient
+    assert calls == ['h1']
+    assert cache.rates()[0][3]['skipped'] == 2
+
+    # Dès que la page a la classe, le sélecteur est de nouveau essayé, dans l'ordre
+    probe, calls = probe_on({'h1.ad-title': 'Nouveau', 'h1': 'Titre'})
+    page = make_page('<html><body><h1 class="ad-title">Nouveau</h1></body></html>')
+    assert cache.find('ad:*', 'title', SELECTORS, probe, attributes=lambda: page.attributes) == ('Nouveau', 'relearn')
+    assert calls == ['h1.ad-title']
+
+
+def test_save_and_reload(tmp_path):
+    path = tmp_path / "selectors.json"
+    cache = SelectorCache(path=str(path))
+    probe, _ = probe_on({'h1': 'Titre'})
+    cache.find('ad:vehicles', 'title', SELECTORS, probe)
+    cache.save()
+
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['ad:vehicles']['title']['learned'] == 'h1'
+    reloaded = SelectorCache(path=str(path))
+    assert reloaded.learned[('ad:vehicles', 'title')] == 'h1'
+    assert reloaded.misses[('ad:vehicles', 'title')] == {'h1.ad-title': 1, '[class*="title"]': 1}